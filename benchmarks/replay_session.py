@@ -0,0 +1,73 @@
+"""
+Replays a recorded swarm session against the current code.
+
+Record a session once against live providers, then replay it with zero latency
+to measure orchestration time and memory without any network in the way:
+
+    python benchmarks/replay_session.py --cassette run.jsonl --messages turns.txt --mode record
+    python benchmarks/replay_session.py --cassette run.jsonl --messages turns.txt --latency zero
+
+`turns.txt` holds one user message per line; they are sent to the Manager in order.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from opencore.config import settings  # noqa: E402
+from opencore.core.swarm import Swarm  # noqa: E402
+from opencore.llm.recording import get_cassette, MODE_REPLAY, LATENCY_ZERO  # noqa: E402
+
+
+def run(cassette: str, turns: list, mode: str = MODE_REPLAY, latency: str = LATENCY_ZERO) -> dict:
+    """Sends `turns` through a fresh swarm with provider traffic on `cassette`."""
+    settings.llm_cassette = cassette
+    settings.llm_cassette_mode = mode
+    settings.llm_cassette_latency = latency
+
+    tracemalloc.start()
+    swarm = Swarm()
+    durations = []
+    errors = 0
+    for message in turns:
+        began = time.perf_counter()
+        reply = swarm.chat(message)
+        durations.append(time.perf_counter() - began)
+        if reply.startswith("Error") or reply.startswith("SYSTEM ALERT"):
+            errors += 1
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "turns": len(turns),
+        "errors": errors,
+        "total_s": sum(durations),
+        "max_turn_ms": max(durations) * 1000 if durations else 0.0,
+        "peak_mb": peak / (1024 * 1024),
+        "agents": len(swarm.agents),
+        "interactions": swarm.interactions.last_seq,
+        **get_cassette(cassette).stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cassette", required=True, help="cassette file (JSON Lines)")
+    parser.add_argument("--messages", required=True, help="file with one user message per line")
+    parser.add_argument("--mode", default=MODE_REPLAY, choices=["record", "replay", "auto"])
+    parser.add_argument("--latency", default=LATENCY_ZERO, choices=["original", "zero"])
+    args = parser.parse_args()
+
+    with open(args.messages, "r", encoding="utf-8") as f:
+        turns = [line.rstrip("\n") for line in f if line.strip()]
+
+    result = run(args.cassette, turns, mode=args.mode, latency=args.latency)
+    for key, value in result.items():
+        print(f"{key:>14}: {value:.3f}" if isinstance(value, float) else f"{key:>14}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Registry contention benchmark.
+
+Starts a swarm with stand-in agents that answer instantly, then has many threads
+delegate concurrently while another thread keeps creating and removing agents.
+Every delegation reads the registry and appends two interactions, so the result
+mostly measures the swarm's own locking rather than agent work.
+
+    python benchmarks/swarm_contention.py --threads 64 --seconds 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from opencore.core.swarm import Swarm  # noqa: E402
+from opencore.core.delegation import DelegationBudget  # noqa: E402
+
+
+class InstantAgent:
+    """Stand-in agent whose turns return immediately."""
+    def __init__(self, name):
+        self.name = name
+
+    def chat(self, message, lane=None):
+        return "ok"
+
+
+def run(threads: int = 64, seconds: float = 5.0, workers: int = 8, churn: bool = True) -> dict:
+    """Runs the benchmark and returns throughput and latency figures."""
+    swarm = Swarm("Boss")
+    for i in range(workers):
+        swarm.agents[f"W{i}"] = InstantAgent(f"W{i}")
+    # Measure the registry, not the delegation budget
+    swarm.delegations = DelegationBudget(limit=threads)
+
+    stop = threading.Event()
+    start_barrier = threading.Barrier(threads + 1)
+    latencies = [[] for _ in range(threads)]
+    errors = [0] * threads
+
+    def delegator(index):
+        target = f"W{index % workers}"
+        start_barrier.wait()
+        samples = latencies[index]
+        while not stop.is_set():
+            began = time.perf_counter()
+            result = swarm.delegate_task("Boss", target, "ping")
+            samples.append(time.perf_counter() - began)
+            if not result.startswith("Response from"):
+                errors[index] += 1
+
+    def churner():
+        n = 0
+        while not stop.is_set():
+            name = f"Temp{n % 4}"
+            swarm.create_agent(name, "Temp", "Temporary.")
+            swarm.get_graph_data()
+            swarm.remove_agent(name)
+            n += 1
+
+    pool = [threading.Thread(target=delegator, args=(i,)) for i in range(threads)]
+    if churn:
+        pool.append(threading.Thread(target=churner))
+    for t in pool:
+        t.start()
+    start_barrier.wait()
+    began = time.perf_counter()
+    time.sleep(seconds)
+    stop.set()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - began
+
+    samples = sorted(s for per_thread in latencies for s in per_thread)
+    count = len(samples)
+    return {
+        "threads": threads,
+        "delegations": count,
+        "errors": sum(errors),
+        "per_second": count / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(samples) * 1000 if samples else 0.0,
+        "p99_ms": samples[int(count * 0.99) - 1] * 1000 if samples else 0.0,
+        "interactions": swarm.interactions.last_seq,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=8, help="number of target agents")
+    parser.add_argument("--no-churn", action="store_true", help="don't create and remove agents while running")
+    args = parser.parse_args()
+
+    result = run(args.threads, args.seconds, args.workers, churn=not args.no_churn)
+    for key, value in result.items():
+        print(f"{key:>14}: {value:.2f}" if isinstance(value, float) else f"{key:>14}: {value}")
+
+
+if __name__ == "__main__":
+    main()
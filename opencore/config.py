@@ -75,6 +75,87 @@ class Settings:
         self.heartbeat_interval = self._get_int_env("HEARTBEAT_INTERVAL", 3600)
         self.max_turns = self._get_int_env("MAX_TURNS", 10)
         self.max_history = self._get_int_env("MAX_HISTORY", 100)
+        # Number of most recent user turns whose image attachments are sent to the model in full
+        self.attachment_retention_turns = self._get_int_env("ATTACHMENT_RETENTION_TURNS", 1)
+        self.attachment_store_max_mb = self._get_int_env("ATTACHMENT_STORE_MAX_MB", 256)
+        # Memory budget for cached read_file/list_files results (0 disables the cache)
+        self.tool_cache_max_mb = self._get_int_env("TOOL_CACHE_MAX_MB", 64)
+        # Parallel delegation (delegate_tasks): worker pool size and per-task timeout in seconds
+        self.max_parallel_delegations = self._get_int_env("MAX_PARALLEL_DELEGATIONS", 4)
+        self.delegation_timeout = self._get_int_env("DELEGATION_TIMEOUT", 300)
+        # Delegation limits: longest agent chain, concurrent sub-agent turns per swarm, and seconds to wait for a slot
+        self.max_delegation_depth = self._get_int_env("MAX_DELEGATION_DEPTH", 5)
+        self.max_inflight_delegations = self._get_int_env("MAX_INFLIGHT_DELEGATIONS", 16)
+        self.delegation_slot_wait = self._get_int_env("DELEGATION_SLOT_WAIT", 30)
+        # Seconds a turn waits for a busy agent before giving up (breaks A -> B / B -> A waits across requests)
+        self.agent_turn_wait = self._get_int_env("AGENT_TURN_WAIT", 120)
+        # Pre-built instances kept ready per agent template (unless the template sets its own)
+        self.agent_pool_size = self._get_int_env("AGENT_POOL_SIZE", 2)
+        # Upper bound on a template's pool, however many instances it asks for
+        self.agent_pool_max = self._get_int_env("AGENT_POOL_MAX", 16)
+        # Upper bound on inputs accepted by a single map_task call
+        self.map_max_inputs = self._get_int_env("MAP_MAX_INPUTS", 1000)
+        # Background delegations (start_task): worker pool size and finished tasks kept for lookup
+        self.max_background_tasks = self._get_int_env("MAX_BACKGROUND_TASKS", 8)
+        self.max_retained_tasks = self._get_int_env("MAX_RETAINED_TASKS", 100)
+        # Workflow engine: concurrent steps per run and cached step outputs kept per swarm
+        self.workflow_max_concurrency = self._get_int_env("WORKFLOW_MAX_CONCURRENCY", 4)
+        self.workflow_cache_size = self._get_int_env("WORKFLOW_CACHE_SIZE", 256)
+        # Session-scoped swarms: live sessions kept in memory, idle TTL (seconds) and spill directory
+        self.max_live_sessions = self._get_int_env("MAX_LIVE_SESSIONS", 32)
+        self.session_ttl = self._get_int_env("SESSION_TTL", 1800)
+        self.session_dir = os.getenv(
+            "SESSION_DIR", os.path.join(os.path.expanduser("~"), ".opencore", "sessions")
+        )
+        # Idle agent offload: seconds without a turn before an agent's history moves to disk (0 = never),
+        # cap on agents kept in memory per swarm (least recently used are offloaded first; 0 = no cap)
+        self.agent_idle_ttl = self._get_int_env("AGENT_IDLE_TTL", 1800)
+        self.max_live_agents = self._get_int_env("MAX_LIVE_AGENTS", 64)
+        self.agent_offload_dir = os.getenv(
+            "AGENT_OFFLOAD_DIR", os.path.join(os.path.expanduser("~"), ".opencore", "agents")
+        )
+        # Interaction history: records kept per swarm, and how many of the newest are drawn in the graph
+        self.interaction_log_size = self._get_int_env("INTERACTION_LOG_SIZE", 1000)
+        self.graph_max_edges = self._get_int_env("GRAPH_MAX_EDGES", 20)
+        # Graph changes kept for /graph/changes delta polling
+        self.graph_journal_size = self._get_int_env("GRAPH_JOURNAL_SIZE", 1000)
+        # Multi-process mode: worker processes hosting agents (0 = all agents in this process)
+        # and how agents are assigned to them (round_robin, least_loaded or hash)
+        self.worker_processes = self._get_int_env("WORKER_PROCESSES", 0)
+        self.agent_placement = os.getenv("AGENT_PLACEMENT", "round_robin")
+        # Shared state for multiple API replicas (memory:// or redis://host:port/db; empty = off)
+        # and the per-agent turn lease: TTL (renewed while a turn runs) and how long to wait for it
+        self.state_store_url = os.getenv("STATE_STORE_URL", "")
+        self.agent_lease_ttl = self._get_int_env("AGENT_LEASE_TTL", 60)
+        self.agent_lease_wait = self._get_int_env("AGENT_LEASE_WAIT", 30)
+        # Singleflight delegations: identical concurrent tasks for the same agent run once (opt-in),
+        # and the shared answer is reused for this many seconds afterwards
+        self.delegation_singleflight = os.getenv("DELEGATION_SINGLEFLIGHT", "false").lower() in ("true", "1", "yes")
+        self.delegation_reuse_window = self._get_int_env("DELEGATION_REUSE_WINDOW", 5)
+        # Delegation results: longest answer returned inline in characters (0 = no limit). Longer answers are
+        # stored for read_result and replaced by a preview ("store") or a summary ("summarize")
+        self.delegation_result_max_chars = self._get_int_env("DELEGATION_RESULT_MAX_CHARS", 4000)
+        self.delegation_result_mode = os.getenv("DELEGATION_RESULT_MODE", "store").lower()
+        self.delegation_summary_model = os.getenv("DELEGATION_SUMMARY_MODEL", "")  # empty = swarm default model
+        self.result_store_max_mb = self._get_int_env("RESULT_STORE_MAX_MB", 64)
+        # Shared blackboard: facts kept per swarm, longest fact value, and the default swarm's
+        # JSON Lines file (empty = in memory only)
+        self.blackboard_max_facts = self._get_int_env("BLACKBOARD_MAX_FACTS", 1000)
+        self.blackboard_max_value_chars = self._get_int_env("BLACKBOARD_MAX_VALUE_CHARS", 8000)
+        self.blackboard_path = os.getenv("BLACKBOARD_PATH", "")
+        # Live events (/events): events buffered per subscriber before the oldest are dropped,
+        # and the most concurrent subscribers per swarm
+        self.event_buffer_size = self._get_int_env("EVENT_BUFFER_SIZE", 256)
+        self.event_max_subscribers = self._get_int_env("EVENT_MAX_SUBSCRIBERS", 100)
+        # Async chat jobs (POST /jobs/chat): jobs run at once, jobs queued or running before new ones
+        # are refused, and seconds a finished job stays available
+        self.max_concurrent_jobs = self._get_int_env("MAX_CONCURRENT_JOBS", 4)
+        self.max_pending_jobs = self._get_int_env("MAX_PENDING_JOBS", 100)
+        self.job_retention = self._get_int_env("JOB_RETENTION", 3600)
+        # Provider record/replay: cassette file, mode (record, replay, auto) and replay latency (original, zero)
+        self.llm_cassette = os.getenv("LLM_CASSETTE", "")
+        self.llm_cassette_mode = os.getenv("LLM_CASSETTE_MODE", "auto").lower()
+        self.llm_cassette_latency = os.getenv("LLM_CASSETTE_LATENCY", "original").lower()
 
     def _get_int_env(self, key: str, default: int) -> int:
         val = os.getenv(key)
@@ -1,13 +1,63 @@
 import json
 import logging
+from collections.abc import MutableMapping
 from typing import List, Dict, Any, Callable, Optional, Union, Tuple
 from opencore.llm import get_llm_provider
 from opencore.llm.base import LLMResponse
 from opencore.config import settings
+from opencore.core.context import cancel_token_ctx
+from opencore.core.exceptions import OperationCancelledError, AgentBusyError
+from opencore.core.mailbox import AgentMailbox, LANE_USER
+from opencore.core.attachments import (
+    AttachmentStore, attachment_store as default_attachment_store, make_attachment_part, hydrate_content
+)
 
 logger = logging.getLogger(__name__)
 
 
+class AgentTools(MutableMapping):
+    """
+    An agent's callable tools: its own registrations layered over the swarm's
+    shared tool catalog. Catalog tools are bound to this agent when looked up.
+    """
+    def __init__(self, agent: "Agent"):
+        self._agent = agent
+        self._own: Dict[str, Callable] = {}
+
+    def __getitem__(self, name: str) -> Callable:
+        if name in self._own:
+            return self._own[name]
+        catalog = self._agent.tool_catalog
+        if catalog is not None:
+            func = catalog.bind(name, self._agent.name, self._agent.tool_scope)
+            if func is not None:
+                return func
+        raise KeyError(name)
+
+    def __setitem__(self, name: str, func: Callable):
+        self._own[name] = func
+
+    def __delitem__(self, name: str):
+        del self._own[name]
+
+    def __contains__(self, name: object) -> bool:
+        if name in self._own:
+            return True
+        catalog = self._agent.tool_catalog
+        return catalog is not None and name in catalog.names(self._agent.tool_scope)
+
+    def _names(self) -> List[str]:
+        catalog = self._agent.tool_catalog
+        shared = [] if catalog is None else [n for n in catalog.names(self._agent.tool_scope) if n not in self._own]
+        return shared + list(self._own)
+
+    def __iter__(self):
+        return iter(self._names())
+
+    def __len__(self) -> int:
+        return len(self._names())
+
+
 class Agent:
     def __init__(
         self,
@@ -17,7 +67,8 @@ class Agent:
         model: str = "gpt-4o",
         client: Any = None,
         is_custom_model: bool = False,
-        created_by: Optional[str] = None
+        created_by: Optional[str] = None,
+        attachment_store: Optional[AttachmentStore] = None
     ):
         self.name = name
         self.role = role
@@ -25,21 +76,63 @@ class Agent:
         self.model = model
         self.is_custom_model = is_custom_model
         self.created_by = created_by
-        self.status = "active"
-        self.last_thought: str = "Idle"
+        # Name of the AgentTemplate this instance was built from, if it came from a template pool
+        self.template: Optional[str] = None
+        # Called as on_change(name, field, value) when status or last_thought changes
+        self.on_change: Optional[Callable[[str, str, Any], None]] = None
+        self._status = "active"
+        self._last_thought = "Idle"
         sys_msg = f"You are {name}, a {role}. {system_prompt}"
         self.messages: List[Dict[str, Any]] = [
             {"role": "system", "content": sys_msg}
         ]
-        self.tools: Dict[str, Callable] = {}
+        # Shared swarm tools, attached with use_tool_catalog
+        self.tool_catalog = None
+        self.tool_scope: Optional[str] = None
+        self.tools = AgentTools(self)
         self._tool_definitions: Dict[str, Dict[str, Any]] = {}
 
         # Client is unused now but kept for sig compatibility
         self.client = client
+        self.attachment_store = attachment_store or default_attachment_store
+        # Serializes turns so concurrent callers never interleave on self.messages
+        self.mailbox = AgentMailbox(name)
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, value: str):
+        self._status = value
+        if self.on_change is not None:
+            self.on_change(self.name, "status", value)
+
+    @property
+    def last_thought(self) -> str:
+        return self._last_thought
+
+    @last_thought.setter
+    def last_thought(self, value: str):
+        self._last_thought = value
+        if self.on_change is not None:
+            self.on_change(self.name, "last_thought", value)
 
     @property
     def tool_definitions(self) -> List[Dict[str, Any]]:
-        return list(self._tool_definitions.values())
+        own = self._tool_definitions
+        if self.tool_catalog is None:
+            return list(own.values())
+        shared = [
+            schema for schema in self.tool_catalog.definitions(self.tool_scope)
+            if schema["function"]["name"] not in own
+        ]
+        return shared + list(own.values())
+
+    def use_tool_catalog(self, catalog: Any, scope: str):
+        """Gives the agent the shared tools of `catalog` available to `scope`."""
+        self.tool_catalog = catalog
+        self.tool_scope = scope
 
     def register_tool(self, func: Callable, schema: Dict[str, Any]):
         """
@@ -52,6 +145,57 @@ class Agent:
         # Check if tool definition already exists and update it, $O(1)$ updates
         self._tool_definitions[tool_name] = schema
 
+    def unregister_tool(self, name: str):
+        """Removes one of the agent's own tools (shared catalog tools are unaffected)."""
+        try:
+            del self.tools[name]
+        except KeyError:
+            pass
+        self._tool_definitions.pop(name, None)
+
+    def reset(self, name: str, role: str, system_prompt: str, created_by: Optional[str] = None):
+        """
+        Clears history and runtime state so a pooled instance can be reused as `name`.
+        Registered tools and the tool catalog are kept.
+        """
+        self.on_change = None
+        self.name = name
+        self.role = role
+        self.system_prompt = system_prompt
+        self.created_by = created_by
+        self._status = "active"
+        self._last_thought = "Idle"
+        self.messages = [{"role": "system", "content": f"You are {name}, a {role}. {system_prompt}"}]
+        self.mailbox = AgentMailbox(name)
+
+    def export_state(self) -> Dict[str, Any]:
+        """Returns a JSON-serializable snapshot of the agent's definition and history."""
+        return {
+            "name": self.name,
+            "role": self.role,
+            "system_prompt": self.system_prompt,
+            "model": self.model,
+            "is_custom_model": self.is_custom_model,
+            "created_by": self.created_by,
+            "status": self.status,
+            "last_thought": self.last_thought,
+            "messages": list(self.messages),
+        }
+
+    def load_state(self, state: Dict[str, Any]):
+        """Restores runtime state (history, status) from `export_state` output."""
+        self.messages = list(state.get("messages") or self.messages)
+        self.status = state.get("status", self.status)
+        self.last_thought = state.get("last_thought", self.last_thought)
+
+    def attachment_refs(self) -> List[str]:
+        """Returns the attachment hashes referenced by this agent's history."""
+        return [
+            part["ref"]
+            for msg in self.messages if isinstance(msg.get("content"), list)
+            for part in msg["content"] if part.get("type") == "attachment"
+        ]
+
     def add_message(
         self, role: str, content: Union[str, List[Dict[str, Any]]]
     ):
@@ -74,12 +218,23 @@ class Agent:
 
     def _execute_tool_calls(self, tool_calls: List[Any]):
         """Executes a list of tool calls and appends results."""
+        token = cancel_token_ctx.get()
         for tool_call in tool_calls:
             result = ""
             tool_id = "unknown"
             func_name = "unknown"
 
             try:
+                if token is not None and token.cancelled:
+                    # Still answer every tool call so the history stays well-formed
+                    tool_id, _, _ = self._parse_tool_call(tool_call)
+                    self.messages.append({
+                        "role": "tool",
+                        "tool_call_id": tool_id,
+                        "content": "Error: Request cancelled."
+                    })
+                    continue
+
                 # 1. Safe Extraction of ID and Name
                 tool_id, func_name, arguments_str = self._parse_tool_call(tool_call)
 
@@ -133,6 +288,40 @@ class Agent:
                 f"[{self.name}] Pruned history to {len(self.messages)} items."
             )
 
+    def _build_wire_messages(self) -> List[Dict[str, Any]]:
+        """
+        Returns the message list sent to the provider.
+
+        History stores attachments by reference. Text attachments are always
+        hydrated; images only for the most recent `attachment_retention_turns`
+        user turns, older ones carry a short placeholder instead of re-uploading
+        the payload.
+        """
+        retention = settings.attachment_retention_turns
+        user_turns_seen = 0
+        wire = list(self.messages)
+
+        for i in range(len(wire) - 1, 0, -1):
+            msg = wire[i]
+            if msg.get("role") != "user":
+                continue
+            if "lane" in msg:
+                # Delegation and heartbeat messages don't count as user turns
+                msg = wire[i] = {key: value for key, value in msg.items() if key != "lane"}
+            else:
+                user_turns_seen += 1
+            content = msg.get("content")
+            if not isinstance(content, list):
+                continue
+
+            parts, rewritten = hydrate_content(
+                self.attachment_store, content, include_images=user_turns_seen <= retention
+            )
+            if rewritten:
+                wire[i] = {**msg, "content": parts}
+
+        return wire
+
     def think(self, max_turns: Optional[int] = None) -> str:
         if self.status == "inactive":
             return f"Error: Agent '{self.name}' is currently inactive."
@@ -143,6 +332,11 @@ class Agent:
         if max_turns <= 0:
             return "Error: Max turns reached."
 
+        token = cancel_token_ctx.get()
+        if token is not None and token.cancelled:
+            self.last_thought = "Cancelled."
+            return "Error: Request cancelled."
+
         self._prune_messages()
 
         try:
@@ -152,11 +346,16 @@ class Agent:
                 is_custom_model=self.is_custom_model
             )
 
-            # 2. Chat
-            response: LLMResponse = provider.chat(
-                messages=self.messages,
-                tools=self.tool_definitions if self.tool_definitions else None
-            )
+            # 2. Chat (closing the provider on cancellation aborts the in-flight HTTP call)
+            remove_callback = token.add_callback(provider.close) if token is not None else None
+            try:
+                response: LLMResponse = provider.chat(
+                    messages=self._build_wire_messages(),
+                    tools=self.tool_definitions if self.tool_definitions else None
+                )
+            finally:
+                if remove_callback:
+                    remove_callback()
 
             # 3. Handle Response
             # Convert response to dict for storage
@@ -191,6 +390,10 @@ class Agent:
                     return "Error: Empty response from model."
 
         except Exception as e:
+            if token is not None and token.cancelled:
+                self.last_thought = "Cancelled."
+                return "Error: Request cancelled."
+
             error_msg = str(e)
             error_msg_lower = error_msg.lower()
 
@@ -210,27 +413,29 @@ class Agent:
     def chat(
         self,
         message: str,
-        attachments: Optional[List[Dict[str, Any]]] = None
+        attachments: Optional[List[Dict[str, Any]]] = None,
+        lane: str = LANE_USER
     ) -> str:
-        if attachments:
-            content = []
-            text_parts = [message] + [
-                f"\n\n[Attachment: {att['name']}]\n{att['content']}\n[End]"
-                for att in attachments if not att["type"].startswith("image/")
-            ]
-            text_content = "".join(text_parts)
-            content.append({"type": "text", "text": text_content})
-
-            # 2. Process Image Attachments
-            for att in attachments:
-                if att["type"].startswith("image/"):
-                    content.append({
-                        "type": "image_url",
-                        "image_url": {"url": att["content"]}
-                    })
-
-            self.add_message("user", content)
-        else:
-            self.add_message("user", message)
-
-        return self.think()
+        """
+        Runs one turn: appends the message and thinks until a final answer.
+        Turns for the same agent are queued by lane (user, delegation, heartbeat).
+        """
+        try:
+            with self.mailbox.turn(lane):
+                if attachments:
+                    # Attachments are stored once by hash and hydrated in _build_wire_messages
+                    content = [{"type": "text", "text": message}] + [
+                        make_attachment_part(self.attachment_store, att) for att in attachments
+                    ]
+                    self.add_message("user", content)
+                else:
+                    self.add_message("user", message)
+                if lane != LANE_USER:
+                    # Tagged so attachment retention only counts turns from the user
+                    self.messages[-1]["lane"] = lane
+
+                return self.think()
+        except OperationCancelledError:
+            return "Error: Request cancelled."
+        except AgentBusyError as e:
+            return f"Error: {str(e)}"
@@ -0,0 +1,122 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+from opencore.config import settings
+
+
+class AttachmentStore:
+    """
+    Content-addressed store for chat attachments.
+
+    Attachments are stored once under the SHA-256 of their content and referenced
+    from agent histories by hash, so a base64 image is kept in memory once no matter
+    how many messages point at it. The store is bounded by total bytes and evicts
+    the least recently used entries first.
+    """
+    def __init__(self, max_bytes: Optional[int] = None):
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._size = 0
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return settings.attachment_store_max_mb * 1024 * 1024
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, ref: str) -> bool:
+        return ref in self._entries
+
+    @staticmethod
+    def _ref(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def put(self, content: str) -> str:
+        """Stores content (if not already present) and returns its reference hash."""
+        ref = self._ref(content)
+        with self._lock:
+            if ref in self._entries:
+                self._entries.move_to_end(ref)
+                return ref
+
+            self._entries[ref] = content
+            self._size += len(content)
+            self._evict()
+        return ref
+
+    def get(self, ref: str) -> Optional[str]:
+        """Returns the stored content, or None if it was never stored or has been evicted."""
+        with self._lock:
+            content = self._entries.get(ref)
+            if content is not None:
+                self._entries.move_to_end(ref)
+            return content
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _evict(self):
+        # Always keep the most recent entry, even if it alone exceeds the budget
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, content = self._entries.popitem(last=False)
+            self._size -= len(content)
+
+
+def make_attachment_part(store: AttachmentStore, attachment: dict) -> dict:
+    """Stores an attachment and returns the history part that references it."""
+    return {
+        "type": "attachment",
+        "ref": store.put(attachment["content"]),
+        "name": attachment["name"],
+        "mime": attachment["type"],
+    }
+
+
+def hydrate_content(store: AttachmentStore, parts: list, include_images: bool) -> Tuple[list, bool]:
+    """
+    Converts a history content list into the provider wire format.
+
+    Text attachments are appended to the text block. Images become `image_url`
+    parts when `include_images` is set and otherwise collapse into a short
+    placeholder line. Returns the wire parts and whether anything was rewritten.
+    """
+    if not any(part.get("type") == "attachment" for part in parts):
+        return parts, False
+
+    text_parts = []
+    image_parts = []
+    for part in parts:
+        kind = part.get("type")
+        if kind == "text":
+            text_parts.append(part["text"])
+        elif kind == "attachment":
+            is_image = part["mime"].startswith("image/")
+            content = store.get(part["ref"]) if include_images or not is_image else None
+
+            if content is None:
+                state = "omitted from context" if is_image and not include_images else "no longer available"
+                text_parts.append(
+                    f"\n\n[Attachment: {part['name']} ({part['mime']}, sha256:{part['ref'][:12]}) {state}]"
+                )
+            elif is_image:
+                image_parts.append({"type": "image_url", "image_url": {"url": content}})
+            else:
+                text_parts.append(f"\n\n[Attachment: {part['name']}]\n{content}\n[End]")
+        else:
+            image_parts.append(part)
+
+    return [{"type": "text", "text": "".join(text_parts)}] + image_parts, True
+
+
+attachment_store = AttachmentStore()
@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional
+from opencore.config import settings
+from opencore.core.exceptions import FactConflictError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Fact:
+    key: str
+    value: str
+    author: str
+    version: int  # per key; a new key starts at the board-wide seq, so versions are never reused
+    seq: int  # board-wide order of posts
+    tags: List[str] = field(default_factory=list)
+    updated_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def describe(self) -> str:
+        tags = f" [{', '.join(self.tags)}]" if self.tags else ""
+        return f"{self.key} (v{self.version}, by {self.author}){tags}: {self.value}"
+
+
+class Blackboard:
+    """
+    Swarm-wide key/value store where agents share facts (file summaries, findings,
+    decisions) instead of re-deriving them in their own histories.
+
+    Every post bumps the key's version; `expected_version` turns a post into a
+    compare-and-set. A key created (or re-created after deletion or eviction) starts
+    at the board-wide `seq`, which never goes back, so a stale `expected_version`
+    can't match a newer fact under the same key. At most BLACKBOARD_MAX_FACTS facts are kept, the least recently
+    posted or read first out. With `path`, posts are appended to a JSON Lines file
+    that is replayed on start and compacted once it holds twice as many lines as facts.
+    """
+    def __init__(self, path: Optional[str] = None, max_facts: Optional[int] = None):
+        self.path = path
+        self._max_facts = max_facts
+        self._lock = threading.Lock()
+        self._facts: "OrderedDict[str, Fact]" = OrderedDict()
+        self._seq = 0
+        self._log_lines = 0
+        if path:
+            self._load()
+
+    @property
+    def max_facts(self) -> int:
+        return max(1, self._max_facts if self._max_facts is not None else settings.blackboard_max_facts)
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def __len__(self) -> int:
+        return len(self._facts)
+
+    def post(
+        self,
+        key: str,
+        value: str,
+        author: str,
+        tags: Optional[List[str]] = None,
+        expected_version: Optional[int] = None
+    ) -> Fact:
+        """
+        Creates or replaces a fact and returns it.
+
+        :raises FactConflictError: if `expected_version` is given and doesn't match (0 means "must not exist").
+        :raises ValueError: if the key is empty or the value exceeds BLACKBOARD_MAX_VALUE_CHARS.
+        """
+        key = key.strip()
+        if not key:
+            raise ValueError("Fact key must not be empty.")
+        if len(value) > settings.blackboard_max_value_chars:
+            raise ValueError(
+                f"Fact value is {len(value)} characters; the limit is {settings.blackboard_max_value_chars}."
+            )
+
+        with self._lock:
+            current = self._facts.get(key)
+            current_version = current.version if current is not None else 0
+            if expected_version is not None and expected_version != current_version:
+                raise FactConflictError(
+                    f"Fact '{key}' is at version {current_version}, not {expected_version}. Read it again before updating."
+                )
+            self._seq += 1
+            version = current.version + 1 if current is not None else self._seq
+            fact = Fact(key, value, author, version, self._seq, list(tags or []))
+            self._store(fact)
+            if self.path:
+                self._append(fact)
+        return fact
+
+    def get(self, key: str) -> Optional[Fact]:
+        with self._lock:
+            fact = self._facts.get(key.strip())
+            if fact is not None:
+                self._facts.move_to_end(fact.key)
+            return fact
+
+    def search(self, query: str, limit: int = 5, tag: Optional[str] = None) -> List[Fact]:
+        """
+        Returns facts matching the most query terms (in key, tags or value, case-insensitive),
+        newest first among equals.
+        """
+        terms = [term for term in query.lower().split() if term]
+        with self._lock:
+            facts = list(self._facts.values())
+
+        scored = []
+        for fact in facts:
+            if tag is not None and tag not in fact.tags:
+                continue
+            haystack = " ".join([fact.key, " ".join(fact.tags), fact.value]).lower()
+            score = sum(1 for term in terms if term in haystack)
+            if score or not terms:
+                scored.append((score, fact.seq, fact))
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [fact for _, _, fact in scored[:max(0, limit)]]
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            removed = self._facts.pop(key.strip(), None) is not None
+            if removed and self.path:
+                self._append_line({"key": key.strip(), "deleted": True})
+            return removed
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [fact.to_dict() for fact in self._facts.values()]
+
+    def restore(self, facts: List[Dict[str, Any]], seq: int = 0):
+        """Loads facts exported with `to_list`, keeping their versions. Pass the exporting board's `seq`."""
+        with self._lock:
+            self._seq = max(self._seq, seq)
+            for data in facts:
+                fact = Fact(**data)
+                self._seq = max(self._seq, fact.seq)
+                self._store(fact)
+
+    def _store(self, fact: Fact):
+        # Called with the lock held
+        self._facts[fact.key] = fact
+        self._facts.move_to_end(fact.key)
+        while len(self._facts) > self.max_facts:
+            self._facts.popitem(last=False)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                self._log_lines += 1
+                try:
+                    data = json.loads(line)
+                    if set(data) == {"seq"}:
+                        # Written by compaction; covers facts that were deleted or evicted since
+                        self._seq = max(self._seq, data["seq"])
+                        continue
+                    if data.get("deleted"):
+                        self._facts.pop(data["key"], None)
+                        continue
+                    fact = Fact(**data)
+                except (ValueError, TypeError, KeyError) as e:
+                    logger.warning(f"Skipping malformed blackboard line {line_no} in {self.path}: {e}")
+                    continue
+                self._seq = max(self._seq, fact.seq)
+                self._store(fact)
+
+    def _append(self, fact: Fact):
+        self._append_line(fact.to_dict())
+        if self._log_lines > 2 * max(len(self._facts), 1) and self._log_lines > 100:
+            self._compact()
+
+    def _append_line(self, data: Dict[str, Any]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(data, ensure_ascii=False) + "\n")
+        self._log_lines += 1
+
+    def _compact(self):
+        # Rewrites the log with only the current facts and the seq new versions continue from
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"seq": self._seq}) + "\n")
+            for fact in self._facts.values():
+                f.write(json.dumps(fact.to_dict(), ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        self._log_lines = len(self._facts) + 1
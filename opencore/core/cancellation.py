@@ -0,0 +1,118 @@
+import threading
+import logging
+from typing import Callable, Dict, List, Optional
+from opencore.core.context import cancel_token_ctx
+from opencore.core.exceptions import OperationCancelledError
+
+logger = logging.getLogger(__name__)
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation signal shared by everything working on one request.
+
+    Long-running code polls `cancelled` (or calls `raise_if_cancelled`) between steps.
+    Blocking resources such as HTTP clients and subprocesses register callbacks via
+    `add_callback` so they are torn down as soon as `cancel` is called.
+    """
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancellation callback failed: {e}")
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Registers a callback to run on cancellation (immediately if already cancelled).
+        Returns a function that unregisters it.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def remove():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+                return remove
+
+        callback()
+        return lambda: None
+
+    def child(self) -> "CancellationToken":
+        """Returns a token that is cancelled with this one but can also be cancelled on its own."""
+        child = CancellationToken()
+        remove = self.add_callback(lambda: child.cancel(self.reason or "cancelled"))
+        child.add_callback(remove)
+        return child
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise OperationCancelledError(f"Request cancelled ({self.reason}).")
+
+
+def current_token() -> Optional[CancellationToken]:
+    """Returns the cancellation token of the current execution context, if any."""
+    return cancel_token_ctx.get()
+
+
+def is_cancelled() -> bool:
+    token = cancel_token_ctx.get()
+    return token is not None and token.cancelled
+
+
+class CancellationRegistry:
+    """Maps request IDs to the tokens of in-flight requests so they can be cancelled by ID."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, CancellationToken] = {}
+
+    def register(self, request_id: str, token: CancellationToken) -> bool:
+        """Tracks `token` under `request_id`. Returns False if another request already uses the ID."""
+        with self._lock:
+            if request_id in self._tokens:
+                return False
+            self._tokens[request_id] = token
+            return True
+
+    def unregister(self, request_id: str, token: CancellationToken):
+        """Stops tracking `request_id` if it still belongs to `token`."""
+        with self._lock:
+            if self._tokens.get(request_id) is token:
+                del self._tokens[request_id]
+
+    def cancel(self, request_id: str, reason: str = "cancelled by client") -> bool:
+        """Cancels an in-flight request. Returns False if no such request is running."""
+        with self._lock:
+            token = self._tokens.get(request_id)
+        if token is None:
+            return False
+        token.cancel(reason)
+        return True
+
+    def __contains__(self, request_id: str) -> bool:
+        return request_id in self._tokens
+
+    def __len__(self) -> int:
+        return len(self._tokens)
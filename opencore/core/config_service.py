@@ -5,7 +5,7 @@ class ConfigService:
     def __init__(self, swarm=None):
         """
         Initializes the ConfigService.
-        :param swarm: An optional reference to the Swarm instance to update its settings when config changes.
+        :param swarm: An optional Swarm (or SessionManager) whose settings are updated when config changes.
         """
         self.swarm = swarm
 
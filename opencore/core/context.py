@@ -1,8 +1,17 @@
 from contextvars import ContextVar
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from opencore.core.cancellation import CancellationToken
 
 # Context variable to store the request ID for the current execution context.
 request_id_ctx: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
 
 # Context variable to store the activity log for the current turn/request execution context.
 activity_log_ctx: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("activity_log", default=None)
+
+# Context variable to store the cancellation token of the current request, if it can be cancelled.
+cancel_token_ctx: ContextVar[Optional["CancellationToken"]] = ContextVar("cancel_token", default=None)
+
+# Context variable to store the chain of agents the current delegation passed through (caller first).
+delegation_chain_ctx: ContextVar[Tuple[str, ...]] = ContextVar("delegation_chain", default=())
@@ -0,0 +1,179 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from opencore.config import settings
+from opencore.core.context import delegation_chain_ctx
+from opencore.core.cancellation import current_token
+from opencore.core.exceptions import OperationCancelledError, DelegationLimitError
+
+# Budget slot held by the current turn, with the thread holding it. A nested delegation on the
+# same thread borrows it; contexts copied to other threads (parallel branches) take their own.
+_held_slot_ctx: ContextVar[Optional[Tuple["DelegationBudget", int]]] = ContextVar("held_slot", default=None)
+
+
+def current_chain() -> Tuple[str, ...]:
+    """Returns the agents the current delegation passed through, caller first (empty outside a delegation)."""
+    return delegation_chain_ctx.get()
+
+
+def check_delegation(caller: Optional[str], to_agent: str, max_depth: Optional[int] = None) -> Tuple[str, ...]:
+    """
+    Validates a delegation from `caller` to `to_agent` against the current chain.
+    Returns the chain the target's turn will run under. Without a caller (work started
+    from the API rather than by an agent) a new chain starts at the target.
+
+    :raises DelegationLimitError: if the target is already in the chain or the chain is too deep.
+    """
+    chain = current_chain() or ((caller,) if caller else ())
+    if to_agent in chain:
+        path = " -> ".join(chain + (to_agent,))
+        raise DelegationLimitError(
+            f"Delegation cycle detected ({path}). '{to_agent}' is already working on this request; "
+            f"answer with what you have instead of delegating back."
+        )
+    limit = max_depth if max_depth is not None else settings.max_delegation_depth
+    if len(chain) > limit:
+        raise DelegationLimitError(
+            f"Delegation depth limit reached ({limit}). Handle the task yourself instead of delegating to '{to_agent}'."
+        )
+    return chain + (to_agent,)
+
+
+@contextmanager
+def delegation_scope(chain: Tuple[str, ...]) -> Iterator[None]:
+    """Runs the enclosed block (the target's turn) under `chain`."""
+    reset = delegation_chain_ctx.set(chain)
+    try:
+        yield
+    finally:
+        delegation_chain_ctx.reset(reset)
+
+
+class DelegationBudget:
+    """
+    Swarm-wide cap on concurrent sub-agent turns.
+
+    Unlike a plain semaphore, waiting for a slot is interrupted as soon as the
+    request's cancellation token fires. `in_flight` and `peak` are exposed for stats.
+
+    A turn that is blocked on other delegations doesn't keep its slot busy: a nested
+    delegation on the same thread borrows the caller's slot, and `released` hands the
+    slot back while the caller waits on parallel branches. Deep fan-out therefore
+    can't starve its own children of slots.
+    """
+    def __init__(self, limit: Optional[int] = None):
+        self._limit = limit
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.peak = 0
+
+    @property
+    def limit(self) -> int:
+        return max(1, self._limit if self._limit is not None else settings.max_inflight_delegations)
+
+    @contextmanager
+    def slot(self, wait: Optional[float] = None) -> Iterator[None]:
+        """
+        Holds one slot for the enclosed block.
+
+        :raises DelegationLimitError: if no slot frees up within `wait` seconds.
+        :raises OperationCancelledError: if the request is cancelled while waiting.
+        """
+        if self._holds_slot():
+            # The caller's turn is blocked on this one until it returns, so its slot covers both
+            yield
+            return
+
+        self._acquire(settings.delegation_slot_wait if wait is None else wait)
+        ctx_token = _held_slot_ctx.set((self, threading.get_ident()))
+        try:
+            yield
+        finally:
+            _held_slot_ctx.reset(ctx_token)
+            self._release()
+
+    @contextmanager
+    def released(self) -> Iterator[None]:
+        """
+        Gives up the current turn's slot while it waits on work running on other
+        threads (parallel delegations, workflow steps, map items), then takes it back.
+        Taking it back doesn't wait for room: the work it waited for is already done,
+        so the budget may briefly run over its limit rather than fail the caller.
+        """
+        if not self._holds_slot():
+            yield
+            return
+
+        self._release()
+        ctx_token = _held_slot_ctx.set(None)
+        try:
+            yield
+        finally:
+            _held_slot_ctx.reset(ctx_token)
+            with self._cond:
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+
+    def _holds_slot(self) -> bool:
+        return _held_slot_ctx.get() == (self, threading.get_ident())
+
+    def _release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def _acquire(self, wait: float):
+        token = current_token()
+        remove = token.add_callback(self._wake) if token is not None else None
+        try:
+            with self._cond:
+                acquired = self._cond.wait_for(
+                    lambda: self.in_flight < self.limit or (token is not None and token.cancelled),
+                    timeout=wait
+                )
+                if token is not None and token.cancelled:
+                    raise OperationCancelledError(f"Request cancelled ({token.reason}).")
+                if not acquired:
+                    raise DelegationLimitError(
+                        f"Too many delegations in flight ({self.limit}); no slot freed up within {wait}s."
+                    )
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+        finally:
+            if remove is not None:
+                remove()
+
+    def _wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"in_flight": self.in_flight, "peak": self.peak, "limit": self.limit}
+
+
+def delegation_tree(activity: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Folds a request's activity log into its delegation tree.
+
+    Each delegation entry carries the chain it ran under; the result is a list of
+    roots shaped {"agent", "tasks": [summary, ...], "children": [...]}.
+    """
+    roots: List[Dict[str, Any]] = []
+    nodes: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+
+    def node_for(path: Tuple[str, ...]) -> Dict[str, Any]:
+        node = nodes.get(path)
+        if node is None:
+            node = {"agent": path[-1], "tasks": [], "children": []}
+            nodes[path] = node
+            siblings = node_for(path[:-1])["children"] if len(path) > 1 else roots
+            siblings.append(node)
+        return node
+
+    for entry in activity:
+        if entry.get("type") != "interaction" or entry.get("subtype") != "request" or not entry.get("chain"):
+            continue
+        node_for(tuple(entry["chain"]))["tasks"].append(entry.get("summary"))
+    return roots
@@ -0,0 +1,137 @@
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Any, FrozenSet, Iterable, List, Optional, Tuple
+from opencore.config import settings
+
+# Event types
+EVENT_ACTIVITY = "activity"  # entries of the swarm's activity log (lifecycle, interactions, ...)
+EVENT_GRAPH = "graph"  # graph journal changes: agents added, removed or updated, new edges
+EVENT_HEARTBEAT = "heartbeat"  # proactive heartbeat runs
+EVENT_DROPPED = "dropped"  # sent to a subscriber that fell behind, with how many events it missed
+
+
+class SubscriberLimitError(RuntimeError):
+    """Raised when a bus already has EVENT_MAX_SUBSCRIBERS subscribers."""
+    pass
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encodes an event as a Server-Sent Events message. Events without an `id` don't move the client's Last-Event-ID."""
+    data = json.dumps(event["data"], ensure_ascii=False, default=str)
+    event_id = f"id: {event['id']}\n" if "id" in event else ""
+    return f"{event_id}event: {event['type']}\ndata: {data}\n\n"
+
+
+class Subscription:
+    """
+    One subscriber's bounded buffer. Publishing never blocks: when the buffer is
+    full the oldest event is dropped and counted, and the subscriber is told how
+    many it missed. Consumed from an asyncio event loop with `get`.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop, buffer_size: int, types: Optional[FrozenSet[str]] = None):
+        self.types = types
+        self.buffer_size = max(1, buffer_size)
+        self.dropped = 0
+        self.closed = False
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._events: Deque[Dict[str, Any]] = deque()
+        self._unreported_drops = 0
+        self._wakeup = asyncio.Event()
+
+    def deliver(self, event: Dict[str, Any]) -> bool:
+        """Buffers an event (from any thread). Returns False if it pushed out an older one."""
+        if self.types is not None and event["type"] not in self.types:
+            return True
+        with self._lock:
+            kept = len(self._events) < self.buffer_size
+            if not kept:
+                self._events.popleft()
+                self.dropped += 1
+                self._unreported_drops += 1
+            self._events.append(event)
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # The consumer's event loop is gone
+            self.closed = True
+        return kept
+
+    async def get(self, timeout: float) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Waits up to `timeout` seconds for events and returns (events, dropped), where
+        `dropped` counts events lost since the previous call.
+        """
+        if not self._events:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._wakeup.clear()
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+            dropped, self._unreported_drops = self._unreported_drops, 0
+        return events, dropped
+
+
+class EventBus:
+    """
+    In-process pub/sub for a swarm's live events, fanned out to subscribers such as
+    the `/events` stream. Each subscriber has its own buffer of EVENT_BUFFER_SIZE
+    events, so a slow client loses its oldest events instead of growing memory.
+    """
+    def __init__(self, buffer_size: Optional[int] = None, max_subscribers: Optional[int] = None):
+        self._buffer_size = buffer_size
+        self._max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers: Tuple[Subscription, ...] = ()  # replaced, never mutated
+        self._seq = itertools.count(1)
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def max_subscribers(self) -> int:
+        return self._max_subscribers if self._max_subscribers is not None else settings.event_max_subscribers
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Sends an event to every subscriber without blocking. Safe from any thread."""
+        event = {"id": next(self._seq), "type": event_type, "time": time.time(), "data": data}
+        self.published += 1
+        for subscription in self._subscribers:
+            if not subscription.deliver(event):
+                self.dropped += 1
+        return event
+
+    def subscribe(self, types: Optional[Iterable[str]] = None) -> Subscription:
+        """
+        Registers a subscriber consumed on the running event loop.
+
+        :raises SubscriberLimitError: if the bus is at EVENT_MAX_SUBSCRIBERS.
+        """
+        subscription = Subscription(
+            asyncio.get_running_loop(),
+            self._buffer_size if self._buffer_size is not None else settings.event_buffer_size,
+            frozenset(types) if types else None
+        )
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise SubscriberLimitError(f"Too many event subscribers ({self.max_subscribers}).")
+            self._subscribers = self._subscribers + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.closed = True
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
@@ -9,3 +9,19 @@ class AgentNotFoundError(SwarmError):
 class AgentOperationError(SwarmError):
     """Raised when an operation on an agent is invalid (e.g. removing the main agent)."""
     pass
+
+class OperationCancelledError(SwarmError):
+    """Raised when an in-flight chat or delegation has been cancelled."""
+    pass
+
+class DelegationLimitError(SwarmError):
+    """Raised when a delegation would form a cycle, exceed the depth limit or find no free slot."""
+    pass
+
+class AgentBusyError(SwarmError):
+    """Raised when an agent's turn does not free up within AGENT_TURN_WAIT seconds."""
+    pass
+
+class FactConflictError(SwarmError):
+    """Raised when a blackboard fact is posted with an expected version that is no longer current."""
+    pass
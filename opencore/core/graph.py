@@ -0,0 +1,121 @@
+import threading
+import uuid
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Any, List, Optional, Tuple
+from opencore.config import settings
+
+# Change journal entry types
+NODE_ADDED = "node_added"
+NODE_REMOVED = "node_removed"
+NODE_UPDATED = "node_updated"
+EDGE_ADDED = "edge_added"
+
+
+class SwarmGraph:
+    """
+    Versioned view of a swarm's topology and interaction edges.
+
+    Every change (agent added or removed, status or last thought updated, new
+    interaction) bumps a monotonic version and is appended to a bounded journal, so
+    clients can fetch a delta with `changes(since)` instead of the whole graph.
+    Full snapshots are rebuilt at most once per version. `etag` combines the
+    version with a per-instance ID so a restarted or different swarm never matches.
+    `listener`, if given, is called with every journal entry as it is recorded.
+    """
+    def __init__(
+        self,
+        edge_source: Callable[[int], List[Dict[str, Any]]],
+        journal_size: Optional[int] = None,
+        listener: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self._edge_source = edge_source
+        self._listener = listener
+        self._lock = threading.Lock()
+        self._instance = uuid.uuid4().hex[:8]
+        self._version = 0
+        self._nodes: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._journal: Deque[Tuple[int, Dict[str, Any]]] = deque(
+            maxlen=journal_size or settings.graph_journal_size
+        )
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_version = -1
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def etag(self) -> str:
+        return f'"{self._instance}-{self._version}"'
+
+    def _record(self, change: Dict[str, Any]):
+        # Called with the lock held
+        self._version += 1
+        change["version"] = self._version
+        self._journal.append((self._version, change))
+        if self._listener is not None:
+            # Under the lock, so listeners see changes in version order; they must not block
+            self._listener(change)
+
+    def node_added(self, name: str, parent: Optional[str], status: str, last_thought: str):
+        node = {"id": name, "name": name, "parent": parent, "status": status, "last_thought": last_thought}
+        with self._lock:
+            self._nodes[name] = node
+            self._record({"type": NODE_ADDED, "node": dict(node)})
+
+    def node_removed(self, name: str):
+        with self._lock:
+            if self._nodes.pop(name, None) is not None:
+                self._record({"type": NODE_REMOVED, "id": name})
+
+    def node_updated(self, name: str, field: str, value: Any):
+        with self._lock:
+            node = self._nodes.get(name)
+            if node is None or node.get(field) == value:
+                return
+            # Replace rather than mutate, snapshots handed out earlier stay consistent
+            self._nodes[name] = {**node, field: value}
+            self._record({"type": NODE_UPDATED, "id": name, "fields": {field: value}})
+
+    def edge_added(self, edge: Dict[str, Any]):
+        with self._lock:
+            self._record({"type": EDGE_ADDED, "edge": dict(edge)})
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns {"version", "nodes", "edges"}. The result is shared between callers
+        until the next change and must be treated as read-only.
+        """
+        with self._lock:
+            if self._snapshot is not None and self._snapshot_version == self._version:
+                return self._snapshot
+            version = self._version
+            nodes = list(self._nodes.values())
+
+        snapshot = {"version": version, "nodes": nodes, "edges": self._edge_source(settings.graph_max_edges)}
+        with self._lock:
+            # A change may have landed while edges were read; only cache if still current
+            if self._version == version:
+                self._snapshot = snapshot
+                self._snapshot_version = version
+        return snapshot
+
+    def changes(self, since: int) -> Dict[str, Any]:
+        """
+        Returns the journal entries after version `since`.
+        `reset` is True when the delta can't be served (the journal no longer reaches
+        back that far, or `since` is from another instance), and the client should
+        fetch a full snapshot instead.
+        """
+        with self._lock:
+            version = self._version
+            entries = list(self._journal)
+
+        oldest = entries[0][0] if entries else version + 1
+        if since > version or since < oldest - 1:
+            return {"version": version, "reset": True, "changes": []}
+        return {
+            "version": version,
+            "reset": False,
+            "changes": [change for entry_version, change in entries if entry_version > since],
+        }
@@ -0,0 +1,146 @@
+import datetime
+import itertools
+import time
+from typing import Dict, Any, Iterator, List, Optional
+from opencore.config import settings
+
+
+class Interaction:
+    """A single agent-to-agent exchange. Slotted to keep thousands of records cheap."""
+    __slots__ = ("seq", "source", "target", "summary", "created")
+
+    def __init__(self, seq: int, source: str, target: str, summary: str, created: float):
+        self.seq = seq
+        self.source = source
+        self.target = target
+        self.summary = summary
+        self.created = created  # Unix time, used for time-range queries
+
+    @property
+    def timestamp(self) -> str:
+        return datetime.datetime.fromtimestamp(self.created).isoformat()
+
+    def involves(self, agent: str) -> bool:
+        return self.source == agent or self.target == agent
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "source": self.source,
+            "target": self.target,
+            "summary": self.summary,
+            "timestamp": self.timestamp,
+        }
+
+
+class InteractionLog:
+    """
+    Bounded ring buffer of interactions with monotonic sequence numbers.
+
+    Appends take no lock: a writer claims a sequence number from an atomic counter
+    and stores its record in the slot that number maps to, and both steps are single
+    operations under the GIL. Readers copy the slots and keep the contiguous run of
+    the current window, so a record whose writer hasn't stored it yet hides the newer
+    ones until it lands instead of leaving a hole `since` polling would skip.
+    """
+    def __init__(self, maxlen: Optional[int] = None):
+        self._maxlen = maxlen or settings.interaction_log_size
+        self._slots: List[Optional[Interaction]] = [None] * self._maxlen
+        self._seq = itertools.count(1)
+
+    @property
+    def maxlen(self) -> int:
+        return self._maxlen
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest published record (0 if empty)."""
+        records = self.snapshot()
+        return records[-1].seq if records else 0
+
+    def append(self, source: str, target: str, summary: str, created: Optional[float] = None) -> Interaction:
+        record = Interaction(0, source, target, summary, created if created is not None else time.time())
+        # Nothing that can fail runs between claiming a number and storing the record
+        record.seq = next(self._seq)
+        self._slots[(record.seq - 1) % self._maxlen] = record
+        return record
+
+    def snapshot(self) -> List[Interaction]:
+        """Published records, oldest first, with contiguous sequence numbers."""
+        # Slots are filled in sequence order, so this is two sorted runs and sorts in linear time
+        records = sorted((r for r in self._slots[:] if r is not None), key=lambda r: r.seq)
+        if not records:
+            return records
+
+        # Drop records a claimed-but-unstored slot has logically evicted, then stop at the first gap
+        window_start = records[-1].seq - self._maxlen + 1
+        run: List[Interaction] = []
+        for record in records:
+            if record.seq < window_start:
+                continue
+            if run and record.seq != run[-1].seq + 1:
+                break
+            run.append(record)
+        return run
+
+    def __iter__(self) -> Iterator[Interaction]:
+        return iter(self.snapshot())
+
+    def __len__(self) -> int:
+        return len(self.snapshot())
+
+    def latest(self, n: int) -> List[Interaction]:
+        records = self.snapshot()
+        return records[-n:] if n > 0 else []
+
+    def query(
+        self,
+        agent: Optional[str] = None,
+        since_seq: Optional[int] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[Interaction]:
+        """
+        Returns matching records, oldest first.
+
+        :param agent: Only exchanges where this agent is source or target.
+        :param since_seq: Only records with a sequence number greater than this.
+        :param start: Only records created at or after this Unix time.
+        :param end: Only records created before this Unix time.
+        :param limit: Return at most this many (the most recent ones).
+        """
+        records = self.snapshot()
+        if since_seq is not None and records:
+            # Sequence numbers are contiguous, so the offset can be computed directly
+            offset = max(0, since_seq - records[0].seq + 1)
+            records = records[offset:]
+
+        result = [
+            r for r in records
+            if (agent is None or r.involves(agent))
+            and (start is None or r.created >= start)
+            and (end is None or r.created < end)
+        ]
+        if limit is not None:
+            result = result[-limit:] if limit > 0 else []
+        return result
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [r.to_dict() for r in self.snapshot()]
+
+    def restore(self, records: List[Dict[str, Any]]) -> List[Interaction]:
+        """
+        Re-appends exported records (e.g. from a spilled session or another replica)
+        and returns them; sequence numbers are reassigned.
+        """
+        restored = []
+        for record in records:
+            created = None
+            if record.get("timestamp"):
+                try:
+                    created = datetime.datetime.fromisoformat(record["timestamp"]).timestamp()
+                except ValueError:
+                    pass
+            restored.append(self.append(record["source"], record["target"], record["summary"], created=created))
+        return restored
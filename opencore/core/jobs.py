@@ -0,0 +1,163 @@
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Any, List, Optional
+from opencore.config import settings
+from opencore.core.cancellation import CancellationToken
+from opencore.core.context import activity_log_ctx, cancel_token_ctx, request_id_ctx
+
+# Job lifecycle states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_JOB_STATES = {JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED}
+
+
+class JobLimitError(RuntimeError):
+    """Raised when MAX_PENDING_JOBS jobs are already queued or running."""
+    pass
+
+
+@dataclass
+class ChatJob:
+    id: str
+    token: CancellationToken
+    status: str = JOB_QUEUED
+    activity_log: List[Dict[str, Any]] = field(default_factory=list)  # filled while the job runs
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_JOB_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "activity_log": list(self.activity_log),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Runs long chats off the request path.
+
+    `submit` queues a job on a pool of MAX_CONCURRENT_JOBS workers and returns it
+    at once; clients poll `get` for status, the activity log so far and the final
+    result. At most MAX_PENDING_JOBS jobs may be queued or running, and finished
+    jobs are kept for JOB_RETENTION seconds.
+    """
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        retention: Optional[float] = None
+    ):
+        self.max_workers = max_workers or settings.max_concurrent_jobs
+        self.max_pending = max_pending or settings.max_pending_jobs
+        self.retention = retention if retention is not None else settings.job_retention
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, ChatJob]" = OrderedDict()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created lazily so processes that never take jobs don't hold a pool
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="chat-job")
+            return self._executor
+
+    def submit(self, runner: Callable[[], Dict[str, Any]]) -> ChatJob:
+        """
+        Queues `runner()` and returns the job record. The runner's return value becomes the job result.
+
+        :raises JobLimitError: if MAX_PENDING_JOBS jobs are already queued or running.
+        """
+        job = ChatJob(id=f"job_{uuid.uuid4().hex[:12]}", token=CancellationToken())
+        with self._lock:
+            self._prune()
+            pending = sum(1 for existing in self._jobs.values() if not existing.finished)
+            if pending >= self.max_pending:
+                raise JobLimitError(f"Too many jobs in progress ({self.max_pending}). Retry later.")
+            self._jobs[job.id] = job
+
+        # Fresh context: the job must not share the submitting request's activity log or token
+        ctx = contextvars.Context()
+        self._get_executor().submit(ctx.run, self._run, job, runner)
+        return job
+
+    def _run(self, job: ChatJob, runner: Callable[[], Dict[str, Any]]):
+        request_id_ctx.set(job.id)
+        activity_log_ctx.set(job.activity_log)
+        cancel_token_ctx.set(job.token)
+        if job.token.cancelled:
+            self._finish(job, JOB_CANCELLED, error="Job cancelled before it started.")
+            return
+
+        job.started_at = time.time()
+        job.status = JOB_RUNNING
+        try:
+            result = runner()
+        except Exception as e:
+            self._finish(job, JOB_FAILED, error=str(e))
+            return
+        self._finish(job, JOB_CANCELLED if job.token.cancelled else JOB_COMPLETED, result=result)
+
+    def _finish(self, job: ChatJob, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.status = status
+
+    def _prune(self):
+        # Called with the lock held; drops finished jobs past their retention window
+        cutoff = time.time() - self.retention
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[ChatJob]:
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Requests cancellation of a queued or running job. Returns False if it's unknown or finished."""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.token.cancel("cancelled by client")
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "queued": sum(1 for job in jobs if job.status == JOB_QUEUED),
+            "running": sum(1 for job in jobs if job.status == JOB_RUNNING),
+            "retained": sum(1 for job in jobs if job.finished),
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if not job.finished:
+                job.token.cancel("shutdown")
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,169 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
+from opencore.config import settings
+from opencore.core.context import cancel_token_ctx
+from opencore.core.exceptions import OperationCancelledError, AgentBusyError
+
+# Turn lanes, highest priority first
+LANE_USER = "user"
+LANE_DELEGATION = "delegation"
+LANE_HEARTBEAT = "heartbeat"
+LANE_PRIORITIES = {LANE_USER: 0, LANE_DELEGATION: 1, LANE_HEARTBEAT: 2}
+
+# Mailboxes whose turn is held by the current call chain. A nested call into an
+# agent that is already running higher up the same chain (A -> B -> A) must not
+# wait for itself, so such turns are entered re-entrantly.
+_held_mailboxes_ctx: ContextVar[FrozenSet[int]] = ContextVar("held_mailboxes", default=frozenset())
+
+
+def release_held_turns():
+    """
+    Forgets the turns held by the current call chain.
+    Used by work that runs beside or after its caller's turn (background tasks,
+    parallel delegations, workflow steps), which must queue normally instead of
+    re-entering the caller's agent in the middle of its turn.
+    """
+    _held_mailboxes_ctx.set(frozenset())
+
+
+class _LaneStats:
+    __slots__ = ("waiting", "completed", "total_wait", "max_wait")
+
+    def __init__(self):
+        self.waiting = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        avg = self.total_wait / self.completed if self.completed else 0.0
+        return {
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "avg_wait_ms": round(avg * 1000, 2),
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+
+class AgentMailbox:
+    """
+    Serializes turns for a single agent.
+
+    Only one turn (a user message, delegated task or heartbeat) runs against an
+    agent's history at a time; other agents are unaffected. Waiting turns are
+    admitted by lane priority and then in arrival order, so interactive user turns
+    overtake queued heartbeat work. Turns run on the caller's thread.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._cond = threading.Condition()
+        self._busy = False
+        self._current_lane: Optional[str] = None
+        self._queue: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._stats: Dict[str, _LaneStats] = {lane: _LaneStats() for lane in LANE_PRIORITIES}
+        # Monotonic time the last turn started or finished, used to find idle agents
+        self.last_active = time.monotonic()
+
+    @property
+    def busy(self) -> bool:
+        return self._busy
+
+    @property
+    def depth(self) -> int:
+        """Number of turns waiting to run."""
+        return len(self._queue)
+
+    @contextmanager
+    def turn(self, lane: str = LANE_USER, wait: Optional[float] = None):
+        """
+        Blocks until this caller may run a turn on the agent, then holds it for the block.
+
+        :raises AgentBusyError: if the turn doesn't free up within `wait` seconds (AGENT_TURN_WAIT by default).
+        :raises OperationCancelledError: if the request is cancelled while waiting.
+        """
+        if lane not in LANE_PRIORITIES:
+            raise ValueError(f"Unknown lane '{lane}'.")
+
+        held = _held_mailboxes_ctx.get()
+        if id(self) in held:
+            yield
+            return
+
+        self._acquire(lane, settings.agent_turn_wait if wait is None else wait)
+        ctx_token = _held_mailboxes_ctx.set(held | {id(self)})
+        try:
+            yield
+        finally:
+            _held_mailboxes_ctx.reset(ctx_token)
+            self._release()
+
+    def _acquire(self, lane: str, wait: float):
+        ticket = (LANE_PRIORITIES[lane], next(self._seq))
+        stats = self._stats[lane]
+        start = time.monotonic()
+        deadline = start + wait if wait > 0 else None
+
+        cancel_token = cancel_token_ctx.get()
+        remove_callback = None
+        if cancel_token is not None:
+            remove_callback = cancel_token.add_callback(self._wake)
+
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            stats.waiting += 1
+            try:
+                while self._busy or self._queue[0] != ticket:
+                    cancelled = cancel_token is not None and cancel_token.cancelled
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if cancelled or (remaining is not None and remaining <= 0):
+                        self._queue.remove(ticket)
+                        heapq.heapify(self._queue)
+                        # Our ticket may have been the head another waiter was blocked on
+                        self._cond.notify_all()
+                        if cancelled:
+                            raise OperationCancelledError("Request cancelled while waiting for agent turn.")
+                        raise AgentBusyError(
+                            f"Agent '{self.name}' stayed busy for {wait:g}s; it may be waiting on this request. "
+                            f"Continue without it or try again later."
+                        )
+                    self._cond.wait(remaining)
+
+                heapq.heappop(self._queue)
+                self._busy = True
+                self._current_lane = lane
+                self.last_active = time.monotonic()
+            finally:
+                stats.waiting -= 1
+                if remove_callback:
+                    remove_callback()
+
+            waited = time.monotonic() - start
+            stats.completed += 1
+            stats.total_wait += waited
+            stats.max_wait = max(stats.max_wait, waited)
+
+    def _release(self):
+        with self._cond:
+            self._busy = False
+            self._current_lane = None
+            self.last_active = time.monotonic()
+            self._cond.notify_all()
+
+    def _wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "busy": self._busy,
+                "current_lane": self._current_lane,
+                "queue_depth": len(self._queue),
+                "lanes": {lane: stats.to_dict() for lane, stats in self._stats.items()},
+            }
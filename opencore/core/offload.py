@@ -0,0 +1,183 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import socket
+import time
+import uuid
+from typing import Callable, Dict, Any, List, Optional
+from opencore.core.attachments import attachment_store
+
+logger = logging.getLogger("opencore.offload")
+
+# Tells this process's snapshot directory apart from one left by an earlier process with the same pid
+_PROCESS_TOKEN = uuid.uuid4().hex[:8]
+_PROCESS_DIR_PATTERN = re.compile(r"^(?P<host>.+)-(?P<pid>\d+)-[0-9a-f]{8}$")
+
+
+def process_offload_dir(root: str) -> str:
+    """This process's directory under `root`; each swarm offloads into a subdirectory of it."""
+    return os.path.join(root, f"{socket.gethostname()}-{os.getpid()}-{_PROCESS_TOKEN}")
+
+
+def remove_process_offload_dir(root: str):
+    """Deletes every snapshot this process wrote under `root`. Call on shutdown."""
+    shutil.rmtree(process_offload_dir(root), ignore_errors=True)
+
+
+def sweep_offload_dirs(root: str) -> int:
+    """
+    Deletes snapshot directories under `root` left by processes on this host that are no
+    longer running (e.g. after a crash). Directories of other hosts sharing `root` are left
+    alone. Returns the number removed.
+    """
+    try:
+        entries = os.listdir(root)
+    except FileNotFoundError:
+        return 0
+
+    host, own = socket.gethostname(), os.path.basename(process_offload_dir(root))
+    removed = 0
+    for entry in entries:
+        match = _PROCESS_DIR_PATTERN.match(entry)
+        if entry == own or match is None or match.group("host") != host:
+            continue
+        pid = int(match.group("pid"))
+        # A directory with our own pid but another token was left by an earlier process
+        if pid != os.getpid() and _pid_alive(pid):
+            continue
+        shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+        removed += 1
+    if removed:
+        logger.info(f"Removed {removed} orphaned agent offload directories from {root}")
+    return removed
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # No signal-free liveness check without extra dependencies; keep the directory
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class AgentOffloadStore:
+    """
+    Directory of offloaded agent snapshots, one owner-readable JSON file per agent.
+    File names are hashes of the agent name, so any name is safe on disk.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path_for(self, name: str) -> str:
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def save(self, name: str, state: Dict[str, Any], attachments: Dict[str, Any]) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"state": state, "attachments": attachments}, f)
+        # Chat histories are private, keep them owner-readable only
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+        return path
+
+    def load(self, path: str) -> Dict[str, Any]:
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def delete(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Removes the directory and every snapshot in it."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class OffloadedAgent:
+    """
+    Lightweight stand-in for an agent whose history was offloaded to disk.
+
+    It keeps only what the registry, graph and state store need (definition, status,
+    last thought). `chat` hydrates the full agent through the swarm first, so code
+    holding the stub doesn't need to know the agent was offloaded.
+    """
+    __slots__ = (
+        "name", "role", "system_prompt", "model", "is_custom_model", "created_by", "template",
+        "client", "on_change", "path", "offloaded_at", "_store", "_hydrate", "_status", "_last_thought"
+    )
+
+    def __init__(
+        self,
+        agent: Any,
+        store: AgentOffloadStore,
+        path: str,
+        hydrate: Callable[[str], Any]
+    ):
+        self.name = agent.name
+        self.role = agent.role
+        self.system_prompt = agent.system_prompt
+        self.model = agent.model
+        self.is_custom_model = agent.is_custom_model
+        self.created_by = agent.created_by
+        self.template = getattr(agent, "template", None)
+        self.client = None
+        self.on_change: Optional[Callable[[str, str, Any], None]] = None
+        self.path = path
+        self.offloaded_at = time.time()
+        self._store = store
+        self._hydrate = hydrate
+        self._status = agent.status
+        self._last_thought = agent.last_thought
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, value: str):
+        self._status = value
+        if self.on_change is not None:
+            self.on_change(self.name, "status", value)
+
+    @property
+    def last_thought(self) -> str:
+        return self._last_thought
+
+    @last_thought.setter
+    def last_thought(self, value: str):
+        self._last_thought = value
+        if self.on_change is not None:
+            self.on_change(self.name, "last_thought", value)
+
+    def export_state(self) -> Dict[str, Any]:
+        """Reads the offloaded snapshot back. Attachment payloads are returned to the attachment store."""
+        data = self._store.load(self.path)
+        for content in data.get("attachments", {}).values():
+            attachment_store.put(content)
+        state = data["state"]
+        state.update(status=self._status, last_thought=self._last_thought, model=self.model)
+        return state
+
+    def attachment_refs(self) -> List[str]:
+        messages = self._store.load(self.path)["state"].get("messages", [])
+        return [
+            part["ref"]
+            for msg in messages if isinstance(msg.get("content"), list)
+            for part in msg["content"] if part.get("type") == "attachment"
+        ]
+
+    def chat(self, *args, **kwargs) -> str:
+        return self._hydrate(self.name).chat(*args, **kwargs)
@@ -0,0 +1,577 @@
+import atexit
+import contextvars
+import itertools
+import logging
+import multiprocessing
+import signal
+import threading
+import uuid
+import weakref
+import zlib
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Any, List, Optional
+from opencore.config import settings
+from opencore.core.agent import Agent
+from opencore.core.cancellation import CancellationToken
+from opencore.core.context import cancel_token_ctx
+from opencore.core.exceptions import AgentOperationError, OperationCancelledError, AgentBusyError
+from opencore.core.mailbox import AgentMailbox, LANE_USER
+from opencore.tools.base import register_base_tools
+
+logger = logging.getLogger("opencore.process_pool")
+
+# Agent placement strategies (AGENT_PLACEMENT)
+PLACEMENT_ROUND_ROBIN = "round_robin"
+PLACEMENT_LEAST_LOADED = "least_loaded"
+PLACEMENT_HASH = "hash"
+PLACEMENT_STRATEGIES = {PLACEMENT_ROUND_ROBIN, PLACEMENT_LEAST_LOADED, PLACEMENT_HASH}
+
+# How often a blocked RPC checks that its worker process is still alive
+LIVENESS_POLL_INTERVAL = 1.0
+
+
+def build_agent(state: Dict[str, Any]) -> Agent:
+    """Default worker-side agent factory: a plain Agent with the base tools."""
+    agent = Agent(
+        state["name"], state["role"], state["system_prompt"],
+        model=state["model"], is_custom_model=state.get("is_custom_model", False),
+        created_by=state.get("created_by")
+    )
+    register_base_tools(agent)
+    if state.get("messages"):
+        agent.load_state(state)
+    return agent
+
+
+# --- Worker process side ---
+
+# Request ID of the chat a worker thread is serving, so tool calls can name their origin
+_origin_ctx: ContextVar[Optional[str]] = ContextVar("origin", default=None)
+
+
+class _UnqueuedMailbox(AgentMailbox):
+    """
+    Turns are already queued by the RemoteAgent proxy in the parent, so worker-side
+    agents don't queue again (a nested A -> B -> A call would wait on itself here).
+    """
+    @contextmanager
+    def turn(self, lane: str = LANE_USER):
+        yield
+
+
+class _WorkerToolCatalog:
+    """Worker-side stand-in for the swarm's ToolCatalog; tool calls are sent back to the parent."""
+    def __init__(self, worker: "_Worker", agent_key: str):
+        self._worker = worker
+        self._agent_key = agent_key
+        self._definitions: List[Dict[str, Any]] = []
+        self._names: frozenset = frozenset()
+
+    def update(self, definitions: List[Dict[str, Any]]):
+        self._definitions = definitions
+        self._names = frozenset(schema["function"]["name"] for schema in definitions)
+
+    def names(self, scope: str) -> frozenset:
+        return self._names
+
+    def definitions(self, scope: str) -> List[Dict[str, Any]]:
+        return self._definitions
+
+    def bind(self, name: str, caller: str, scope: str) -> Optional[Callable[..., str]]:
+        if name not in self._names:
+            return None
+
+        def call(*args, **kwargs):
+            return self._worker.call_tool(self._agent_key, name, args, kwargs)
+        return call
+
+
+class _Worker:
+    """Hosts agents inside a worker process and serves the broker's requests."""
+    def __init__(self, worker_id: int, inbox, outbox, agent_factory: Callable[[Dict[str, Any]], Agent]):
+        self.worker_id = worker_id
+        self.inbox = inbox
+        self.outbox = outbox
+        self.agent_factory = agent_factory
+        self.agents: Dict[str, Agent] = {}
+        self.catalogs: Dict[str, _WorkerToolCatalog] = {}
+        self.turns: Dict[str, CancellationToken] = {}
+        self._lock = threading.Lock()
+        self._tool_calls: Dict[str, Future] = {}
+        self._call_ids = itertools.count(1)
+
+    def serve(self):
+        while True:
+            msg = self.inbox.get()
+            op = msg["op"]
+            if op == "shutdown":
+                break
+            try:
+                self._handle(op, msg)
+            except Exception as e:
+                logger.exception(f"Worker {self.worker_id} failed to handle '{op}'")
+                if "id" in msg:
+                    self.outbox.put({"op": "result", "id": msg["id"], "error": str(e)})
+
+    def _handle(self, op: str, msg: Dict[str, Any]):
+        if op == "create":
+            key = msg["agent"]
+            agent = self.agent_factory(msg["state"])
+            agent.mailbox = _UnqueuedMailbox(agent.name)
+            catalog = _WorkerToolCatalog(self, key)
+            agent.use_tool_catalog(catalog, msg["scope"])
+            agent.on_change = lambda name, field, value: self.outbox.put(
+                {"op": "changed", "agent": key, "field": field, "value": value}
+            )
+            self.agents[key] = agent
+            self.catalogs[key] = catalog
+            self.outbox.put({"op": "result", "id": msg["id"], "result": True})
+        elif op == "remove":
+            self.agents.pop(msg["agent"], None)
+            self.catalogs.pop(msg["agent"], None)
+        elif op == "chat":
+            # Registered before the thread starts so an early cancel isn't lost
+            token = CancellationToken()
+            self.turns[msg["id"]] = token
+            # Each turn gets its own thread so agents on this worker run concurrently
+            threading.Thread(target=self._run_chat, args=(msg, token), daemon=True).start()
+        elif op == "cancel":
+            token = self.turns.get(msg["id"])
+            if token is not None:
+                token.cancel("cancelled by parent")
+        elif op == "tool_result":
+            with self._lock:
+                future = self._tool_calls.pop(msg["id"], None)
+            if future is not None:
+                future.set_result(msg["result"])
+        elif op == "export":
+            self.outbox.put({"op": "result", "id": msg["id"], "result": self.agents[msg["agent"]].export_state()})
+        elif op == "load":
+            self.agents[msg["agent"]].load_state(msg["state"])
+            self.outbox.put({"op": "result", "id": msg["id"], "result": True})
+        elif op == "reload":
+            settings.reload()
+
+    def _run_chat(self, msg: Dict[str, Any], token: CancellationToken):
+        request_id = msg["id"]
+        cancel_token_ctx.set(token)
+        _origin_ctx.set(request_id)
+        try:
+            agent = self.agents.get(msg["agent"])
+            if agent is None:
+                raise AgentOperationError(f"Agent '{msg['agent']}' is not hosted on worker {self.worker_id}.")
+            agent.model = msg["model"]
+            agent.is_custom_model = msg["is_custom_model"]
+            if agent.status != msg["status"]:
+                agent.status = msg["status"]
+            if "tools" in msg:
+                self.catalogs[msg["agent"]].update(msg["tools"])
+            result = agent.chat(msg["message"], attachments=msg.get("attachments"), lane=msg["lane"])
+            self.outbox.put({"op": "result", "id": request_id, "result": result})
+        except Exception as e:
+            self.outbox.put({"op": "result", "id": request_id, "error": str(e)})
+        finally:
+            self.turns.pop(request_id, None)
+
+    def call_tool(self, agent_key: str, tool: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+        """Runs a swarm tool in the parent on behalf of a hosted agent and waits for the result."""
+        call_id = f"w{self.worker_id}-{next(self._call_ids)}"
+        future: Future = Future()
+        with self._lock:
+            self._tool_calls[call_id] = future
+        self.outbox.put({
+            "op": "tool_call", "id": call_id, "worker": self.worker_id, "origin": _origin_ctx.get(),
+            "agent": agent_key, "tool": tool, "args": list(args), "kwargs": kwargs
+        })
+
+        def abandon():
+            # Whoever removes the entry first (this or the tool_result handler) resolves it
+            with self._lock:
+                pending = self._tool_calls.pop(call_id, None)
+            if pending is not None:
+                pending.set_result("Error: Request cancelled.")
+
+        token = cancel_token_ctx.get()
+        remove_callback = token.add_callback(abandon) if token is not None else None
+        try:
+            return future.result()
+        finally:
+            if remove_callback:
+                remove_callback()
+            with self._lock:
+                self._tool_calls.pop(call_id, None)
+
+
+def _worker_main(worker_id: int, inbox, outbox, agent_factory: Callable[[Dict[str, Any]], Agent]):
+    # The parent handles Ctrl+C and shuts workers down explicitly
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _Worker(worker_id, inbox, outbox, agent_factory).serve()
+
+
+# --- Parent process side ---
+
+class ProcessBroker:
+    """
+    Runs agents in a pool of worker processes and relays messages to them over
+    multiprocessing queues.
+
+    Each worker hosts some agents and runs their turns on threads, so CPU-heavy
+    tool work is spread across cores instead of sharing one GIL. Tool calls that
+    need the swarm (delegate_task, create_agent, ...) are sent back to the parent
+    and run there in the calling turn's context. Agents are assigned to workers by
+    `placement`: round_robin, least_loaded (fewest agents) or hash (stable by name).
+    """
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        placement: Optional[str] = None,
+        agent_factory: Callable[[Dict[str, Any]], Agent] = build_agent
+    ):
+        self.processes = processes or settings.worker_processes or multiprocessing.cpu_count()
+        self.placement = placement or settings.agent_placement
+        if self.placement not in PLACEMENT_STRATEGIES:
+            raise ValueError(f"Unknown agent placement '{self.placement}'. Use one of {sorted(PLACEMENT_STRATEGIES)}.")
+        self.agent_factory = agent_factory
+
+        self._lock = threading.Lock()
+        self._started = False
+        self._workers: List[multiprocessing.Process] = []
+        self._inboxes: List[Any] = []
+        self._outbox = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._pending: Dict[str, Future] = {}
+        self._origins: Dict[str, contextvars.Context] = {}
+        self._agents: "weakref.WeakValueDictionary[str, RemoteAgent]" = weakref.WeakValueDictionary()
+        self._load: List[int] = [0] * self.processes  # agents placed per worker
+        self._round_robin = itertools.count()
+        self._request_ids = itertools.count(1)
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            # spawn: forking a process that already runs server threads is unsafe
+            mp = multiprocessing.get_context("spawn")
+            self._outbox = mp.Queue()
+            for worker_id in range(self.processes):
+                inbox = mp.Queue()
+                process = mp.Process(
+                    target=_worker_main, args=(worker_id, inbox, self._outbox, self.agent_factory),
+                    name=f"opencore-worker-{worker_id}", daemon=True
+                )
+                process.start()
+                self._inboxes.append(inbox)
+                self._workers.append(process)
+            self._dispatcher = threading.Thread(target=self._dispatch, name="broker-dispatch", daemon=True)
+            self._dispatcher.start()
+            self._started = True
+        logger.info(f"Started {self.processes} agent worker processes ({self.placement} placement).")
+
+    def shutdown(self):
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for inbox in self._inboxes:
+            inbox.put({"op": "shutdown"})
+        self._outbox.put({"op": "shutdown"})
+        for process in self._workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for future in pending:
+            if not future.done():
+                future.set_exception(AgentOperationError("Worker pool shut down."))
+        self._workers, self._inboxes = [], []
+
+    @property
+    def running(self) -> bool:
+        return self._started
+
+    def place(self, name: str) -> int:
+        """Chooses the worker that will host a new agent."""
+        with self._lock:
+            if self.placement == PLACEMENT_HASH:
+                worker = zlib.crc32(name.encode("utf-8")) % self.processes
+            elif self.placement == PLACEMENT_LEAST_LOADED:
+                worker = min(range(self.processes), key=lambda i: self._load[i])
+            else:
+                worker = next(self._round_robin) % self.processes
+            self._load[worker] += 1
+        return worker
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"worker": i, "pid": process.pid, "alive": process.is_alive(), "agents": self._load[i]}
+                for i, process in enumerate(self._workers)
+            ]
+
+    def send(self, worker: int, msg: Dict[str, Any]):
+        self._inboxes[worker].put(msg)
+
+    def broadcast(self, msg: Dict[str, Any]):
+        for inbox in list(self._inboxes):
+            inbox.put(msg)
+
+    def request(
+        self,
+        worker: int,
+        msg: Dict[str, Any],
+        context: Optional[contextvars.Context] = None,
+        on_sent: Optional[Callable[[str], None]] = None
+    ) -> Any:
+        """
+        Sends a request to a worker and blocks until it answers.
+        `context` is used to run tool calls the request makes back into the parent;
+        `on_sent` receives the request ID once the message is on its way.
+        """
+        request_id = f"r{next(self._request_ids)}"
+        future: Future = Future()
+        with self._lock:
+            if not self._started:
+                raise AgentOperationError("Worker pool is not running.")
+            self._pending[request_id] = future
+            if context is not None:
+                self._origins[request_id] = context
+        try:
+            self.send(worker, {**msg, "id": request_id})
+            if on_sent is not None:
+                on_sent(request_id)
+            while True:
+                try:
+                    return future.result(timeout=LIVENESS_POLL_INTERVAL)
+                except FuturesTimeoutError:
+                    if not self._workers[worker].is_alive():
+                        raise AgentOperationError(f"Worker process {worker} exited.")
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+                self._origins.pop(request_id, None)
+
+    def register(self, agent: "RemoteAgent", state: Dict[str, Any], scope: Optional[str]):
+        with self._lock:
+            self._agents[agent.key] = agent
+        self.request(agent.worker, {"op": "create", "agent": agent.key, "state": state, "scope": scope})
+
+    def unregister(self, key: str, worker: int):
+        with self._lock:
+            if not self._started:
+                return
+            self._load[worker] = max(0, self._load[worker] - 1)
+        self.send(worker, {"op": "remove", "agent": key})
+
+    def _dispatch(self):
+        while True:
+            try:
+                msg = self._outbox.get()
+            except (EOFError, OSError):
+                return
+            op = msg["op"]
+            if op == "shutdown":
+                return
+            if op == "result":
+                with self._lock:
+                    future = self._pending.get(msg["id"])
+                if future is not None and not future.done():
+                    if "error" in msg:
+                        future.set_exception(AgentOperationError(msg["error"]))
+                    else:
+                        future.set_result(msg["result"])
+            elif op == "changed":
+                agent = self._agents.get(msg["agent"])
+                if agent is not None:
+                    agent._apply_remote_change(msg["field"], msg["value"])
+            elif op == "tool_call":
+                with self._lock:
+                    origin = self._origins.get(msg["origin"])
+                ctx = origin.copy() if origin is not None else contextvars.copy_context()
+                # Tool calls may delegate and block for a long time, so each gets a thread
+                threading.Thread(target=ctx.run, args=(self._run_tool, msg), daemon=True).start()
+
+    def _run_tool(self, msg: Dict[str, Any]):
+        agent = self._agents.get(msg["agent"])
+        func = None
+        if agent is not None and agent.tool_catalog is not None:
+            func = agent.tool_catalog.bind(msg["tool"], agent.name, agent.tool_scope)
+        if func is None:
+            result = f"Error: Tool {msg['tool']} not found."
+        else:
+            try:
+                result = func(*msg["args"], **msg["kwargs"])
+            except Exception as e:
+                result = f"Error: {str(e)}"
+        self.send(msg["worker"], {"op": "tool_result", "id": msg["id"], "result": result})
+
+
+class RemoteAgent:
+    """
+    Parent-side proxy for an agent hosted in a worker process.
+
+    Turns are queued on a local mailbox, so lanes, re-entrant call chains and
+    queue stats behave as for local agents; the turn itself runs in the worker.
+    Status and last thought are mirrored from the worker for the graph.
+    """
+    def __init__(
+        self,
+        broker: ProcessBroker,
+        name: str,
+        role: str,
+        system_prompt: str,
+        model: str = "gpt-4o",
+        is_custom_model: bool = False,
+        created_by: Optional[str] = None
+    ):
+        self.broker = broker
+        self.name = name
+        self.role = role
+        self.system_prompt = system_prompt
+        self.model = model
+        self.is_custom_model = is_custom_model
+        self.created_by = created_by
+        self.client = None
+        self.on_change: Optional[Callable[[str, str, Any], None]] = None
+        self._status = "active"
+        self._last_thought = "Idle"
+        self.tool_catalog = None
+        self.tool_scope: Optional[str] = None
+        self._sent_catalog_version: Optional[int] = None
+        self.mailbox = AgentMailbox(name)
+        self.key = f"{uuid.uuid4().hex[:12]}:{name}"
+        self.worker: Optional[int] = None
+        self._finalizer = None
+
+    def start(self, messages: Optional[List[Dict[str, Any]]] = None):
+        """Places the agent on a worker and creates it there."""
+        self.broker.start()
+        self.worker = self.broker.place(self.name)
+        state = {
+            "name": self.name, "role": self.role, "system_prompt": self.system_prompt,
+            "model": self.model, "is_custom_model": self.is_custom_model, "created_by": self.created_by,
+            "messages": messages,
+        }
+        self.broker.register(self, state, self.tool_scope)
+        # Frees the worker-side agent once the proxy is dropped
+        self._finalizer = weakref.finalize(self, self.broker.unregister, self.key, self.worker)
+
+    def close(self):
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def use_tool_catalog(self, catalog: Any, scope: str):
+        self.tool_catalog = catalog
+        self.tool_scope = scope
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, value: str):
+        self._status = value
+        if self.on_change is not None:
+            self.on_change(self.name, "status", value)
+
+    @property
+    def last_thought(self) -> str:
+        return self._last_thought
+
+    @last_thought.setter
+    def last_thought(self, value: str):
+        self._last_thought = value
+        if self.on_change is not None:
+            self.on_change(self.name, "last_thought", value)
+
+    def _apply_remote_change(self, field: str, value: Any):
+        if field == "status":
+            self.status = value
+        elif field == "last_thought":
+            self.last_thought = value
+
+    @property
+    def messages(self) -> List[Dict[str, Any]]:
+        return self.export_state()["messages"]
+
+    def export_state(self) -> Dict[str, Any]:
+        state = self.broker.request(self.worker, {"op": "export", "agent": self.key})
+        state.update(model=self.model, is_custom_model=self.is_custom_model, status=self._status)
+        return state
+
+    def load_state(self, state: Dict[str, Any]):
+        self.broker.request(self.worker, {"op": "load", "agent": self.key, "state": state})
+        self._status = state.get("status", self._status)
+        self._last_thought = state.get("last_thought", self._last_thought)
+
+    def attachment_refs(self) -> List[str]:
+        # Attachment payloads live in the worker's store and are not spilled with sessions
+        return []
+
+    def chat(
+        self,
+        message: str,
+        attachments: Optional[List[Dict[str, Any]]] = None,
+        lane: str = LANE_USER
+    ) -> str:
+        try:
+            with self.mailbox.turn(lane):
+                request = {
+                    "op": "chat", "agent": self.key, "message": message, "attachments": attachments,
+                    "lane": lane, "model": self.model, "is_custom_model": self.is_custom_model,
+                    "status": self._status,
+                }
+                catalog = self.tool_catalog
+                if catalog is not None and catalog.version != self._sent_catalog_version:
+                    request["tools"] = catalog.definitions(self.tool_scope)
+                    self._sent_catalog_version = catalog.version
+                return self._request_turn(request)
+        except OperationCancelledError:
+            return "Error: Request cancelled."
+        except AgentBusyError as e:
+            return f"Error: {str(e)}"
+
+    def _request_turn(self, request: Dict[str, Any]) -> str:
+        token = cancel_token_ctx.get()
+        if token is not None and token.cancelled:
+            return "Error: Request cancelled."
+
+        sent_ids: List[str] = []
+
+        def cancel_remote():
+            for request_id in sent_ids:
+                self.broker.send(self.worker, {"op": "cancel", "id": request_id})
+
+        def on_sent(request_id: str):
+            sent_ids.append(request_id)
+            # Covers a cancellation that fired before the request ID was known
+            if token is not None and token.cancelled:
+                cancel_remote()
+
+        remove_callback = token.add_callback(cancel_remote) if token is not None else None
+        try:
+            # Captured inside the turn so tool calls back into the swarm see this call chain
+            return self.broker.request(
+                self.worker, request, context=contextvars.copy_context(), on_sent=on_sent
+            )
+        except AgentOperationError as e:
+            return f"Error: {str(e)}"
+        finally:
+            if remove_callback:
+                remove_callback()
+
+
+_broker: Optional[ProcessBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> ProcessBroker:
+    """Returns the process-wide broker, shared by every swarm (sessions included)."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = ProcessBroker()
+            atexit.register(_broker.shutdown)
+        return _broker
@@ -0,0 +1,96 @@
+import hashlib
+import logging
+from typing import Optional
+from opencore.config import settings
+from opencore.core.attachments import AttachmentStore
+from opencore.core.cancellation import is_cancelled
+from opencore.llm.factory import get_llm_provider
+
+logger = logging.getLogger(__name__)
+
+RESULT_MODE_STORE = "store"
+RESULT_MODE_SUMMARIZE = "summarize"
+
+SUMMARY_PROMPT = (
+    "Summarize the result below for the agent that asked for it, in at most {limit} characters. "
+    "Keep concrete findings, names, numbers, file paths and errors; drop narration."
+)
+
+
+class ResultStore(AttachmentStore):
+    """
+    Full text of delegation results too long to hand back inline, addressed by a short
+    content hash (`result-<hex>`). Bounded by RESULT_STORE_MAX_MB, least recently read first.
+    """
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return settings.result_store_max_mb * 1024 * 1024
+
+    @staticmethod
+    def _ref(content: str) -> str:
+        return "result-" + hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+    def read(self, handle: str, offset: int = 0, limit: Optional[int] = None) -> str:
+        """Returns a slice of a stored result with a header locating it, or an error string."""
+        content = self.get(handle)
+        if content is None:
+            return f"Error: Result '{handle}' not found or no longer available."
+        limit = limit or settings.delegation_result_max_chars or len(content)
+        offset = max(0, offset)
+        chunk = content[offset:offset + limit]
+        end = offset + len(chunk)
+        more = f" Continue with offset={end}." if end < len(content) else ""
+        return f"[{handle}: characters {offset}-{end} of {len(content)}.{more}]\n{chunk}"
+
+
+def summarize_result(text: str, task: str, model: str, limit: int) -> Optional[str]:
+    """Asks `model` for a summary of at most `limit` characters. Returns None if it fails."""
+    if is_cancelled():
+        return None
+    provider = get_llm_provider(model)
+    try:
+        response = provider.chat(messages=[
+            {"role": "system", "content": SUMMARY_PROMPT.format(limit=limit)},
+            {"role": "user", "content": f"Task: {task}\n\nResult:\n{text}"},
+        ])
+    except Exception as e:
+        logger.warning(f"Could not summarize delegation result with {model}: {e}")
+        return None
+    finally:
+        provider.close()
+    return (response.content or "").strip()[:limit] or None
+
+
+def fit_result(
+    text: str,
+    task: str,
+    store: ResultStore,
+    summary_model: str,
+    max_chars: Optional[int] = None,
+    mode: Optional[str] = None
+) -> str:
+    """
+    Returns `text` if it fits the delegation output budget (DELEGATION_RESULT_MAX_CHARS).
+    Otherwise stores it and returns a summary (mode "summarize", falling back to a
+    preview) or the leading part of it, with the handle to read the rest.
+    """
+    max_chars = settings.delegation_result_max_chars if max_chars is None else max_chars
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+
+    mode = mode or settings.delegation_result_mode
+    handle = store.put(text)
+    summary = None
+    if mode == RESULT_MODE_SUMMARIZE:
+        summary = summarize_result(text, task, summary_model, max_chars)
+
+    if summary is not None:
+        body, shown = f"Summary: {summary}", "summarized"
+    else:
+        body, shown = text[:max_chars], f"first {max_chars} characters shown"
+    return (
+        f"{body}\n\n[Result of {len(text)} characters {shown}. "
+        f"Read the full text with read_result(handle='{handle}').]"
+    )
@@ -0,0 +1,237 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+from opencore.config import settings
+from opencore.core.attachments import attachment_store
+from opencore.core.swarm import Swarm
+
+logger = logging.getLogger("opencore.sessions")
+
+# Session IDs become file names, so only a conservative character set is accepted
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class InvalidSessionError(ValueError):
+    """Raised when a session ID is malformed."""
+    pass
+
+
+class _Session:
+    __slots__ = ("swarm", "last_used", "in_use", "ready")
+
+    def __init__(self, swarm: Optional[Swarm] = None):
+        self.swarm = swarm
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        # Set once the swarm is loaded; other requests for a session still loading wait on it
+        self.ready = threading.Event()
+        if swarm is not None:
+            self.ready.set()
+
+
+class SessionManager:
+    """
+    Maps session IDs to their own Swarm so clients don't share one Manager history.
+
+    Requests without a session ID use the default swarm. At most `max_live` sessions
+    are kept in memory. The least recently used ones, and any idle for longer than
+    `ttl` seconds, are spilled to `spill_dir` as JSON and reloaded on their next
+    request. Sessions that are serving a request or have queued turns are never spilled.
+    Loading and spilling happen outside the manager's lock, so disk I/O for one
+    session doesn't hold up requests for the others.
+    """
+    def __init__(
+        self,
+        default_swarm: Swarm,
+        max_live: Optional[int] = None,
+        ttl: Optional[float] = None,
+        spill_dir: Optional[str] = None,
+        swarm_factory: Callable[[], Swarm] = Swarm
+    ):
+        self.default_swarm = default_swarm
+        self.max_live = max_live if max_live is not None else settings.max_live_sessions
+        self.ttl = ttl if ttl is not None else settings.session_ttl
+        self.spill_dir = spill_dir or settings.session_dir
+        self.swarm_factory = swarm_factory
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        # Sessions whose snapshot is being written; a request for one waits before reloading it
+        self._spilling: Dict[str, threading.Event] = {}
+
+    @property
+    def live_count(self) -> int:
+        return len(self._sessions)
+
+    def is_live(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def _spill_path(self, session_id: str) -> str:
+        return os.path.join(self.spill_dir, f"{session_id}.json")
+
+    @contextmanager
+    def session(self, session_id: Optional[str]):
+        """Yields the swarm for a session, pinning it in memory for the duration."""
+        if not session_id:
+            yield self.default_swarm
+            return
+
+        if not SESSION_ID_PATTERN.match(session_id):
+            raise InvalidSessionError(f"Invalid session ID '{session_id}'.")
+
+        while True:
+            with self._lock:
+                spilling = self._spilling.get(session_id)
+                if spilling is None:
+                    session = self._sessions.get(session_id)
+                    loading = session is None
+                    if loading:
+                        session = _Session()
+                        self._sessions[session_id] = session
+                    self._sessions.move_to_end(session_id)
+                    session.in_use += 1
+                    session.last_used = time.monotonic()
+                    overflow = self._take_overflow()
+                    break
+            spilling.wait()
+
+        try:
+            self._write_spills(overflow)
+            if loading:
+                self._finish_load(session_id, session)
+            else:
+                session.ready.wait()
+            if session.swarm is None:
+                raise RuntimeError(f"Session '{session_id}' failed to load.")
+            yield session.swarm
+        finally:
+            with self._lock:
+                session.in_use -= 1
+                session.last_used = time.monotonic()
+
+    def evict_idle(self) -> int:
+        """Spills sessions idle for longer than the TTL. Returns the number spilled."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                self._take(session_id) for session_id, session in list(self._sessions.items())
+                if now - session.last_used > self.ttl and self._can_spill(session)
+            ]
+        self._write_spills(expired)
+        return len(expired)
+
+    def update_settings(self):
+        """Propagates a configuration reload to the default and all live swarms."""
+        self.default_swarm.update_settings()
+        for swarm in self._live_swarms():
+            swarm.update_settings()
+
+    def offload_idle_agents(self) -> int:
+        """Offloads idle agents of the default and all live swarms. Returns the number offloaded."""
+        return sum(swarm.offload_idle_agents() for swarm in [self.default_swarm, *self._live_swarms()])
+
+    def _live_swarms(self) -> List[Swarm]:
+        with self._lock:
+            return [session.swarm for session in self._sessions.values() if session.swarm is not None]
+
+    def _can_spill(self, session: _Session) -> bool:
+        return session.in_use == 0 and session.swarm is not None and session.swarm.is_idle()
+
+    def _take(self, session_id: str) -> Tuple[str, _Session]:
+        # Called with the lock held. Removes a session about to be spilled; requests
+        # for it wait on the spilling event until the snapshot is on disk.
+        self._spilling[session_id] = threading.Event()
+        return session_id, self._sessions.pop(session_id)
+
+    def _take_overflow(self) -> List[Tuple[str, _Session]]:
+        # Called with the lock held. Skips pinned sessions, so the live count can
+        # briefly exceed the limit while every session is busy.
+        overflow = len(self._sessions) - self.max_live
+        taken = []
+        for session_id, session in list(self._sessions.items()):
+            if overflow <= 0:
+                break
+            if self._can_spill(session):
+                taken.append(self._take(session_id))
+                overflow -= 1
+        return taken
+
+    def _write_spills(self, taken: List[Tuple[str, _Session]]):
+        for session_id, session in taken:
+            try:
+                self._spill(session_id, session)
+            except Exception as e:
+                # Keep the session in memory rather than lose it
+                logger.error(f"Failed to spill session '{session_id}': {e}")
+                with self._lock:
+                    self._sessions[session_id] = session
+                    self._sessions.move_to_end(session_id, last=False)
+            finally:
+                with self._lock:
+                    self._spilling.pop(session_id).set()
+
+    def _finish_load(self, session_id: str, session: _Session):
+        try:
+            session.swarm = self._load(session_id)
+        finally:
+            if session.swarm is None:
+                with self._lock:
+                    if self._sessions.get(session_id) is session:
+                        del self._sessions[session_id]
+            session.ready.set()
+
+    def _spill(self, session_id: str, session: _Session):
+        state = session.swarm.export_state()
+
+        # Persist attachment payloads the histories still reference
+        attachments = {}
+        for agent in session.swarm.agents.values():
+            for ref in agent.attachment_refs():
+                content = attachment_store.get(ref)
+                if content is not None:
+                    attachments[ref] = content
+        state["attachments"] = attachments
+
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = self._spill_path(session_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        # Chat histories are private, keep them owner-readable only
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+        # Offloaded agent histories are part of the snapshot now
+        session.swarm.offload_store.clear()
+        logger.info(f"Spilled idle session '{session_id}' to disk.")
+
+    def _load(self, session_id: str) -> Swarm:
+        path = self._spill_path(session_id)
+        if not os.path.exists(path):
+            return self.swarm_factory()
+
+        try:
+            with open(path, "r") as f:
+                state = json.load(f)
+            for content in state.pop("attachments", {}).values():
+                attachment_store.put(content)
+            swarm = Swarm.from_state(state)
+        except Exception as e:
+            logger.error(f"Failed to reload session '{session_id}', starting fresh: {e}")
+            return self.swarm_factory()
+
+        # The snapshot stays on disk until the next spill overwrites it
+        logger.info(f"Reloaded session '{session_id}' from disk.")
+        return swarm
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "live": len(self._sessions),
+                "in_use": sum(1 for s in self._sessions.values() if s.in_use),
+                "max_live": self.max_live,
+            }
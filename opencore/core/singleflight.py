@@ -0,0 +1,121 @@
+import threading
+import time
+from typing import Callable, Dict, Any, Hashable, Optional, Tuple
+from opencore.config import settings
+from opencore.core.cancellation import current_token
+from opencore.core.exceptions import OperationCancelledError
+
+
+def normalize_task(task: str) -> str:
+    """Task text as compared for de-duplication: whitespace collapsed, case folded."""
+    return " ".join(task.split()).casefold()
+
+
+class _Flight:
+    __slots__ = ("cond", "done", "result", "shareable")
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.done = False
+        self.result: Any = None
+        self.shareable = False
+
+    def finish(self):
+        with self.cond:
+            self.done = True
+            self.cond.notify_all()
+
+    def wake(self):
+        with self.cond:
+            self.cond.notify_all()
+
+
+class SingleFlight:
+    """
+    Runs concurrent calls with the same key once and hands the result to every caller.
+
+    Only results `shareable(result)` accepts are handed out, and those are also
+    reused for `window` seconds (DELEGATION_REUSE_WINDOW) after the call finishes.
+    Exceptions and other results are never shared: when the running call fails (e.g.
+    its request was cancelled), one of the waiting callers runs it again. Waiting is
+    interrupted when the waiting request's cancellation token fires.
+    """
+    def __init__(self, window: Optional[float] = None):
+        self._window = window
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._recent: Dict[Hashable, Tuple[float, Any]] = {}
+        self.executed = 0
+        self.shared = 0
+        self.reused = 0
+
+    @property
+    def window(self) -> float:
+        return max(0.0, self._window if self._window is not None else settings.delegation_reuse_window)
+
+    def do(self, key: Hashable, fn: Callable[[], Any], shareable: Callable[[Any], bool] = lambda result: True) -> Tuple[Any, bool]:
+        """
+        Returns (result, shared). `shared` is True if the result came from another caller's run.
+
+        :raises OperationCancelledError: if the request is cancelled while waiting for another caller's run.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                recent = self._recent.get(key)
+                if recent is not None and recent[0] > now:
+                    self.reused += 1
+                    return recent[1], True
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _Flight()
+                    self._flights[key] = flight
+
+            if leader:
+                return self._run(key, flight, fn, shareable), False
+
+            self._wait(flight)
+            if flight.shareable:
+                with self._lock:
+                    self.shared += 1
+                return flight.result, True
+
+    def _run(self, key: Hashable, flight: _Flight, fn: Callable[[], Any], shareable: Callable[[Any], bool]) -> Any:
+        try:
+            flight.result = fn()
+            flight.shareable = shareable(flight.result)
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                self.executed += 1
+                now = time.monotonic()
+                # Drop expired results whenever a new one may be stored
+                self._recent = {k: v for k, v in self._recent.items() if v[0] > now}
+                window = self.window
+                if flight.shareable and window:
+                    self._recent[key] = (now + window, flight.result)
+            flight.finish()
+        return flight.result
+
+    @staticmethod
+    def _wait(flight: _Flight):
+        token = current_token()
+        remove = token.add_callback(flight.wake) if token is not None else None
+        try:
+            with flight.cond:
+                flight.cond.wait_for(lambda: flight.done or (token is not None and token.cancelled))
+                if not flight.done:
+                    raise OperationCancelledError(f"Request cancelled ({token.reason}).")
+        finally:
+            if remove is not None:
+                remove()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "executed": self.executed,
+                "shared": self.shared,
+                "reused": self.reused,
+            }
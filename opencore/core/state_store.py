@@ -0,0 +1,527 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, FrozenSet, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+from opencore.config import settings
+from opencore.core.agent import Agent
+from opencore.core.attachments import attachment_store
+from opencore.core.context import cancel_token_ctx
+from opencore.core.exceptions import SwarmError, OperationCancelledError, AgentBusyError
+from opencore.core.mailbox import LANE_USER
+
+logger = logging.getLogger("opencore.state_store")
+
+# Identifies this process in lease values
+REPLICA_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Lease keys held by the current call chain, so nested turns (A -> B -> A) re-enter
+_held_leases_ctx: ContextVar[FrozenSet[str]] = ContextVar("held_leases", default=frozenset())
+
+
+class StateStoreError(SwarmError):
+    """Raised when the state store is unreachable or returns an error."""
+    pass
+
+
+class LeaseTimeoutError(SwarmError):
+    """Raised when a lease could not be acquired in time."""
+    pass
+
+
+class SwarmStateStore(ABC):
+    """
+    Swarm state shared by API replicas: the agent registry, histories, teams and
+    interactions, plus leases that keep an agent's turns on one worker at a time.
+    Every change to the registry, teams or interactions bumps a version number, so
+    replicas can skip syncing when nothing changed.
+    """
+
+    @abstractmethod
+    def get_version(self) -> int:
+        """Returns a counter that changes whenever agents, teams or interactions do."""
+        pass
+
+    @abstractmethod
+    def put_agent(self, name: str, definition: Dict[str, Any]):
+        pass
+
+    @abstractmethod
+    def get_agents(self) -> Dict[str, Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def delete_agent(self, name: str):
+        """Removes the agent's definition and history."""
+        pass
+
+    @abstractmethod
+    def get_history(self, name: str) -> Optional[List[Dict[str, Any]]]:
+        pass
+
+    @abstractmethod
+    def put_history(self, name: str, messages: List[Dict[str, Any]]):
+        pass
+
+    @abstractmethod
+    def put_attachment(self, ref: str, content: str):
+        """Stores attachment content referenced from histories by its hash."""
+        pass
+
+    @abstractmethod
+    def get_attachment(self, ref: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def put_team(self, name: str, members: List[str]):
+        pass
+
+    @abstractmethod
+    def get_teams(self) -> Dict[str, List[str]]:
+        pass
+
+    @abstractmethod
+    def append_interaction(self, record: Dict[str, Any]) -> int:
+        """Stores an interaction under a new store-wide `id` and returns it."""
+        pass
+
+    @abstractmethod
+    def get_interactions(self, limit: int) -> List[Dict[str, Any]]:
+        """Returns up to `limit` most recent interactions, oldest first."""
+        pass
+
+    @abstractmethod
+    def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        """Takes the lease if it is free or expired. Returns False if someone else holds it."""
+        pass
+
+    @abstractmethod
+    def renew_lease(self, key: str, owner: str, ttl: float) -> bool:
+        """Extends a lease still held by `owner`."""
+        pass
+
+    @abstractmethod
+    def release_lease(self, key: str, owner: str) -> bool:
+        """Releases a lease if `owner` still holds it."""
+        pass
+
+
+class InMemoryStateStore(SwarmStateStore):
+    """Single-process store. Useful for tests and as the reference implementation."""
+    def __init__(self, max_interactions: Optional[int] = None):
+        self.max_interactions = max_interactions or settings.interaction_log_size
+        self._lock = threading.Lock()
+        self._agents: Dict[str, Dict[str, Any]] = {}
+        self._histories: Dict[str, List[Dict[str, Any]]] = {}
+        self._attachments: Dict[str, str] = {}
+        self._teams: Dict[str, List[str]] = {}
+        self._interactions: List[Dict[str, Any]] = []
+        self._interaction_seq = 0
+        self._version = 0
+        self._leases: Dict[str, Tuple[str, float]] = {}
+
+    def get_version(self) -> int:
+        return self._version
+
+    def put_agent(self, name: str, definition: Dict[str, Any]):
+        with self._lock:
+            self._agents[name] = dict(definition)
+            self._version += 1
+
+    def get_agents(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(d) for name, d in self._agents.items()}
+
+    def delete_agent(self, name: str):
+        with self._lock:
+            self._agents.pop(name, None)
+            self._histories.pop(name, None)
+            self._version += 1
+
+    def get_history(self, name: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            history = self._histories.get(name)
+            return list(history) if history is not None else None
+
+    def put_history(self, name: str, messages: List[Dict[str, Any]]):
+        with self._lock:
+            self._histories[name] = list(messages)
+
+    def put_attachment(self, ref: str, content: str):
+        with self._lock:
+            self._attachments[ref] = content
+
+    def get_attachment(self, ref: str) -> Optional[str]:
+        with self._lock:
+            return self._attachments.get(ref)
+
+    def put_team(self, name: str, members: List[str]):
+        with self._lock:
+            self._teams[name] = list(members)
+            self._version += 1
+
+    def get_teams(self) -> Dict[str, List[str]]:
+        with self._lock:
+            return {name: list(members) for name, members in self._teams.items()}
+
+    def append_interaction(self, record: Dict[str, Any]) -> int:
+        with self._lock:
+            self._interaction_seq += 1
+            self._interactions.append({**record, "id": self._interaction_seq})
+            del self._interactions[:-self.max_interactions]
+            self._version += 1
+            return self._interaction_seq
+
+    def get_interactions(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._interactions[-limit:]) if limit > 0 else []
+
+    def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            holder = self._leases.get(key)
+            if holder is not None and holder[1] > now and holder[0] != owner:
+                return False
+            self._leases[key] = (owner, now + ttl)
+            return True
+
+    def renew_lease(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            holder = self._leases.get(key)
+            if holder is None or holder[0] != owner or holder[1] <= now:
+                return False
+            self._leases[key] = (owner, now + ttl)
+            return True
+
+    def release_lease(self, key: str, owner: str) -> bool:
+        with self._lock:
+            holder = self._leases.get(key)
+            if holder is None or holder[0] != owner:
+                return False
+            del self._leases[key]
+            return True
+
+
+class RespClient:
+    """
+    Minimal blocking client for the Redis serialization protocol (RESP2).
+    Speaks to Redis or any compatible server without extra dependencies.
+    One connection is shared behind a lock and re-opened after a network error.
+    """
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0,
+                 password: Optional[str] = None, timeout: float = 5.0, username: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            # ACL users (Redis 6+) authenticate with a name; the default user with the password alone
+            if self.username:
+                self._call("AUTH", self.username, self.password)
+            else:
+                self._call("AUTH", self.password)
+        if self.db:
+            self._call("SELECT", self.db)
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    def execute(self, *args) -> Any:
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._call(*args)
+                except (OSError, EOFError) as e:
+                    self._close()
+                    if attempt:
+                        raise StateStoreError(f"State store connection failed: {e}")
+
+    def _call(self, *args) -> Any:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise EOFError("connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode("utf-8")
+        if kind == b"-":
+            raise StateStoreError(payload.decode("utf-8"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2].decode("utf-8")
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise StateStoreError(f"Unexpected reply from state store: {line!r}")
+
+
+# Compare-and-delete / compare-and-extend, so a replica never touches a lease it lost
+RELEASE_LEASE_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+)
+RENEW_LEASE_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end"
+)
+
+
+class RedisStateStore(SwarmStateStore):
+    """
+    Store backed by a Redis-protocol server. Values are JSON; keys live under `prefix`.
+    Leases are `SET NX PX` keys released and renewed by owner-checked scripts.
+    """
+    def __init__(self, client: RespClient, prefix: str = "opencore:", max_interactions: Optional[int] = None):
+        self.client = client
+        self.prefix = prefix
+        self.max_interactions = max_interactions or settings.interaction_log_size
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisStateStore":
+        parsed = urlparse(url)
+        db = int(parsed.path.lstrip("/") or 0)
+        client = RespClient(
+            parsed.hostname or "localhost", parsed.port or 6379, db=db,
+            password=parsed.password, username=parsed.username or None
+        )
+        return cls(client)
+
+    def _key(self, *parts: str) -> str:
+        return self.prefix + ":".join(parts)
+
+    def _bump_version(self):
+        self.client.execute("INCR", self._key("version"))
+
+    def get_version(self) -> int:
+        return int(self.client.execute("GET", self._key("version")) or 0)
+
+    def put_agent(self, name: str, definition: Dict[str, Any]):
+        self.client.execute("HSET", self._key("agents"), name, json.dumps(definition))
+        self._bump_version()
+
+    def get_agents(self) -> Dict[str, Dict[str, Any]]:
+        flat = self.client.execute("HGETALL", self._key("agents")) or []
+        return {flat[i]: json.loads(flat[i + 1]) for i in range(0, len(flat), 2)}
+
+    def delete_agent(self, name: str):
+        self.client.execute("HDEL", self._key("agents"), name)
+        self.client.execute("DEL", self._key("history", name))
+        self._bump_version()
+
+    def get_history(self, name: str) -> Optional[List[Dict[str, Any]]]:
+        raw = self.client.execute("GET", self._key("history", name))
+        return json.loads(raw) if raw is not None else None
+
+    def put_history(self, name: str, messages: List[Dict[str, Any]]):
+        self.client.execute("SET", self._key("history", name), json.dumps(messages))
+
+    def put_attachment(self, ref: str, content: str):
+        # Content-addressed, so an existing entry already holds the same content
+        self.client.execute("SET", self._key("attachment", ref), content, "NX")
+
+    def get_attachment(self, ref: str) -> Optional[str]:
+        return self.client.execute("GET", self._key("attachment", ref))
+
+    def put_team(self, name: str, members: List[str]):
+        self.client.execute("HSET", self._key("teams"), name, json.dumps(members))
+        self._bump_version()
+
+    def get_teams(self) -> Dict[str, List[str]]:
+        flat = self.client.execute("HGETALL", self._key("teams")) or []
+        return {flat[i]: json.loads(flat[i + 1]) for i in range(0, len(flat), 2)}
+
+    def append_interaction(self, record: Dict[str, Any]) -> int:
+        key = self._key("interactions")
+        record_id = self.client.execute("INCR", self._key("interactions", "seq"))
+        self.client.execute("RPUSH", key, json.dumps({**record, "id": record_id}))
+        self.client.execute("LTRIM", key, -self.max_interactions, -1)
+        self._bump_version()
+        return record_id
+
+    def get_interactions(self, limit: int) -> List[Dict[str, Any]]:
+        if limit <= 0:
+            return []
+        return [json.loads(raw) for raw in self.client.execute("LRANGE", self._key("interactions"), -limit, -1) or []]
+
+    def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        reply = self.client.execute("SET", self._key("lease", key), owner, "NX", "PX", int(ttl * 1000))
+        return reply == "OK"
+
+    def renew_lease(self, key: str, owner: str, ttl: float) -> bool:
+        return self.client.execute("EVAL", RENEW_LEASE_SCRIPT, 1, self._key("lease", key), owner, int(ttl * 1000)) == 1
+
+    def release_lease(self, key: str, owner: str) -> bool:
+        return self.client.execute("EVAL", RELEASE_LEASE_SCRIPT, 1, self._key("lease", key), owner) == 1
+
+
+def create_state_store(url: Optional[str]) -> Optional[SwarmStateStore]:
+    """Builds a store from STATE_STORE_URL: `memory://` or `redis://[[user]:password@]host:port/db`."""
+    if not url:
+        return None
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return InMemoryStateStore()
+    if scheme == "redis":
+        return RedisStateStore.from_url(url)
+    raise ValueError(f"Unsupported state store URL '{url}'. Use memory:// or redis://.")
+
+
+@contextmanager
+def hold_lease(store: SwarmStateStore, key: str, ttl: Optional[float] = None,
+               wait: Optional[float] = None) -> Iterator[bool]:
+    """
+    Holds a lease on `key` for the block, renewing it in the background.
+    Waits up to `wait` seconds for another holder to release it, then raises
+    LeaseTimeoutError. Re-entrant within a call chain; yields True only for the
+    outermost holder.
+    """
+    held = _held_leases_ctx.get()
+    if key in held:
+        yield False
+        return
+
+    ttl = ttl or settings.agent_lease_ttl
+    wait = settings.agent_lease_wait if wait is None else wait
+    owner = f"{REPLICA_ID}:{uuid.uuid4().hex[:8]}"
+    deadline = time.monotonic() + wait
+    delay = 0.05
+    token = cancel_token_ctx.get()
+    while not store.acquire_lease(key, owner, ttl):
+        if token is not None and token.cancelled:
+            raise OperationCancelledError(f"Request cancelled while waiting for lease on '{key}'.")
+        if time.monotonic() >= deadline:
+            raise LeaseTimeoutError(f"'{key}' is busy on another worker.")
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
+    stop = threading.Event()
+
+    def renew():
+        while not stop.wait(ttl / 3):
+            try:
+                if not store.renew_lease(key, owner, ttl):
+                    logger.warning(f"Lost lease on '{key}'.")
+                    return
+            except StateStoreError as e:
+                logger.error(f"Failed to renew lease on '{key}': {e}")
+
+    renewer = threading.Thread(target=renew, name=f"lease-{key}", daemon=True)
+    renewer.start()
+    ctx_token = _held_leases_ctx.set(held | {key})
+    try:
+        yield True
+    finally:
+        _held_leases_ctx.reset(ctx_token)
+        stop.set()
+        try:
+            store.release_lease(key, owner)
+        except StateStoreError as e:
+            logger.error(f"Failed to release lease on '{key}', it will expire: {e}")
+
+
+class SharedAgent(Agent):
+    """
+    Agent whose history lives in a SwarmStateStore. Each turn holds the agent's
+    lease, loads the latest history first and writes it back afterwards, so turns
+    for one agent never run on two replicas at once. Attachment contents the history
+    refers to are shared through the store too.
+    """
+    def __init__(self, *args, state_store: SwarmStateStore, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.state_store = state_store
+        self._shared_refs: Set[str] = set()  # Attachments known to be in the store
+
+    def _load_attachments(self):
+        # Histories written elsewhere refer to attachments this process may never have seen
+        for ref in self.attachment_refs():
+            if ref in attachment_store:
+                continue
+            content = self.state_store.get_attachment(ref)
+            if content is not None:
+                attachment_store.put(content)
+                self._shared_refs.add(ref)
+
+    def _share_attachments(self):
+        for ref in self.attachment_refs():
+            if ref in self._shared_refs:
+                continue
+            content = attachment_store.get(ref)
+            if content is not None:
+                self.state_store.put_attachment(ref, content)
+                self._shared_refs.add(ref)
+
+    @property
+    def lease_key(self) -> str:
+        return f"agent:{self.name}"
+
+    def chat(
+        self,
+        message: str,
+        attachments: Optional[List[Dict[str, Any]]] = None,
+        lane: str = LANE_USER
+    ) -> str:
+        try:
+            # Local queue first, so only the turn that is about to run competes for the lease
+            with self.mailbox.turn(lane), hold_lease(self.state_store, self.lease_key) as outermost:
+                if not outermost:
+                    return super().chat(message, attachments=attachments, lane=lane)
+
+                stored = self.state_store.get_history(self.name)
+                if stored:
+                    self.messages = stored
+                    self._load_attachments()
+                try:
+                    return super().chat(message, attachments=attachments, lane=lane)
+                finally:
+                    self._share_attachments()
+                    self.state_store.put_history(self.name, self.messages)
+        except LeaseTimeoutError as e:
+            return f"Error: {str(e)}"
+        except OperationCancelledError:
+            return "Error: Request cancelled."
+        except AgentBusyError as e:
+            return f"Error: {str(e)}"
+        except StateStoreError as e:
+            return f"Error: {str(e)}"
@@ -1,20 +1,88 @@
-from typing import Dict, Optional, List, Any
+from typing import Callable, Dict, Optional, List, Any, Set, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from contextlib import contextmanager
+import contextvars
+import itertools
+import queue
 import threading
 from opencore.core.agent import Agent
 from opencore.tools.base import register_base_tools
 from opencore.config import settings
 from opencore.llm.factory import is_provider_available, get_available_model_list
-from opencore.core.exceptions import AgentNotFoundError, AgentOperationError
-from opencore.core.context import activity_log_ctx
+from opencore.core.exceptions import AgentNotFoundError, AgentOperationError, DelegationLimitError, OperationCancelledError
+from opencore.core.context import activity_log_ctx, cancel_token_ctx
+from opencore.core.cancellation import CancellationToken, current_token, is_cancelled
+from opencore.core.mailbox import AgentMailbox, LANE_USER, LANE_DELEGATION, release_held_turns
+from opencore.core.tasks import TaskRegistry, DelegatedTask, TASK_PENDING, TASK_RUNNING
+from opencore.core.workflow import Workflow, WorkflowRunner, WorkflowResult, StepCache
+from opencore.core.interactions import InteractionLog, Interaction
+from opencore.core.graph import SwarmGraph
+from opencore.core.tool_catalog import ToolCatalog, SCOPE_AGENT, SCOPE_MANAGER
+from opencore.core.process_pool import ProcessBroker, RemoteAgent, get_broker
+from opencore.core.state_store import SwarmStateStore, SharedAgent
+from opencore.core.delegation import DelegationBudget, check_delegation, delegation_scope
+from opencore.core.templates import AgentTemplate, AgentPool
+from opencore.core.offload import AgentOffloadStore, OffloadedAgent, process_offload_dir
+from opencore.core.teams import TeamMap
+from opencore.core.singleflight import SingleFlight, normalize_task
+from opencore.core.results import ResultStore, fit_result
+from opencore.core.blackboard import Blackboard, Fact
+from opencore.core.events import EventBus, EVENT_ACTIVITY, EVENT_GRAPH
+from opencore.core.attachments import attachment_store
 import datetime
+import os
+import time
+import uuid
+
+# Extra time a parallel delegation gets to wind down after its timeout fires
+DELEGATION_GRACE_PERIOD = 5
 
 
 class Swarm:
-    def __init__(self, main_agent_name: str = "Manager", default_model: str = "gpt-4o"):
+    def __init__(
+        self,
+        main_agent_name: str = "Manager",
+        default_model: str = "gpt-4o",
+        broker: Optional[ProcessBroker] = None,
+        state_store: Optional[SwarmStateStore] = None,
+        blackboard: Optional[Blackboard] = None
+    ):
+        # Writer lock for the registry. `agents`, `teams` and `children` are copy-on-write: writers publish
+        # a new dict under this lock, and readers use whatever dict is current without locking.
         self._lock = threading.Lock()
+        # With a broker (or WORKER_PROCESSES > 0), agents other than the main one run in worker processes
+        if broker is None and settings.worker_processes > 0:
+            broker = get_broker()
+        self.broker = broker
+        # Shared registry, histories and leases for running one swarm across several API replicas
+        self.state_store = state_store
+        self._instance_id = uuid.uuid4().hex  # Marks this replica's interactions in the store
+        self._synced_interactions: Set[int] = set()  # Store ids of the interaction window seen by the last sync
+        self._synced_version: Optional[int] = None  # Store version at the last sync
+        self._unpersisted: frozenset = frozenset()  # Agents registered here but not yet written to the store
         self.agents: Dict[str, Agent] = {}
-        self.teams: Dict[str, List[str]] = {}  # Map team_name -> list of agent_names
-        self.interactions: List[Dict[str, str]] = []  # Track recent interactions
+        self.teams = TeamMap()  # Map team_name -> list of agent_names, indexed by member (replaced, never mutated)
+        self.children: Dict[str, Tuple[str, ...]] = {}  # Map creator -> agents it created (replaced, never mutated)
+        self.interactions = InteractionLog()  # Ring buffer of recent agent-to-agent exchanges
+        self.events = EventBus()  # Live activity and graph changes for /events subscribers
+        self.graph = SwarmGraph(  # Versioned topology for polling clients
+            edge_source=self._graph_edges,
+            listener=lambda change: self.events.publish(EVENT_GRAPH, change)
+        )
+        self.tool_catalog = ToolCatalog(self)  # Swarm tool schemas and handlers shared by all agents
+        self.tasks = TaskRegistry()  # Background delegations started with start_task
+        self.workflow_cache = StepCache()  # Step outputs reused across workflow re-runs
+        self.templates = AgentPool(self._build_pooled_agent)  # Agent templates and pre-built instances
+        # Idle agents' histories are offloaded here and hydrated on their next turn
+        self.offload_store = AgentOffloadStore(
+            os.path.join(process_offload_dir(settings.agent_offload_dir), uuid.uuid4().hex)
+        )
+        self._offload_lock = threading.Lock()  # Serializes offloading and hydration
+        self._pins: Dict[str, int] = {}  # Agents in use by a pending turn; never offloaded (guarded by _lock)
+        self.delegations = DelegationBudget()  # Swarm-wide cap on concurrent sub-agent turns
+        self.singleflight = SingleFlight()  # Shares identical concurrent delegations (DELEGATION_SINGLEFLIGHT)
+        self.results = ResultStore()  # Full text of delegation results too long to return inline
+        self.blackboard = blackboard or Blackboard()  # Facts agents share instead of re-deriving them
         self.main_agent_name = main_agent_name
         # Allow env var to override default model
         self.default_model = settings.llm_model or default_model
@@ -29,18 +97,38 @@ class Swarm:
                 "'Initiating')."
             )
         )
+        self.sync()
 
     def create_agent(
         self,
         name: str,
-        role: str,
-        system_prompt: str,
+        role: Optional[str] = None,
+        system_prompt: Optional[str] = None,
         model: Optional[str] = None,
-        created_by: Optional[str] = None
+        created_by: Optional[str] = None,
+        persist: bool = True,
+        template: Optional[str] = None
     ) -> str:
-        with self._lock:
-            if name in self.agents:
-                return f"Error: Agent '{name}' already exists."
+        """
+        Creates and registers an agent. With `template`, the role, prompt, model and tool
+        set default to the registered template's, and a pre-built instance from the
+        template pool is used when one is ready. With a state store, the definition is
+        written to it unless `persist` is False (used when mirroring another replica's agent).
+        """
+        if name in self.agents:
+            return f"Error: Agent '{name}' already exists."
+
+        agent_template = None
+        if template is not None:
+            agent_template = self.templates.get(template)
+            if agent_template is None:
+                available = [t.name for t in self.templates.templates()]
+                return f"Error: Template '{template}' not found. Available templates: {available}"
+            role = role or agent_template.role
+            system_prompt = system_prompt or agent_template.system_prompt
+            model = model or agent_template.model
+        if not role or not system_prompt:
+            return f"Error: Agent '{name}' needs a role and instructions, or a template."
 
         # Validate requested model availability if provided
         if model and not is_provider_available(model):
@@ -53,18 +141,51 @@ class Swarm:
         # Use passed model, or swarm default
         is_custom = model is not None
         agent_model = model if model else self.default_model
+        remote = self.broker is not None and name != self.main_agent_name
 
-        new_agent = Agent(
-            name, role, system_prompt, model=agent_model, is_custom_model=is_custom, created_by=created_by
-        )
-        with self._lock:
-            self.agents[name] = new_agent
+        new_agent = None
+        if agent_template is not None and not remote:
+            new_agent = self.templates.acquire(template)
+            if new_agent is not None:
+                new_agent.reset(name, role, system_prompt, created_by=created_by)
+                new_agent.model = agent_model
+                new_agent.is_custom_model = is_custom
 
-        # Register swarm tools for the new agent
-        self._register_swarm_tools(new_agent)
+        if new_agent is None:
+            try:
+                new_agent = self._build_agent(
+                    name, role, system_prompt, agent_model, is_custom, created_by,
+                    tools=agent_template.tools if agent_template is not None else None
+                )
+            except AgentOperationError as e:
+                return f"Error: Could not start agent '{name}' in a worker process: {str(e)}"
+            if agent_template is not None and not remote:
+                new_agent.template = template
 
-        # Register base tools (filesystem, command execution)
-        register_base_tools(new_agent)
+        with self._lock:
+            # Another thread may have registered the same name while this agent was being built
+            duplicate = name in self.agents
+            if not duplicate:
+                self.agents = {**self.agents, name: new_agent}
+                if persist and self.state_store is not None:
+                    self._unpersisted = self._unpersisted | {name}
+                if created_by is not None:
+                    self.children = {**self.children, created_by: self.children.get(created_by, ()) + (name,)}
+                self.graph.node_added(name, created_by, new_agent.status, new_agent.last_thought)
+        if duplicate:
+            if isinstance(new_agent, RemoteAgent):
+                new_agent.close()
+            else:
+                self.templates.release(new_agent)
+            return f"Error: Agent '{name}' already exists."
+        new_agent.on_change = self.graph.node_updated
+        if persist:
+            try:
+                self._persist_agent(new_agent)
+            finally:
+                with self._lock:
+                    self._unpersisted = self._unpersisted - {name}
+        self._enforce_live_cap(exclude=name)
 
         if name != self.main_agent_name:
             self._log_activity({
@@ -76,8 +197,155 @@ class Swarm:
 
         return f"Agent '{name}' created successfully using model '{agent_model}'."
 
+    def _build_agent(
+        self,
+        name: str,
+        role: str,
+        system_prompt: str,
+        model: str,
+        is_custom: bool,
+        created_by: Optional[str],
+        tools: Optional[List[str]] = None
+    ) -> Agent:
+        """
+        Builds a ready-to-register agent with its tools. `tools` restricts the base tools
+        to the listed names. Raises AgentOperationError if a worker process can't host it.
+        """
+        if self.broker is not None and name != self.main_agent_name:
+            new_agent = RemoteAgent(
+                self.broker, name, role, system_prompt,
+                model=model, is_custom_model=is_custom, created_by=created_by
+            )
+        elif self.state_store is not None:
+            new_agent = SharedAgent(
+                name, role, system_prompt, model=model, is_custom_model=is_custom,
+                created_by=created_by, state_store=self.state_store
+            )
+        else:
+            new_agent = Agent(
+                name, role, system_prompt, model=model, is_custom_model=is_custom, created_by=created_by
+            )
+
+        # Swarm tools come from the shared catalog, bound to the agent at call time
+        new_agent.use_tool_catalog(
+            self.tool_catalog, SCOPE_MANAGER if name == self.main_agent_name else SCOPE_AGENT
+        )
+
+        if isinstance(new_agent, RemoteAgent):
+            # Base tools are registered by the worker process hosting the agent
+            new_agent.start()
+        else:
+            self._register_base_tools(new_agent, tools)
+        return new_agent
+
+    @staticmethod
+    def _register_base_tools(agent: Agent, tools: Optional[List[str]]):
+        # Register base tools (filesystem, command execution), restricted to `tools` if given
+        register_base_tools(agent)
+        if tools is not None:
+            for tool_name in list(agent._tool_definitions):
+                if tool_name not in tools:
+                    agent.unregister_tool(tool_name)
+
+    def _build_pooled_agent(self, template: AgentTemplate) -> Agent:
+        # Pool instances are always local; the name is replaced when one is handed out
+        is_custom = template.model is not None
+        agent = self._build_agent(
+            template.name, template.role, template.system_prompt,
+            template.model or self.default_model, is_custom, None, tools=template.tools
+        )
+        agent.template = template.name
+        return agent
+
+    def register_template(
+        self,
+        name: str,
+        role: str,
+        system_prompt: str,
+        model: Optional[str] = None,
+        tools: Optional[List[str]] = None,
+        warm: Optional[int] = None
+    ) -> AgentTemplate:
+        """
+        Registers (or replaces) an agent template and pre-builds its pool.
+        Agents are then created from it with `create_agent(name, template=...)`.
+        """
+        template = AgentTemplate(name, role, system_prompt, model=model, tools=tools, warm=warm)
+        # Instances run on worker processes when there's a broker, so there's nothing to pre-build
+        self.templates.register(template, prewarm=self.broker is None)
+        # The create_agent schema lists the registered templates
+        self.tool_catalog.invalidate()
+        return template
+
+    def _persist_agent(self, agent: Agent):
+        if self.state_store is None:
+            return
+        self.state_store.put_agent(agent.name, {
+            "role": agent.role,
+            "system_prompt": agent.system_prompt,
+            "model": agent.model if agent.is_custom_model else None,
+            "created_by": agent.created_by,
+            "status": agent.status,
+        })
+
+    def sync(self):
+        """
+        Reconciles this replica with the shared state store: mirrors agents created,
+        removed or toggled elsewhere, reloads teams and merges interactions recorded
+        by other replicas. No-op without a store.
+        """
+        if self.state_store is None:
+            return
+
+        # One round trip when nothing changed; read before the data so a concurrent change is caught next time
+        version = self.state_store.get_version()
+        if version == self._synced_version:
+            return
+
+        # Snapshot before reading the store: agents registered later, or not yet persisted, must not look deleted
+        with self._lock:
+            local, unpersisted = self.agents, self._unpersisted
+        definitions = self.state_store.get_agents()
+
+        for name, definition in definitions.items():
+            agent = local.get(name)
+            if agent is None:
+                self.create_agent(
+                    name, definition["role"], definition["system_prompt"], model=definition.get("model"),
+                    created_by=definition.get("created_by"), persist=False
+                )
+                agent = self.get_agent(name)
+            if agent is not None and agent.status != definition.get("status", agent.status):
+                agent.status = definition["status"]
+
+        for name in local:
+            if name not in definitions and name not in unpersisted and name != self.main_agent_name:
+                self.remove_agent(name, persist=False)
+
+        teams = self.state_store.get_teams()
+        with self._lock:
+            self.teams = TeamMap(teams)
+
+        self._merge_interactions(self.state_store.get_interactions(self.interactions.maxlen))
+        self._synced_version = version
+
+    def _merge_interactions(self, records: List[Dict[str, Any]]):
+        # Records already seen, or older than the previous window, were merged before.
+        # Ids are compared as a set because concurrent replicas may push them out of order.
+        seen = self._synced_interactions
+        oldest_seen = min(seen) if seen else 0
+        new = [
+            record for record in records
+            if record.get("id") not in seen and record.get("id", 0) > oldest_seen
+            and record.get("origin") != self._instance_id
+        ]
+        self._synced_interactions = {record.get("id") for record in records}
+        for interaction in self.interactions.restore(new):
+            self.graph.edge_added(self._edge(interaction))
+
     def _log_activity(self, activity: Dict[str, Any]):
-        """Helper to safely log request-scoped activity."""
+        """Helper to safely log request-scoped activity. Every entry is also published as a live event."""
+        self.events.publish(EVENT_ACTIVITY, activity)
         try:
             log = activity_log_ctx.get()
             if log is not None:
@@ -85,8 +353,25 @@ class Swarm:
         except (LookupError, NameError):
             pass
 
-    def remove_agent(self, name: str) -> Optional[str]:
-        """Removes an agent from the swarm."""
+    def descendants(self, name: str) -> List[str]:
+        """Returns every agent created by `name`, directly or further down, deepest first."""
+        children = self.children
+        order: List[str] = []
+        pending = list(children.get(name, ()))
+        seen = set()
+        while pending:
+            child = pending.pop()
+            if child in seen or child == name:
+                continue
+            seen.add(child)
+            order.append(child)
+            pending.extend(children.get(child, ()))
+        # Parents were visited before their children; remove leaves first
+        order.reverse()
+        return order
+
+    def remove_agent(self, name: str, persist: bool = True) -> Optional[str]:
+        """Removes an agent from the swarm (and from the state store, if `persist`)."""
         with self._lock:
             if name not in self.agents:
                 raise AgentNotFoundError(f"Agent '{name}' not found.")
@@ -94,7 +379,83 @@ class Swarm:
             if name == self.main_agent_name:
                 raise AgentOperationError("Cannot remove the main manager agent.")
 
-            del self.agents[name]
+            removed, changed_teams = self._unregister([name])
+        self._cleanup_removed(removed, changed_teams, persist)
+        return None
+
+    def remove_agents(self, names: List[str], cascade: bool = False, persist: bool = True) -> Dict[str, Any]:
+        """
+        Removes several agents in one registry update. With `cascade`, the agents each
+        one created (directly or further down) are removed too.
+        Returns {"removed": [names], "errors": {name: reason}}.
+        """
+        errors: Dict[str, str] = {}
+        with self._lock:
+            targets: List[str] = []
+            seen = set()
+            for name in names:
+                if name not in self.agents:
+                    errors[name] = f"Agent '{name}' not found."
+                    continue
+                if name == self.main_agent_name:
+                    errors[name] = "Cannot remove the main manager agent."
+                    continue
+                for target in (self.descendants(name) if cascade else []) + [name]:
+                    if target not in seen and target != self.main_agent_name:
+                        seen.add(target)
+                        targets.append(target)
+            removed, changed_teams = self._unregister(targets)
+        self._cleanup_removed(removed, changed_teams, persist)
+        return {"removed": [name for name, _ in removed], "errors": errors}
+
+    def _unregister(self, names: List[str]) -> Tuple[List[Tuple[str, Agent]], Dict[str, List[str]]]:
+        """
+        Takes agents out of the registry, its indexes and their teams in one copy-on-write update.
+        Called with the lock held. Returns the removed (name, agent) pairs and the changed teams.
+        """
+        agents = dict(self.agents)
+        children = dict(self.children)
+        removed: List[Tuple[str, Agent]] = []
+        for name in names:
+            agent = agents.pop(name, None)
+            if agent is None:
+                continue
+            removed.append((name, agent))
+            self.graph.node_removed(name)
+            # Agents created by a removed agent stay registered but lose their parent
+            children.pop(name, None)
+
+        gone = {name for name, _ in removed}
+        for parent in {getattr(agent, "created_by", None) for _, agent in removed}:
+            if parent in children:
+                remaining = tuple(child for child in children[parent] if child not in gone)
+                if remaining:
+                    children[parent] = remaining
+                else:
+                    del children[parent]
+
+        changed_teams: Dict[str, List[str]] = {}
+        for name in gone:
+            for team_name in self.teams.teams_of(name):
+                members = changed_teams.get(team_name, self.teams[team_name])
+                changed_teams[team_name] = [member for member in members if member != name]
+
+        self.agents = agents
+        self.children = children
+        if changed_teams:
+            self.teams = self.teams.updated(changed_teams)
+        return removed, changed_teams
+
+    def _cleanup_removed(self, removed: List[Tuple[str, Agent]], changed_teams: Dict[str, List[str]], persist: bool):
+        # Runs after the agents left the registry, so no lookup can reach them any more
+        for name, agent in removed:
+            if isinstance(agent, RemoteAgent):
+                agent.close()
+            elif isinstance(agent, OffloadedAgent):
+                self.offload_store.delete(agent.path)
+            else:
+                # Template instances are reset and kept for the next create_agent(template=...)
+                self.templates.release(agent)
 
             self._log_activity({
                 "type": "lifecycle",
@@ -103,14 +464,24 @@ class Swarm:
                 "timestamp": datetime.datetime.now().isoformat()
             })
 
-            # Cleanup team references if this agent was a leader
-            for team_name, members in self.teams.items():
-                if name in members:
-                    members.remove(name)
-                # If the removed agent was the leader (usually first in list or by name convention)
-                # For now, just removing from list is enough.
+        if persist and self.state_store is not None:
+            for name, _ in removed:
+                self.state_store.delete_agent(name)
+            for team_name, members in changed_teams.items():
+                self.state_store.put_team(team_name, members)
 
-        return None
+    def create_agents(self, specs: List[Dict[str, Any]], created_by: Optional[str] = None) -> List[str]:
+        """
+        Creates several agents. Each spec holds `create_agent` arguments (name, role,
+        system_prompt, model, template, created_by); `created_by` is the default creator.
+        Returns one result message per spec, in order.
+        """
+        results = []
+        for spec in specs:
+            spec = dict(spec)
+            spec.setdefault("created_by", created_by)
+            results.append(self.create_agent(**spec))
+        return results
 
     def toggle_agent(self, name: str) -> str:
         """Toggles an agent's active status."""
@@ -122,26 +493,31 @@ class Swarm:
             if name == self.main_agent_name:
                  raise AgentOperationError("Cannot toggle the main manager agent.")
 
-            if agent.status == "active":
-                agent.status = "inactive"
-                return f"Agent '{name}' deactivated."
-            else:
-                agent.status = "active"
-                return f"Agent '{name}' activated."
+            agent.status = "inactive" if agent.status == "active" else "active"
 
-    def create_team(self, name: str, goal: str, lead_role: str, lead_instructions: str) -> str:
+        self._persist_agent(agent)
+        return f"Agent '{name}' {'activated' if agent.status == 'active' else 'deactivated'}."
+
+    def create_team(
+        self,
+        name: str,
+        goal: str,
+        lead_role: str,
+        lead_instructions: str,
+        lead_template: Optional[str] = None
+    ) -> str:
         """
         Creates a new team with a designated leader.
         The leader is instructed to achieve the goal by creating sub-agents if necessary.
+        With `lead_template`, the leader starts from a pre-built instance of that template.
         """
-        with self._lock:
-            if name in self.teams:
-                return f"Error: Team '{name}' already exists."
+        if name in self.teams:
+            return f"Error: Team '{name}' already exists."
 
-            # Create Team Lead
-            lead_name = f"{name}_Lead"
-            if lead_name in self.agents:
-                return f"Error: Agent '{lead_name}' already exists. Cannot create team lead."
+        # Create Team Lead
+        lead_name = f"{name}_Lead"
+        if lead_name in self.agents:
+            return f"Error: Agent '{lead_name}' already exists. Cannot create team lead."
 
         lead_system_prompt = (
             f"You are the {lead_role} and leader of the '{name}' team. "
@@ -154,300 +530,670 @@ class Swarm:
         # Create the lead agent
         # We use the swarm's default model for the lead unless specified otherwise (could be added as param)
         # The lead is created by the main agent (Manager) usually
-        result = self.create_agent(lead_name, lead_role, lead_system_prompt, created_by=self.main_agent_name)
+        result = self.create_agent(
+            lead_name, lead_role, lead_system_prompt, created_by=self.main_agent_name, template=lead_template
+        )
+        if result.startswith("Error"):
+            return result
 
         # Register team
         with self._lock:
-            self.teams[name] = [lead_name]
+            self.teams = self.teams.updated({name: [lead_name]})
+        if self.state_store is not None:
+            self.state_store.put_team(name, [lead_name])
 
         return f"Team '{name}' created. Leader '{lead_name}' is ready. {result}"
 
     def get_agent(self, name: str) -> Optional[Agent]:
+        return self.agents.get(name)
+
+    @contextmanager
+    def pin_agent(self, name: str):
+        """
+        Keeps `name` from being offloaded for the block. Take the pin before looking the
+        agent up for a turn that may wait first (for a budget slot, a shared singleflight
+        turn or the mailbox), so the object found is the one whose history the turn updates.
+        """
         with self._lock:
-            return self.agents.get(name)
-
-    def _register_swarm_tools(self, agent: Agent):
-        # Dynamically build model description
-        available_models = get_available_model_list()
-        # Ensure system default is visible if valid and available
-        if self.default_model and self.default_model not in available_models:
-            if is_provider_available(self.default_model):
-                available_models.insert(0, self.default_model)
-
-        models_str = ", ".join(available_models) if available_models else "No external models configured"
-
-        # Tool: Create Agent
-        create_agent_schema = {
-            "type": "function",
-            "function": {
-                "name": "create_agent",
-                "description": "Creates a new agent with a specific role and instructions.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string", "description": "The name of the new agent."},
-                        "role": {"type": "string", "description": "The role of the new agent (e.g., 'Coder', 'Researcher')."},
-                        "instructions": {"type": "string", "description": "Specific system instructions for the agent."},
-                        "model": {
-                            "type": "string",
-                            "description": (
-                                f"Optional model to use. Available options: {models_str}. "
-                                f"Defaults to system default ({self.default_model})."
-                            )
-                        }
-                    },
-                    "required": ["name", "role", "instructions"]
-                }
-            }
-        }
+            self._pins[name] = self._pins.get(name, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                count = self._pins.pop(name) - 1
+                if count:
+                    self._pins[name] = count
 
-        def create_agent_wrapper(name: str, role: str, instructions: str, model: Optional[str] = None):
-            return self.create_agent(name, role, instructions, model, created_by=agent.name)
-
-        agent.register_tool(create_agent_wrapper, create_agent_schema)
-
-        # Tool: Create Team (Main Agent Only)
-        if agent.name == self.main_agent_name:
-            create_team_schema = {
-                "type": "function",
-                "function": {
-                    "name": "create_team",
-                    "description": "Creates a new team of agents led by a specialized Team Lead.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "name": {
-                                "type": "string",
-                                "description": "The name of the team (e.g., 'Frontend', 'Research')."
-                            },
-                            "goal": {"type": "string", "description": "The primary goal of the team."},
-                            "lead_role": {
-                                "type": "string",
-                                "description": "The role of the team leader (e.g., 'Tech Lead', 'Project Manager')."
-                            },
-                            "lead_instructions": {
-                                "type": "string",
-                                "description": "Specific instructions for the team leader on how to manage the team."
-                            }
-                        },
-                        "required": ["name", "goal", "lead_role", "lead_instructions"]
-                    }
-                }
-            }
-
-            def create_team_wrapper(name: str, goal: str, lead_role: str, lead_instructions: str):
-                return self.create_team(name, goal, lead_role, lead_instructions)
-
-            agent.register_tool(create_team_wrapper, create_team_schema)
-
-            # Tool: Remove Agent (Main Agent Only)
-            remove_agent_schema = {
-                "type": "function",
-                "function": {
-                    "name": "remove_agent",
-                    "description": "Removes/dismisses a sub-agent from the swarm.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "name": {"type": "string", "description": "The name of the agent to remove."}
-                        },
-                        "required": ["name"]
-                    }
-                }
-            }
-
-            def remove_agent_wrapper(name: str):
-                try:
-                    self.remove_agent(name)
-                    return f"Agent '{name}' removed."
-                except Exception as e:
-                    return f"Error: {str(e)}"
-
-            agent.register_tool(remove_agent_wrapper, remove_agent_schema)
-
-            # Tool: Toggle Agent (Main Agent Only)
-            toggle_agent_schema = {
-                "type": "function",
-                "function": {
-                    "name": "toggle_agent",
-                    "description": "Activates or deactivates an agent.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "name": {"type": "string", "description": "The name of the agent."}
-                        },
-                        "required": ["name"]
-                    }
-                }
-            }
-
-            def toggle_agent_wrapper(name: str):
-                try:
-                    return self.toggle_agent(name)
-                except Exception as e:
-                    return f"Error: {str(e)}"
-
-            agent.register_tool(toggle_agent_wrapper, toggle_agent_schema)
-
-        # Tool: Delegate Task
-        delegate_schema = {
-            "type": "function",
-            "function": {
-                "name": "delegate_task",
-                "description": "Delegates a task to another existing agent and waits for the result.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "to_agent": {"type": "string", "description": "The name of the agent to delegate to."},
-                        "task": {"type": "string", "description": "The task description or message."}
-                    },
-                    "required": ["to_agent", "task"]
-                }
-            }
-        }
+    def _pinned(self, name: str) -> bool:
+        return self._pins.get(name, 0) > 0
 
-        def delegate_task_wrapper(to_agent: str, task: str):
-            with self._lock:
-                target_agent = self.agents.get(to_agent)
-                agent_names = list(self.agents.keys())
+    def post_fact(
+        self,
+        author: str,
+        key: str,
+        value: str,
+        tags: Optional[List[str]] = None,
+        expected_version: Optional[int] = None
+    ) -> Fact:
+        """Posts a fact to the swarm blackboard. Raises FactConflictError or ValueError like `Blackboard.post`."""
+        fact = self.blackboard.post(key, value, author, tags=tags, expected_version=expected_version)
+        self._log_activity({
+            "type": "blackboard",
+            "subtype": "post",
+            "agent": author,
+            "summary": f"{fact.key} (v{fact.version})",
+            "timestamp": datetime.datetime.now().isoformat()
+        })
+        return fact
+
+    def offload_agent(self, name: str) -> bool:
+        """
+        Writes an idle agent's history to disk and leaves a lightweight stub in the registry.
+        The stub hydrates the agent on its next turn. Returns False if the agent is the main
+        agent, already offloaded, busy or pinned, or keeps its history in the shared state store.
+        """
+        with self._offload_lock:
+            agent = self.agents.get(name)
+            if agent is None or name == self.main_agent_name or isinstance(agent, (OffloadedAgent, SharedAgent)):
+                return False
+            if self._pinned(name):
+                return False
+            mailbox = getattr(agent, "mailbox", None)
+            if not isinstance(mailbox, AgentMailbox) or mailbox.busy or mailbox.depth:
+                return False
+
+            attachments = {}
+            for ref in agent.attachment_refs():
+                content = attachment_store.get(ref)
+                if content is not None:
+                    attachments[ref] = content
+            path = self.offload_store.save(name, agent.export_state(), attachments)
+            stub = OffloadedAgent(agent, self.offload_store, path, self.hydrate_agent)
 
-            if not target_agent:
-                return f"Error: Agent '{to_agent}' not found. Available agents: {agent_names}"
+            with self._lock:
+                # A turn may have started or been pinned (or the agent removed) while the history was written
+                swapped = (
+                    self.agents.get(name) is agent and not self._pinned(name)
+                    and not mailbox.busy and not mailbox.depth
+                )
+                if swapped:
+                    self.agents = {**self.agents, name: stub}
+            if not swapped:
+                self.offload_store.delete(path)
+                return False
+
+        stub.on_change = self.graph.node_updated
+        if isinstance(agent, RemoteAgent):
+            agent.close()
+        self._log_activity({
+            "type": "lifecycle",
+            "subtype": "offload",
+            "agent": name,
+            "timestamp": datetime.datetime.now().isoformat()
+        })
+        return True
+
+    def hydrate_agent(self, name: str) -> Agent:
+        """
+        Rebuilds an offloaded agent from disk and puts it back in the registry.
+        Returns the live agent (also when it wasn't offloaded).
+        """
+        with self._offload_lock:
+            stub = self.agents.get(name)
+            if stub is None:
+                raise AgentNotFoundError(f"Agent '{name}' not found.")
+            if not isinstance(stub, OffloadedAgent):
+                return stub
 
-            # Record interaction
-            summary = task[:50] + "..." if len(task) > 50 else task
-            timestamp = datetime.datetime.now().isoformat()
+            template = self.templates.get(stub.template) if stub.template is not None else None
+            agent = self._build_agent(
+                name, stub.role, stub.system_prompt, stub.model, stub.is_custom_model, stub.created_by,
+                tools=template.tools if template is not None else None
+            )
+            if stub.template is not None:
+                agent.template = stub.template
+            agent.load_state(stub.export_state())
 
             with self._lock:
-                self.interactions.append({
-                    "source": agent.name,
-                    "target": to_agent,
-                    "summary": summary,  # Brief summary
-                    "timestamp": timestamp
-                })
-
-                # Keep only last 20 interactions
-                if len(self.interactions) > 20:
-                    self.interactions.pop(0)
-
-            # Activity Log - outside lock, request scoped
+                replaced = self.agents.get(name) is stub
+                if replaced:
+                    self.agents = {**self.agents, name: agent}
+            if not replaced:
+                if isinstance(agent, RemoteAgent):
+                    agent.close()
+                raise AgentNotFoundError(f"Agent '{name}' was removed.")
+            agent.on_change = self.graph.node_updated
+            self.offload_store.delete(stub.path)
+
+        self._log_activity({
+            "type": "lifecycle",
+            "subtype": "hydrate",
+            "agent": name,
+            "timestamp": datetime.datetime.now().isoformat()
+        })
+        self._enforce_live_cap(exclude=name)
+        return agent
+
+    def offload_idle_agents(self, ttl: Optional[float] = None) -> int:
+        """Offloads agents without a turn for longer than `ttl` seconds (AGENT_IDLE_TTL). Returns the number offloaded."""
+        ttl = settings.agent_idle_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return 0
+        now = time.monotonic()
+        idle = [
+            name for name, agent in self.agents.items()
+            if isinstance(getattr(agent, "mailbox", None), AgentMailbox) and now - agent.mailbox.last_active > ttl
+        ]
+        return sum(1 for name in idle if self.offload_agent(name))
+
+    def _enforce_live_cap(self, exclude: Optional[str] = None) -> int:
+        """Offloads the least recently active agents while more than MAX_LIVE_AGENTS are in memory."""
+        limit = settings.max_live_agents
+        if limit <= 0:
+            return 0
+        live = [
+            (agent.mailbox.last_active, name) for name, agent in self.agents.items()
+            if isinstance(getattr(agent, "mailbox", None), AgentMailbox)
+        ]
+        overflow = len(live) - limit
+        if overflow <= 0:
+            return 0
+
+        # Busy and pinned agents are skipped, so the live count can briefly exceed the cap
+        offloaded = 0
+        for _, name in sorted(live):
+            if offloaded >= overflow:
+                break
+            if name != exclude and not self._pinned(name) and self.offload_agent(name):
+                offloaded += 1
+        return offloaded
+
+    def _record_interaction(
+        self,
+        source: str,
+        target: str,
+        summary: str,
+        subtype: Optional[str] = None,
+        chain: Optional[tuple] = None
+    ):
+        """
+        Records an interaction edge for the graph and the request's activity log.
+        `chain` is the delegation path the exchange belongs to; it lets clients rebuild the delegation tree.
+        """
+        # The log is lock-free, so recording never contends with registry writers
+        record = self.interactions.append(source, target, summary)
+        self.graph.edge_added(self._edge(record))
+        if self.state_store is not None:
+            self.state_store.append_interaction({**record.to_dict(), "origin": self._instance_id})
+
+        # Activity Log - request scoped
+        activity = {
+            "type": "interaction",
+            "source": source,
+            "target": target,
+            "summary": summary,
+            "timestamp": record.timestamp
+        }
+        if subtype is not None:
+            activity["subtype"] = subtype
+        if chain:
+            activity["chain"] = list(chain)
+            activity["depth"] = len(chain) - 1
+        self._log_activity(activity)
+
+    def delegate_task(self, caller: str, to_agent: str, task: str) -> str:
+        """
+        Sends a task from one agent to another and returns the target's answer.
+        Cycles, chains deeper than MAX_DELEGATION_DEPTH and delegations that find no free
+        slot in the swarm-wide budget are rejected with an error string the model can act on.
+        With DELEGATION_SINGLEFLIGHT, callers sending the same task to the same agent at the
+        same time share one turn and its answer. Answers over DELEGATION_RESULT_MAX_CHARS are
+        stored in `results` and returned as a preview or summary with a handle for read_result.
+        """
+        agents = self.agents
+        if to_agent not in agents:
+            return f"Error: Agent '{to_agent}' not found. Available agents: {list(agents.keys())}"
+
+        if is_cancelled():
+            return f"Error: Delegation to '{to_agent}' cancelled."
+
+        summary = task[:50] + "..." if len(task) > 50 else task
+        try:
+            chain = self._admit_delegation(caller, to_agent)
+        except DelegationLimitError as e:
+            return f"Error: {e}"
+
+        def run_turn() -> str:
+            with self.delegations.slot():
+                self._record_interaction(caller, to_agent, summary, subtype="request", chain=chain)
+                # Look the target up only now: it is pinned, so this is the object whose history gets the turn
+                target_agent = self.agents.get(to_agent)
+                if target_agent is None:
+                    return f"Error: Agent '{to_agent}' was removed."
+                # We add the sender's context implicitly by just chatting with the target
+                # In a more complex system, we'd pass the sender's name.
+                try:
+                    with delegation_scope(chain):
+                        return target_agent.chat(f"Request from {caller}: {task}", lane=LANE_DELEGATION)
+                except Exception as e:
+                    return f"Error: Delegation to '{to_agent}' failed: {str(e)}"
+
+        try:
+            # The target must not be offloaded while this waits for a slot or a shared turn
+            with self.pin_agent(to_agent):
+                if settings.delegation_singleflight:
+                    response, shared = self.singleflight.do(
+                        (to_agent, normalize_task(task)), run_turn,
+                        shareable=lambda result: not result.startswith("Error")
+                    )
+                    if shared:
+                        # The turn ran for another caller; still draw this caller's exchange
+                        self._record_interaction(caller, to_agent, summary, subtype="request", chain=chain)
+                else:
+                    response = run_turn()
+        except DelegationLimitError as e:
+            return f"Error: {e}"
+        except OperationCancelledError:
+            return f"Error: Delegation to '{to_agent}' cancelled."
+
+        response_summary = "Response: " + (response[:50] + "..." if len(response) > 50 else response)
+        self._record_interaction(to_agent, caller, response_summary, subtype="response", chain=chain)
+
+        # Keep the caller's history lean: long answers are stored and referenced by handle
+        response = fit_result(response, task, self.results, settings.delegation_summary_model or self.default_model)
+        return f"Response from {to_agent}: {response}"
+
+    def _admit_delegation(self, caller: Optional[str], to_agent: str) -> Tuple[str, ...]:
+        """check_delegation that also reports rejections to the activity log."""
+        try:
+            return check_delegation(caller, to_agent)
+        except DelegationLimitError as e:
             self._log_activity({
-                "type": "interaction",
-                "source": agent.name,
+                "type": "delegation",
+                "subtype": "rejected",
+                "source": caller,
                 "target": to_agent,
-                "summary": summary,
-                "timestamp": timestamp
+                "summary": str(e),
+                "timestamp": datetime.datetime.now().isoformat()
             })
+            raise
 
-            # We add the sender's context implicitly by just chatting with the target
-            # In a more complex system, we'd pass the sender's name.
-            try:
-                response = target_agent.chat(f"Request from {agent.name}: {task}")
-            except Exception as e:
-                response = f"Error: Delegation to '{to_agent}' failed: {str(e)}"
+    def run_delegated(self, caller: Optional[str], to_agent: str, turn: Callable[[], str]) -> str:
+        """
+        Runs `turn()` (a turn of `to_agent` on behalf of `caller`) under the same limits
+        as delegate_task: the cycle and depth checks, a slot in the swarm-wide budget and
+        the delegation chain. Rejections and cancellation come back as error strings.
+        """
+        try:
+            chain = self._admit_delegation(caller, to_agent)
+            with self.delegations.slot(), delegation_scope(chain):
+                return turn()
+        except DelegationLimitError as e:
+            return f"Error: {e}"
+        except OperationCancelledError:
+            return f"Error: Delegation to '{to_agent}' cancelled."
+
+    def _run_delegation(self, token: CancellationToken, timeout: float, caller: str, to_agent: str, task: str) -> str:
+        # Runs inside a copied context on a pool thread; the token is scoped to this one task.
+        # Sibling branches run beside the caller's turn, so they must not re-enter its agents.
+        cancel_token_ctx.set(token)
+        release_held_turns()
+        timer = threading.Timer(timeout, token.cancel, args=("timeout",))
+        timer.daemon = True
+        timer.start()
+        try:
+            response = self.delegate_task(caller, to_agent, task)
+        finally:
+            timer.cancel()
 
-            response_summary = "Response: " + (response[:50] + "..." if len(response) > 50 else response)
-            response_timestamp = datetime.datetime.now().isoformat()
+        if token.reason == "timeout":
+            return f"Error: Task for '{to_agent}' timed out after {timeout:g}s."
+        return response
+
+    def delegate_tasks(
+        self,
+        caller: str,
+        tasks: List[Dict[str, str]],
+        timeout: Optional[float] = None
+    ) -> List[str]:
+        """
+        Runs several delegations concurrently on a bounded pool.
+        Returns one result per task, in the order the tasks were given.
+        `timeout` is capped at DELEGATION_TIMEOUT.
+        """
+        for item in tasks:
+            if not isinstance(item, dict) or "to_agent" not in item or "task" not in item:
+                raise ValueError("Each task must be an object with 'to_agent' and 'task'.")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("Timeout must be a positive number of seconds.")
+        if not tasks:
+            return []
+
+        # The model picks the timeout; don't let it hold pool threads and budget slots for longer
+        timeout = min(timeout or settings.delegation_timeout, settings.delegation_timeout)
+        parent_token = current_token()
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(settings.max_parallel_delegations, len(tasks))),
+            thread_name_prefix="delegate"
+        )
+
+        submitted = []
+        for item in tasks:
+            token = parent_token.child() if parent_token is not None else CancellationToken()
+            # Copy the context so activity logging and cancellation reach the worker thread
+            ctx = contextvars.copy_context()
+            future = executor.submit(
+                ctx.run, self._run_delegation, token, timeout, caller, item["to_agent"], item["task"]
+            )
+            submitted.append((item, token, future))
+
+        results = []
+        try:
+            # The branches take budget slots of their own, so don't hold one while waiting for them
+            with self.delegations.released():
+                for item, token, future in submitted:
+                    try:
+                        # Tasks time themselves out; the extra wait covers cleanup after cancellation
+                        results.append(future.result(timeout=timeout + DELEGATION_GRACE_PERIOD))
+                    except FuturesTimeoutError:
+                        token.cancel("timeout")
+                        results.append(f"Error: Task for '{item['to_agent']}' timed out after {timeout:g}s.")
+                    except Exception as e:
+                        results.append(f"Error: Delegation to '{item['to_agent']}' failed: {str(e)}")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
+
+    def start_task(self, caller: str, to_agent: str, task: str) -> DelegatedTask:
+        """
+        Starts a delegation in the background and returns its task record.
+        Raises AgentNotFoundError if the target does not exist.
+        """
+        agents = self.agents
+        if to_agent not in agents:
+            raise AgentNotFoundError(
+                f"Agent '{to_agent}' not found. Available agents: {list(agents.keys())}"
+            )
+
+        def run(task_text: str) -> str:
+            # The caller's turn may end before this finishes, so don't inherit its held turns
+            release_held_turns()
+            return self.delegate_task(caller, to_agent, task_text)
+
+        return self.tasks.start(caller, to_agent, task, run)
+
+    def describe_task(self, record: Optional[DelegatedTask], task_id: str = "") -> str:
+        """Formats a background task's status, partial output or result for an agent."""
+        if record is None:
+            return f"[{task_id}] Error: Unknown task handle."
+
+        if record.status == TASK_PENDING:
+            return f"[{record.id}] {record.target}: pending (queued, not started yet)."
+
+        if record.status == TASK_RUNNING:
+            target = self.get_agent(record.target)
+            latest = getattr(target, "last_thought", "Unknown") if target else "Unknown"
+            return (
+                f"[{record.id}] {record.target}: running for {record.elapsed:.1f}s. "
+                f"Latest activity: {latest}"
+            )
+
+        return f"[{record.id}] {record.target}: {record.status} after {record.elapsed:.1f}s.\n{record.result}"
+
+    def _clone_worker(self, template: Agent, index: int, caller: str) -> Agent:
+        """
+        Builds an ephemeral copy of a template agent. Clones are never added to the registry
+        and get the worker's base tools, restricted like the worker if it came from a template.
+        """
+        worker_template = self.templates.get(template.template) if getattr(template, "template", None) else None
+        clone = Agent(
+            f"{template.name}#{index}",
+            template.role,
+            template.system_prompt,
+            model=template.model,
+            is_custom_model=template.is_custom_model,
+            created_by=caller
+        )
+        # Base tools only: clones must not spawn or delegate further
+        self._register_base_tools(clone, worker_template.tools if worker_template is not None else None)
+        return clone
+
+    def map_task(
+        self,
+        caller: str,
+        worker: str,
+        task: str,
+        inputs: List[str],
+        max_concurrency: Optional[int] = None,
+        retries: int = 1,
+        reduce_task: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Applies `task` to every input using ephemeral clones of the `worker` agent.
+
+        Each input gets a fresh context on one of up to `max_concurrency` clones and is
+        retried up to `retries` times on error. Completed items stream to the activity
+        log. If `reduce_task` is given, a final clone combines all outputs.
+        Returns {"results": [...], "reduced": str or None}.
+        """
+        template = self.get_agent(worker)
+        if not isinstance(template, (Agent, RemoteAgent, OffloadedAgent)):
+            raise AgentNotFoundError(f"Worker template '{worker}' not found.")
+        if len(inputs) > settings.map_max_inputs:
+            raise ValueError(f"Too many inputs ({len(inputs)}). Limit is {settings.map_max_inputs}.")
+
+        concurrency = max(1, min(max_concurrency or settings.max_parallel_delegations, len(inputs) or 1))
+        clones: "queue.Queue[Agent]" = queue.Queue()
+        for i in range(concurrency):
+            clones.put(self._clone_worker(template, i + 1, caller))
+        system_message = {"role": "system", "content": f"You are {worker}, a {template.role}. {template.system_prompt}"}
+
+        self._record_interaction(caller, worker, f"Map: {len(inputs)} inputs")
+        completed = itertools.count(1)
+
+        def attempt(clone: Agent, item: str) -> str:
+            # Fresh context per attempt
+            clone.messages = [dict(system_message)]
+            return clone.chat(f"{task}\n\nInput:\n{item}", lane=LANE_DELEGATION)
+
+        def run_item(index: int, item: str) -> str:
+            clone = clones.get()
+            try:
+                result = ""
+                for _ in range(max(0, retries) + 1):
+                    if is_cancelled():
+                        result = "Error: Request cancelled."
+                        break
+                    # Each attempt is a delegation to a clone: budgeted and depth-checked like delegate_task,
+                    # so a slot timeout is retried like a failed turn
+                    result = self.run_delegated(caller, clone.name, lambda: attempt(clone, item))
+                    if not result.startswith("Error"):
+                        break
+            finally:
+                clones.put(clone)
 
-            with self._lock:
-                # Record response interaction
-                self.interactions.append({
-                    "source": to_agent,
-                    "target": agent.name,
-                    "summary": response_summary,
-                    "timestamp": response_timestamp
-                })
-
-                if len(self.interactions) > 20:
-                    self.interactions.pop(0)
-
-            # Activity Log - outside lock, request scoped
             self._log_activity({
-                "type": "interaction",
-                "source": to_agent,
-                "target": agent.name,
-                "summary": response_summary,
-                "timestamp": response_timestamp
+                "type": "map",
+                "subtype": "item_done",
+                "agent": worker,
+                "summary": f"{next(completed)}/{len(inputs)} (input {index + 1}): {result[:50]}",
+                "timestamp": datetime.datetime.now().isoformat()
             })
+            return result
 
-            return f"Response from {to_agent}: {response}"
-
-        agent.register_tool(delegate_task_wrapper, delegate_schema)
-
-        # Tool: List Agents
-        list_agents_schema = {
-            "type": "function",
-            "function": {
-                "name": "list_agents",
-                "description": "Lists all available agents and teams in the swarm.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            }
-        }
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="map")
+        try:
+            futures = [
+                executor.submit(contextvars.copy_context().run, run_item, i, item)
+                for i, item in enumerate(inputs)
+            ]
+            with self.delegations.released():
+                results = [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        reduced = None
+        if reduce_task and results:
+            reducer = self._clone_worker(template, 0, caller)
+            combined = "\n\n".join(f"[{i}] {result}" for i, result in enumerate(results, start=1))
+            reduced = self.run_delegated(
+                caller, reducer.name,
+                lambda: reducer.chat(f"{reduce_task}\n\nResults:\n{combined}", lane=LANE_DELEGATION)
+            )
 
-        def list_agents_wrapper():
-            with self._lock:
-                agent_list = list(self.agents.keys())
-                team_list = list(self.teams.keys())
-            return f"Available agents: {agent_list}. Teams: {team_list}"
+        # Drop the ephemeral workers so their histories can be garbage-collected
+        while not clones.empty():
+            clones.get_nowait()
 
-        agent.register_tool(list_agents_wrapper, list_agents_schema)
+        self._record_interaction(worker, caller, f"Map done: {len(results)} results")
+        return {"results": results, "reduced": reduced}
+
+    def run_workflow(self, spec: Union[Workflow, Dict[str, Any], str], caller: Optional[str] = None) -> WorkflowResult:
+        """
+        Runs a declarative multi-agent workflow (a Workflow, dict, or JSON string).
+        Each step is a delegation from `caller` (None when started outside an agent).
+        Raises WorkflowError if the definition is invalid.
+        """
+        if isinstance(spec, str):
+            workflow = Workflow.from_json(spec)
+        elif isinstance(spec, dict):
+            workflow = Workflow.from_dict(spec)
+        else:
+            workflow = spec
+        return WorkflowRunner(self, cache=self.workflow_cache, caller=caller).run(workflow)
 
     def update_settings(self):
         """Reloads configuration and updates agents."""
         # Allow env var to override default model
         self.default_model = settings.llm_model or "gpt-4o"
 
-        with self._lock:
-            # Update existing agents to use the new default model if they aren't custom
-            for agent in self.agents.values():
-                if not getattr(agent, "is_custom_model", False):
-                    agent.model = self.default_model
+        # Shared tool schemas (e.g. the available model list) are rebuilt on next use
+        self.tool_catalog.invalidate()
+        if self.broker is not None and self.broker.running:
+            # Worker processes re-read .env so new credentials reach remote agents
+            self.broker.broadcast({"op": "reload"})
 
-                # Re-register tools to update dynamic descriptions (like available models)
-                self._register_swarm_tools(agent)
+        # Update existing agents to use the new default model if they aren't custom
+        for agent in self.agents.values():
+            if not getattr(agent, "is_custom_model", False):
+                agent.model = self.default_model
 
-                # Clear client to ensure new auth is picked up if needed
-                agent.client = None
+            # Clear client to ensure new auth is picked up if needed
+            agent.client = None
 
-    def chat(self, message: str, attachments: Optional[List[Dict[str, Any]]] = None) -> str:
+    def chat(
+        self,
+        message: str,
+        attachments: Optional[List[Dict[str, Any]]] = None,
+        lane: str = LANE_USER
+    ) -> str:
         """
         Entry point for the user to chat with the main agent.
+        `lane` sets the turn's queue priority (e.g. heartbeat turns yield to user turns).
         """
-        with self._lock:
-            main_agent = self.agents[self.main_agent_name]
+        if is_cancelled():
+            return "Error: Request cancelled."
+
+        main_agent = self.agents[self.main_agent_name]
+        return main_agent.chat(message, attachments=attachments, lane=lane)
+
+    def is_idle(self) -> bool:
+        """True if no agent is running or waiting for a turn."""
+        for agent in self.agents.values():
+            mailbox = getattr(agent, "mailbox", None)
+            if isinstance(mailbox, AgentMailbox) and (mailbox.busy or mailbox.depth):
+                return False
+        return True
+
+    def export_state(self) -> Dict[str, Any]:
+        """Returns a JSON-serializable snapshot of agents, histories, teams and interactions."""
+        agents = list(self.agents.values())
+        teams = {name: list(members) for name, members in self.teams.items()}
+
+        return {
+            "main_agent_name": self.main_agent_name,
+            "agents": [agent.export_state() for agent in agents],
+            "teams": teams,
+            "interactions": self.interactions.to_list(),
+            "templates": [template.to_dict() for template in self.templates.templates()],
+            "facts": self.blackboard.to_list(),
+            "facts_seq": self.blackboard.seq,
+        }
 
-        # Don't hold lock during LLM inference
-        return main_agent.chat(message, attachments=attachments)
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "Swarm":
+        """Rebuilds a swarm from `export_state` output."""
+        # Restoring is not user-visible activity, keep it out of the request's activity log
+        log_token = activity_log_ctx.set(None)
+        try:
+            swarm = cls(main_agent_name=state["main_agent_name"])
+            for template in state.get("templates", []):
+                swarm.register_template(**template)
+            for agent_state in state.get("agents", []):
+                name = agent_state["name"]
+                if name != swarm.main_agent_name:
+                    swarm.create_agent(
+                        name, agent_state["role"], agent_state["system_prompt"],
+                        created_by=agent_state.get("created_by")
+                    )
+                agent = swarm.agents[name]
+                # Custom models are restored as-is even if their provider is no longer configured
+                if agent_state.get("is_custom_model"):
+                    agent.model = agent_state["model"]
+                    agent.is_custom_model = True
+                agent.load_state(agent_state)
+        finally:
+            activity_log_ctx.reset(log_token)
+
+        swarm.teams = TeamMap({name: list(members) for name, members in state.get("teams", {}).items()})
+        swarm.interactions.restore(state.get("interactions", []))
+        swarm.blackboard.restore(state.get("facts", []), seq=state.get("facts_seq", 0))
+        return swarm
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns per-agent turn queue depth and wait times."""
+        return {
+            name: agent.mailbox.stats()
+            for name, agent in self.agents.items()
+            if isinstance(getattr(agent, "mailbox", None), AgentMailbox)
+        }
+
+    @staticmethod
+    def _edge(interaction: Interaction) -> Dict[str, Any]:
+        return {
+            "source": interaction.source,
+            "target": interaction.target,
+            "label": interaction.summary,
+            "timestamp": interaction.timestamp
+        }
 
-    def get_graph_data(self) -> Dict[str, List[Dict[str, Any]]]:
+    def _graph_edges(self, limit: int) -> List[Dict[str, Any]]:
+        # Only the most recent exchanges are drawn; the full log is served by get_interactions
+        return [self._edge(interaction) for interaction in self.interactions.latest(limit)]
+
+    def get_graph_data(self) -> Dict[str, Any]:
         """
         Returns the current swarm topology and interaction history.
+        The snapshot is cached per graph version and must not be mutated.
         """
-        nodes = []
-        with self._lock:
-            for name, agent in self.agents.items():
-                nodes.append({
-                    "id": name,
-                    "name": name,
-                    "parent": agent.created_by,
-                    "status": getattr(agent, "status", "active"),
-                    "last_thought": getattr(agent, "last_thought", "Idle")
-                })
-
-            # Format edges from interactions
-            # We could also add structural edges (parent-child) implicitly in frontend
-            # or explicitly here. Let's send interaction edges.
-            edges = []
-            for interaction in self.interactions:
-                edges.append({
-                    "source": interaction["source"],
-                    "target": interaction["target"],
-                    "label": interaction["summary"],
-                    "timestamp": interaction.get("timestamp", "")
-                })
-
-        return {"nodes": nodes, "edges": edges}
+        return self.graph.snapshot()
+
+    def get_graph_changes(self, since: int) -> Dict[str, Any]:
+        """Returns graph changes after version `since`. See SwarmGraph.changes."""
+        return self.graph.changes(since)
+
+    def get_interactions(
+        self,
+        agent: Optional[str] = None,
+        since_seq: Optional[int] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Queries the interaction log. See InteractionLog.query for the filters."""
+        records = self.interactions.query(agent=agent, since_seq=since_seq, start=start, end=end, limit=limit)
+        return {
+            "interactions": [record.to_dict() for record in records],
+            "last_seq": self.interactions.last_seq,
+        }
@@ -0,0 +1,179 @@
+import contextvars
+import itertools
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Any, List, Optional
+from opencore.config import settings
+from opencore.core.cancellation import CancellationToken, current_token
+from opencore.core.context import cancel_token_ctx
+
+# Task lifecycle states
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_COMPLETED = "completed"
+TASK_FAILED = "failed"
+TASK_CANCELLED = "cancelled"
+FINISHED_STATES = {TASK_COMPLETED, TASK_FAILED, TASK_CANCELLED}
+
+
+@dataclass
+class DelegatedTask:
+    id: str
+    caller: str
+    target: str
+    task: str
+    token: CancellationToken
+    status: str = TASK_PENDING
+    result: Optional[str] = None
+    created_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    future: Optional[Future] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent running so far (or in total, once finished)."""
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "caller": self.caller,
+            "target": self.target,
+            "task": self.task,
+            "status": self.status,
+            "result": self.result,
+            "elapsed": round(self.elapsed, 2),
+        }
+
+
+class TaskRegistry:
+    """
+    Swarm-level registry of background delegations.
+
+    `start` schedules a delegation on a bounded worker pool and returns its handle
+    immediately, so the calling agent can keep working and collect the result later
+    with `wait`. Finished tasks are retained up to `max_retained`, oldest dropped first.
+    """
+    def __init__(self, max_workers: Optional[int] = None, max_retained: Optional[int] = None):
+        self.max_workers = max_workers or settings.max_background_tasks
+        self.max_retained = max_retained or settings.max_retained_tasks
+        self._lock = threading.Lock()
+        self._tasks: "OrderedDict[str, DelegatedTask]" = OrderedDict()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._counter = itertools.count(1)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created lazily so swarms that never use background tasks don't hold a pool
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="swarm-task"
+                )
+            return self._executor
+
+    def start(self, caller: str, target: str, task: str, runner: Callable[[str], str]) -> DelegatedTask:
+        """
+        Schedules `runner(task)` in the background and returns the task record.
+        The task inherits cancellation from the starting request.
+        """
+        parent_token = current_token()
+        token = parent_token.child() if parent_token is not None else CancellationToken()
+        task_id = f"task_{next(self._counter)}_{uuid.uuid4().hex[:6]}"
+        record = DelegatedTask(id=task_id, caller=caller, target=target, task=task, token=token)
+
+        with self._lock:
+            self._tasks[task_id] = record
+            self._prune()
+
+        ctx = contextvars.copy_context()
+        record.future = self._get_executor().submit(ctx.run, self._run, record, runner)
+        return record
+
+    def _run(self, record: DelegatedTask, runner: Callable[[str], str]):
+        cancel_token_ctx.set(record.token)
+        if record.token.cancelled:
+            self._finish(record, TASK_CANCELLED, "Error: Task cancelled before it started.")
+            return
+
+        record.started_at = time.monotonic()
+        record.status = TASK_RUNNING
+        try:
+            result = runner(record.task)
+        except Exception as e:
+            self._finish(record, TASK_FAILED, f"Error: {str(e)}")
+            return
+
+        status = TASK_CANCELLED if record.token.cancelled else TASK_COMPLETED
+        self._finish(record, status, result)
+
+    def _finish(self, record: DelegatedTask, status: str, result: str):
+        record.result = result
+        record.finished_at = time.monotonic()
+        if record.started_at is None:
+            record.started_at = record.finished_at
+        record.status = status
+
+    def _prune(self):
+        # Called with the lock held; never drops tasks that are still in flight
+        excess = len(self._tasks) - self.max_retained
+        for task_id in list(self._tasks):
+            if excess <= 0:
+                break
+            if self._tasks[task_id].finished:
+                del self._tasks[task_id]
+                excess -= 1
+
+    def get(self, task_id: str, caller: Optional[str] = None) -> Optional[DelegatedTask]:
+        """Returns a task record. With `caller`, tasks started by anyone else are not found."""
+        with self._lock:
+            record = self._tasks.get(task_id)
+        if record is not None and caller is not None and record.caller != caller:
+            return None
+        return record
+
+    def list(self, caller: Optional[str] = None) -> List[DelegatedTask]:
+        with self._lock:
+            tasks = list(self._tasks.values())
+        return [t for t in tasks if caller is None or t.caller == caller]
+
+    def wait(
+        self,
+        task_ids: List[str],
+        timeout: Optional[float] = None,
+        caller: Optional[str] = None
+    ) -> List[Optional[DelegatedTask]]:
+        """Waits until all given tasks finish or the timeout passes; returns their records."""
+        records = [self.get(task_id, caller) for task_id in task_ids]
+        futures = [r.future for r in records if r is not None and r.future is not None]
+        if futures:
+            wait(futures, timeout=timeout)
+        return records
+
+    def cancel(self, task_id: str, caller: Optional[str] = None) -> bool:
+        record = self.get(task_id, caller)
+        if record is None or record.finished:
+            return False
+        record.token.cancel("cancelled by caller")
+        return True
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            tasks = list(self._tasks.values())
+        for record in tasks:
+            if not record.finished:
+                record.token.cancel("shutdown")
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,50 @@
+from typing import Dict, Iterable, List, Tuple
+
+
+class TeamMap(dict):
+    """
+    Team name -> member list, with a reverse index of the teams each agent belongs to.
+
+    The swarm replaces its map instead of mutating it (`updated` returns a changed
+    copy), but item assignment keeps the index in step as well. Member lists are
+    replaced, never appended to.
+    """
+    def __init__(self, teams: Dict[str, List[str]] = None):
+        super().__init__()
+        self._index: Dict[str, Tuple[str, ...]] = {}
+        self.update(teams or {})
+
+    def __setitem__(self, name: str, members: List[str]):
+        if name in self:
+            self._unindex(name, self[name])
+        super().__setitem__(name, members)
+        for member in members:
+            self._index[member] = self._index.get(member, ()) + (name,)
+
+    def __delitem__(self, name: str):
+        self._unindex(name, self[name])
+        super().__delitem__(name)
+
+    def update(self, teams: Dict[str, List[str]] = (), **kwargs):
+        for name, members in dict(teams, **kwargs).items():
+            self[name] = members
+
+    def _unindex(self, team: str, members: Iterable[str]):
+        for member in members:
+            teams = tuple(t for t in self._index.get(member, ()) if t != team)
+            if teams:
+                self._index[member] = teams
+            else:
+                self._index.pop(member, None)
+
+    def teams_of(self, agent: str) -> Tuple[str, ...]:
+        """Names of the teams `agent` is a member of."""
+        return self._index.get(agent, ())
+
+    def updated(self, changes: Dict[str, List[str]]) -> "TeamMap":
+        """Returns a copy with the teams in `changes` added or replaced."""
+        copy = TeamMap()
+        dict.update(copy, self)
+        copy._index = dict(self._index)
+        copy.update(changes)
+        return copy
@@ -0,0 +1,163 @@
+import logging
+import queue
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, Any, List, Optional
+from opencore.config import settings
+from opencore.core.agent import Agent
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AgentTemplate:
+    """
+    A reusable agent definition. `tools` restricts the agent's own tools (the base
+    tools such as read_file or execute_command) to the listed names; None keeps all.
+    `warm` is how many ready-built instances the pool keeps (None uses AGENT_POOL_SIZE),
+    capped at AGENT_POOL_MAX.
+    """
+    name: str
+    role: str
+    system_prompt: str
+    model: Optional[str] = None
+    tools: Optional[List[str]] = None
+    warm: Optional[int] = None
+
+    @property
+    def pool_size(self) -> int:
+        size = self.warm if self.warm is not None else settings.agent_pool_size
+        return max(0, min(size, settings.agent_pool_max))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _TemplateSlot:
+    template: AgentTemplate
+    ready: List[Agent] = field(default_factory=list)
+    built: int = 0
+    reused: int = 0
+    cold: int = 0
+    filling: bool = False
+
+
+class AgentPool:
+    """
+    Registered agent templates and a pool of pre-built instances for each.
+
+    `acquire` hands out a ready instance (or None, and the caller builds one cold)
+    and, with `auto_refill`, tops the pool back up on a background thread.
+    `release` resets a retired instance and keeps it for the next caller if the
+    pool has room.
+    """
+    def __init__(self, factory: Callable[[AgentTemplate], Agent], auto_refill: bool = True):
+        self._factory = factory
+        self._auto_refill = auto_refill
+        self._lock = threading.Lock()
+        self._slots: Dict[str, _TemplateSlot] = {}
+        # One long-lived refill thread, so handing out an instance never pays for a thread start
+        self._refills: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+        self._refiller: Optional[threading.Thread] = None
+
+    def register(self, template: AgentTemplate, prewarm: bool = True):
+        """Adds or replaces a template; ready instances of an older definition are dropped."""
+        with self._lock:
+            self._slots[template.name] = _TemplateSlot(template)
+        if prewarm:
+            self.fill(template.name)
+
+    def unregister(self, name: str) -> bool:
+        with self._lock:
+            return self._slots.pop(name, None) is not None
+
+    def get(self, name: str) -> Optional[AgentTemplate]:
+        slot = self._slots.get(name)
+        return slot.template if slot is not None else None
+
+    def templates(self) -> List[AgentTemplate]:
+        with self._lock:
+            return [slot.template for slot in self._slots.values()]
+
+    def acquire(self, name: str) -> Optional[Agent]:
+        """Returns a pre-built instance of template `name`, or None if none is ready."""
+        with self._lock:
+            slot = self._slots.get(name)
+            if slot is None:
+                return None
+            agent = slot.ready.pop() if slot.ready else None
+            if agent is None:
+                slot.cold += 1
+            if self._auto_refill and not slot.filling and len(slot.ready) < slot.template.pool_size:
+                slot.filling = True
+                if self._refiller is None:
+                    self._refiller = threading.Thread(target=self._refill_loop, name="agent-pool", daemon=True)
+                    self._refiller.start()
+                self._refills.put(name)
+        return agent
+
+    def release(self, agent: Agent) -> bool:
+        """
+        Resets `agent` and returns it to its template's pool.
+        Returns False (and leaves the agent alone) if it isn't pooled, is still busy or the pool is full.
+        """
+        name = getattr(agent, "template", None)
+        mailbox = agent.mailbox
+        if name is None or mailbox.busy or mailbox.depth:
+            return False
+
+        with self._lock:
+            slot = self._slots.get(name)
+            if slot is None or len(slot.ready) >= slot.template.pool_size:
+                return False
+            # Pooled instances wait under the template's name until they're handed out again
+            template = slot.template
+            agent.reset(template.name, template.role, template.system_prompt)
+            slot.ready.append(agent)
+            slot.reused += 1
+        return True
+
+    def fill(self, name: str):
+        """Builds instances until template `name` has its full pool ready."""
+        while True:
+            with self._lock:
+                slot = self._slots.get(name)
+                if slot is None or len(slot.ready) >= slot.template.pool_size:
+                    return
+                template = slot.template
+
+            agent = self._factory(template)
+            with self._lock:
+                # Drop the instance if the template was replaced or removed meanwhile
+                if self._slots.get(name) is not slot:
+                    return
+                slot.ready.append(agent)
+                slot.built += 1
+
+    def _refill_loop(self):
+        while True:
+            name = self._refills.get()
+            try:
+                self.fill(name)
+            except Exception as e:
+                logger.warning(f"Could not pre-build agents for template '{name}': {e}")
+            finally:
+                with self._lock:
+                    slot = self._slots.get(name)
+                    if slot is not None:
+                        slot.filling = False
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per template: ready instances, pool size, instances built, reused and cold starts."""
+        with self._lock:
+            return {
+                name: {
+                    "ready": len(slot.ready),
+                    "size": slot.template.pool_size,
+                    "built": slot.built,
+                    "reused": slot.reused,
+                    "cold": slot.cold,
+                }
+                for name, slot in self._slots.items()
+            }
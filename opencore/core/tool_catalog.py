@@ -0,0 +1,505 @@
+import functools
+import threading
+from typing import Callable, Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+from opencore.config import settings
+from opencore.llm.factory import is_provider_available, get_available_model_list
+from opencore.core.exceptions import AgentNotFoundError, FactConflictError
+from opencore.core.workflow import WorkflowError
+
+if TYPE_CHECKING:
+    from opencore.core.swarm import Swarm
+
+# Tool scopes: every agent gets the agent tools, the main agent also gets the manager tools
+SCOPE_AGENT = "agent"
+SCOPE_MANAGER = "manager"
+
+
+# Handlers take (swarm, caller, **arguments). The caller is bound when the tool is looked up.
+
+def _create_agent(
+    swarm: "Swarm",
+    caller: str,
+    name: str,
+    role: Optional[str] = None,
+    instructions: Optional[str] = None,
+    model: Optional[str] = None,
+    template: Optional[str] = None
+):
+    return swarm.create_agent(name, role, instructions, model, created_by=caller, template=template)
+
+
+def _create_team(
+    swarm: "Swarm",
+    caller: str,
+    name: str,
+    goal: str,
+    lead_role: str,
+    lead_instructions: str,
+    lead_template: Optional[str] = None
+):
+    return swarm.create_team(name, goal, lead_role, lead_instructions, lead_template=lead_template)
+
+
+def _remove_agent(swarm: "Swarm", caller: str, name: str):
+    try:
+        swarm.remove_agent(name)
+        return f"Agent '{name}' removed."
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+def _toggle_agent(swarm: "Swarm", caller: str, name: str):
+    try:
+        return swarm.toggle_agent(name)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+def _run_workflow(swarm: "Swarm", caller: str, workflow: str):
+    try:
+        return swarm.run_workflow(workflow, caller=caller).summary()
+    except WorkflowError as e:
+        return f"Error: {str(e)}"
+
+
+def _delegate_task(swarm: "Swarm", caller: str, to_agent: str, task: str):
+    return swarm.delegate_task(caller, to_agent, task)
+
+
+def _delegate_tasks(swarm: "Swarm", caller: str, tasks: List[Dict[str, str]], timeout: Optional[int] = None):
+    try:
+        results = swarm.delegate_tasks(caller, tasks, timeout=timeout)
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    return "\n\n".join(f"[{i}] {result}" for i, result in enumerate(results, start=1))
+
+
+def _map_task(
+    swarm: "Swarm",
+    caller: str,
+    worker: str,
+    task: str,
+    inputs: List[str],
+    max_concurrency: Optional[int] = None,
+    retries: int = 1,
+    reduce_task: Optional[str] = None
+):
+    try:
+        outcome = swarm.map_task(caller, worker, task, inputs, max_concurrency, retries, reduce_task)
+    except (AgentNotFoundError, ValueError) as e:
+        return f"Error: {str(e)}"
+
+    if outcome["reduced"] is not None:
+        return f"Reduced result from {len(inputs)} inputs:\n{outcome['reduced']}"
+    return "\n\n".join(f"[{i}] {result}" for i, result in enumerate(outcome["results"], start=1))
+
+
+def _start_task(swarm: "Swarm", caller: str, to_agent: str, task: str):
+    try:
+        record = swarm.start_task(caller, to_agent, task)
+    except AgentNotFoundError as e:
+        return f"Error: {str(e)}"
+    return f"Task started on '{to_agent}' with handle '{record.id}'."
+
+
+def _check_task(swarm: "Swarm", caller: str, handle: str):
+    # Handles are only visible to the agent that started the task
+    return swarm.describe_task(swarm.tasks.get(handle, caller), handle)
+
+
+def _await_tasks(swarm: "Swarm", caller: str, handles: List[str], timeout: Optional[int] = None):
+    wait_for = min(timeout or settings.delegation_timeout, settings.delegation_timeout)
+    # The tasks take budget slots of their own, so don't hold one while waiting for them
+    with swarm.delegations.released():
+        records = swarm.tasks.wait(handles, timeout=wait_for, caller=caller)
+    return "\n\n".join(
+        swarm.describe_task(record, handle) for handle, record in zip(handles, records)
+    )
+
+
+def _cancel_task(swarm: "Swarm", caller: str, handle: str):
+    if swarm.tasks.cancel(handle, caller):
+        return f"Task '{handle}' cancellation requested."
+    return f"Error: Task '{handle}' not found or already finished."
+
+
+def _read_result(swarm: "Swarm", caller: str, handle: str, offset: int = 0, length: Optional[int] = None):
+    return swarm.results.read(handle, offset, length)
+
+
+def _post_fact(
+    swarm: "Swarm",
+    caller: str,
+    key: str,
+    value: str,
+    tags: Optional[List[str]] = None,
+    expected_version: Optional[int] = None
+):
+    try:
+        fact = swarm.post_fact(caller, key, value, tags=tags, expected_version=expected_version)
+    except (FactConflictError, ValueError) as e:
+        return f"Error: {str(e)}"
+    return f"Fact '{fact.key}' saved (version {fact.version})."
+
+
+def _get_fact(swarm: "Swarm", caller: str, key: str):
+    fact = swarm.blackboard.get(key)
+    if fact is None:
+        return f"No fact '{key}' on the blackboard."
+    return fact.describe()
+
+
+def _search_facts(swarm: "Swarm", caller: str, query: str, limit: int = 5, tag: Optional[str] = None):
+    facts = swarm.blackboard.search(query, limit=limit, tag=tag)
+    if not facts:
+        return f"No facts match '{query}'."
+    return "\n\n".join(fact.describe() for fact in facts)
+
+
+def _list_agents(swarm: "Swarm", caller: str):
+    agent_list = list(swarm.agents.keys())
+    team_list = list(swarm.teams.keys())
+    template_list = [template.name for template in swarm.templates.templates()]
+    return f"Available agents: {agent_list}. Teams: {team_list}. Templates: {template_list}"
+
+
+# name -> (handler, scope), in the order tools are offered to the model
+_HANDLERS: Dict[str, Tuple[Callable[..., str], str]] = {
+    "create_agent": (_create_agent, SCOPE_AGENT),
+    "create_team": (_create_team, SCOPE_MANAGER),
+    "remove_agent": (_remove_agent, SCOPE_MANAGER),
+    "toggle_agent": (_toggle_agent, SCOPE_MANAGER),
+    "run_workflow": (_run_workflow, SCOPE_MANAGER),
+    "delegate_task": (_delegate_task, SCOPE_AGENT),
+    "delegate_tasks": (_delegate_tasks, SCOPE_AGENT),
+    "map_task": (_map_task, SCOPE_AGENT),
+    "start_task": (_start_task, SCOPE_AGENT),
+    "check_task": (_check_task, SCOPE_AGENT),
+    "await_tasks": (_await_tasks, SCOPE_AGENT),
+    "cancel_task": (_cancel_task, SCOPE_AGENT),
+    "read_result": (_read_result, SCOPE_AGENT),
+    "post_fact": (_post_fact, SCOPE_AGENT),
+    "get_fact": (_get_fact, SCOPE_AGENT),
+    "search_facts": (_search_facts, SCOPE_AGENT),
+    "list_agents": (_list_agents, SCOPE_AGENT),
+}
+
+
+def _function_schema(name: str, description: str, properties: Dict[str, Any], required: List[str]) -> Dict[str, Any]:
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": required
+            }
+        }
+    }
+
+
+def _build_schemas(default_model: str, templates: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Builds every swarm tool schema for the current configuration."""
+    # Dynamically build model description
+    available_models = get_available_model_list()
+    # Ensure system default is visible if valid and available
+    if default_model and default_model not in available_models:
+        if is_provider_available(default_model):
+            available_models.insert(0, default_model)
+
+    models_str = ", ".join(available_models) if available_models else "No external models configured"
+    delegation_fields = {
+        "to_agent": {"type": "string", "description": "The name of the agent to delegate to."},
+        "task": {"type": "string", "description": "The task description or message."}
+    }
+    handle_field = {"handle": {"type": "string", "description": "The handle returned by start_task."}}
+    templates_str = ", ".join(templates) if templates else "none registered"
+
+    schemas = [
+        _function_schema(
+            "create_agent",
+            "Creates a new agent with a specific role and instructions, or from a registered template.",
+            {
+                "name": {"type": "string", "description": "The name of the new agent."},
+                "role": {
+                    "type": "string",
+                    "description": "The role of the new agent (e.g., 'Coder', 'Researcher'). Required unless a template is given."
+                },
+                "instructions": {
+                    "type": "string",
+                    "description": "Specific system instructions for the agent. Required unless a template is given."
+                },
+                "model": {
+                    "type": "string",
+                    "description": (
+                        f"Optional model to use. Available options: {models_str}. "
+                        f"Defaults to system default ({default_model})."
+                    )
+                },
+                "template": {
+                    "type": "string",
+                    "description": (
+                        f"Optional agent template to start from (fastest for short-lived workers). "
+                        f"Available templates: {templates_str}."
+                    )
+                }
+            },
+            ["name"]
+        ),
+        _function_schema(
+            "create_team",
+            "Creates a new team of agents led by a specialized Team Lead.",
+            {
+                "name": {"type": "string", "description": "The name of the team (e.g., 'Frontend', 'Research')."},
+                "goal": {"type": "string", "description": "The primary goal of the team."},
+                "lead_role": {
+                    "type": "string",
+                    "description": "The role of the team leader (e.g., 'Tech Lead', 'Project Manager')."
+                },
+                "lead_instructions": {
+                    "type": "string",
+                    "description": "Specific instructions for the team leader on how to manage the team."
+                },
+                "lead_template": {
+                    "type": "string",
+                    "description": f"Optional agent template for the team leader. Available templates: {templates_str}."
+                }
+            },
+            ["name", "goal", "lead_role", "lead_instructions"]
+        ),
+        _function_schema(
+            "remove_agent",
+            "Removes/dismisses a sub-agent from the swarm.",
+            {"name": {"type": "string", "description": "The name of the agent to remove."}},
+            ["name"]
+        ),
+        _function_schema(
+            "toggle_agent",
+            "Activates or deactivates an agent.",
+            {"name": {"type": "string", "description": "The name of the agent."}},
+            ["name"]
+        ),
+        _function_schema(
+            "run_workflow",
+            (
+                "Runs a multi-agent pipeline. Independent steps run in parallel and unchanged steps "
+                "are served from cache. Reference a dependency's output in a task with {step_id}."
+            ),
+            {
+                "workflow": {
+                    "type": "string",
+                    "description": (
+                        'JSON definition, e.g. {"name": "report", "steps": ['
+                        '{"id": "research", "agent": "Researcher", "task": "..."}, '
+                        '{"id": "write", "agent": "Writer", "task": "Summarize: {research}", '
+                        '"depends_on": ["research"]}]}'
+                    )
+                }
+            },
+            ["workflow"]
+        ),
+        _function_schema(
+            "delegate_task",
+            "Delegates a task to another existing agent and waits for the result.",
+            dict(delegation_fields),
+            ["to_agent", "task"]
+        ),
+        _function_schema(
+            "delegate_tasks",
+            (
+                "Delegates several tasks to existing agents in parallel and waits for all results. "
+                "Results are returned in the order the tasks were given."
+            ),
+            {
+                "tasks": {
+                    "type": "array",
+                    "description": "The tasks to run concurrently.",
+                    "items": {
+                        "type": "object",
+                        "properties": dict(delegation_fields),
+                        "required": ["to_agent", "task"]
+                    }
+                },
+                "timeout": {
+                    "type": "integer",
+                    "description": f"Optional per-task timeout in seconds (default and maximum {settings.delegation_timeout})."
+                }
+            },
+            ["tasks"]
+        ),
+        _function_schema(
+            "map_task",
+            (
+                "Applies one task to many inputs in parallel using temporary clones of an existing worker "
+                "agent, optionally combining all outputs with a reduce step."
+            ),
+            {
+                "worker": {"type": "string", "description": "The agent to clone as the worker template."},
+                "task": {"type": "string", "description": "The instruction applied to each input."},
+                "inputs": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "The inputs (e.g. file paths) to process."
+                },
+                "max_concurrency": {"type": "integer", "description": "Optional cap on parallel workers."},
+                "retries": {"type": "integer", "description": "Retries per input on error (default 1)."},
+                "reduce_task": {
+                    "type": "string",
+                    "description": "Optional instruction for combining all outputs into one answer."
+                }
+            },
+            ["worker", "task", "inputs"]
+        ),
+        _function_schema(
+            "start_task",
+            (
+                "Starts a task on another agent in the background and returns a handle immediately. "
+                "Use check_task or await_tasks to collect the result later."
+            ),
+            dict(delegation_fields),
+            ["to_agent", "task"]
+        ),
+        _function_schema(
+            "check_task",
+            "Returns the status, elapsed time and partial or final output of a background task.",
+            dict(handle_field),
+            ["handle"]
+        ),
+        _function_schema(
+            "await_tasks",
+            "Waits for background tasks to finish (or the timeout to pass) and returns their results.",
+            {
+                "handles": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Handles returned by start_task."
+                },
+                "timeout": {
+                    "type": "integer",
+                    "description": f"Maximum seconds to wait (default {settings.delegation_timeout})."
+                }
+            },
+            ["handles"]
+        ),
+        _function_schema(
+            "cancel_task",
+            "Cancels a background task that has not finished yet.",
+            dict(handle_field),
+            ["handle"]
+        ),
+        _function_schema(
+            "read_result",
+            "Reads part of a long delegation result that was returned as a preview or summary with a handle.",
+            {
+                "handle": {"type": "string", "description": "The result handle, e.g. 'result-1a2b3c4d5e6f7a8b'."},
+                "offset": {"type": "integer", "description": "Character offset to start reading at (default 0)."},
+                "length": {
+                    "type": "integer",
+                    "description": f"Number of characters to read (default {settings.delegation_result_max_chars or 'all'})."
+                }
+            },
+            ["handle"]
+        ),
+        _function_schema(
+            "post_fact",
+            (
+                "Shares a fact (a finding, decision or summary of a file) on the swarm blackboard so other agents "
+                "can reuse it instead of working it out again. Posting to an existing key replaces it."
+            ),
+            {
+                "key": {
+                    "type": "string",
+                    "description": "A stable, descriptive key, e.g. 'file:src/app.py:summary' or 'api:auth-flow'."
+                },
+                "value": {"type": "string", "description": "The fact itself."},
+                "tags": {"type": "array", "items": {"type": "string"}, "description": "Optional tags for searching."},
+                "expected_version": {
+                    "type": "integer",
+                    "description": "Only update if the fact is still at this version (0 = only if it doesn't exist yet)."
+                }
+            },
+            ["key", "value"]
+        ),
+        _function_schema(
+            "get_fact",
+            "Reads a fact from the swarm blackboard by key, with its version and author.",
+            {"key": {"type": "string", "description": "The fact's key."}},
+            ["key"]
+        ),
+        _function_schema(
+            "search_facts",
+            "Searches the swarm blackboard before doing work another agent may already have done.",
+            {
+                "query": {"type": "string", "description": "Words to look for in fact keys, tags and values."},
+                "limit": {"type": "integer", "description": "Maximum number of facts to return (default 5)."},
+                "tag": {"type": "string", "description": "Only return facts with this tag."}
+            },
+            ["query"]
+        ),
+        _function_schema(
+            "list_agents",
+            "Lists all available agents and teams in the swarm.",
+            {},
+            []
+        ),
+    ]
+    return {schema["function"]["name"]: schema for schema in schemas}
+
+
+class ToolCatalog:
+    """
+    The swarm tools (create_agent, delegate_task, ...) shared by all of a swarm's agents.
+
+    Handlers are plain functions and schemas are built once per configuration
+    version, so agents only hold a reference to the catalog and their scope. The
+    calling agent is bound when a tool is looked up. `invalidate` marks the schemas
+    stale after a config reload; they are rebuilt on next use.
+    """
+    def __init__(self, swarm: "Swarm"):
+        self._swarm = swarm
+        self._lock = threading.Lock()
+        self._version = 0
+        self._built_version = -1
+        self._definitions: Dict[str, List[Dict[str, Any]]] = {}
+        self._names: Dict[str, frozenset] = {
+            scope: frozenset(name for name, (_, tool_scope) in _HANDLERS.items() if self._in_scope(tool_scope, scope))
+            for scope in (SCOPE_AGENT, SCOPE_MANAGER)
+        }
+
+    @staticmethod
+    def _in_scope(tool_scope: str, scope: str) -> bool:
+        return tool_scope == SCOPE_AGENT or scope == SCOPE_MANAGER
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self):
+        """Marks schemas as stale after a configuration change."""
+        with self._lock:
+            self._version += 1
+
+    def names(self, scope: str) -> frozenset:
+        return self._names[scope]
+
+    def definitions(self, scope: str) -> List[Dict[str, Any]]:
+        """Returns the shared schema list for a scope. Callers must not mutate it."""
+        with self._lock:
+            if self._built_version != self._version:
+                schemas = _build_schemas(
+                    self._swarm.default_model, [template.name for template in self._swarm.templates.templates()]
+                )
+                self._definitions = {
+                    scope_name: [schemas[name] for name in _HANDLERS if name in names]
+                    for scope_name, names in self._names.items()
+                }
+                self._built_version = self._version
+            return self._definitions[scope]
+
+    def bind(self, name: str, caller: str, scope: str) -> Optional[Callable[..., str]]:
+        """Returns the tool bound to `caller`, or None if it isn't available in `scope`."""
+        if name not in self._names[scope]:
+            return None
+        return functools.partial(_HANDLERS[name][0], self._swarm, caller)
@@ -0,0 +1,285 @@
+import contextvars
+import datetime
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+from opencore.config import settings
+from opencore.core.exceptions import AgentNotFoundError, SwarmError
+from opencore.core.mailbox import LANE_DELEGATION, release_held_turns
+
+if TYPE_CHECKING:
+    from opencore.core.swarm import Swarm
+
+logger = logging.getLogger(__name__)
+
+# Step outcomes
+STEP_COMPLETED = "completed"
+STEP_CACHED = "cached"
+STEP_FAILED = "failed"
+STEP_SKIPPED = "skipped"
+
+
+class WorkflowError(SwarmError):
+    """Raised when a workflow definition is invalid."""
+    pass
+
+
+@dataclass
+class WorkflowStep:
+    id: str
+    agent: str
+    task: str
+    depends_on: List[str] = field(default_factory=list)
+
+    def render(self, outputs: Dict[str, str]) -> str:
+        """Substitutes `{step_id}` placeholders for the outputs of this step's dependencies."""
+        task = self.task
+        for dep in self.depends_on:
+            task = task.replace("{" + dep + "}", outputs.get(dep, ""))
+        return task
+
+
+@dataclass
+class Workflow:
+    """
+    A declarative pipeline of agent steps.
+
+    Each step sends `task` to `agent` once everything in `depends_on` has finished;
+    `{step_id}` placeholders in the task are replaced with that dependency's output.
+    """
+    name: str
+    steps: List[WorkflowStep]
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "Workflow":
+        try:
+            steps = [
+                WorkflowStep(
+                    id=str(step["id"]),
+                    agent=str(step["agent"]),
+                    task=str(step["task"]),
+                    depends_on=[str(dep) for dep in step.get("depends_on", [])]
+                )
+                for step in spec["steps"]
+            ]
+        except (KeyError, TypeError) as e:
+            raise WorkflowError(f"Invalid workflow definition: missing or malformed field {e}.")
+
+        workflow = cls(name=str(spec.get("name", "workflow")), steps=steps)
+        workflow.validate()
+        return workflow
+
+    @classmethod
+    def from_json(cls, text: str) -> "Workflow":
+        try:
+            return cls.from_dict(json.loads(text))
+        except json.JSONDecodeError as e:
+            raise WorkflowError(f"Invalid workflow JSON: {e}")
+
+    @classmethod
+    def from_yaml(cls, text: str) -> "Workflow":
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("PyYAML is required to load YAML workflows. Use JSON or install pyyaml.")
+        return cls.from_dict(yaml.safe_load(text))
+
+    def validate(self):
+        """Checks for duplicate IDs, unknown dependencies and cycles."""
+        ids = [step.id for step in self.steps]
+        if len(ids) != len(set(ids)):
+            raise WorkflowError("Workflow step IDs must be unique.")
+
+        known = set(ids)
+        for step in self.steps:
+            missing = [dep for dep in step.depends_on if dep not in known]
+            if missing:
+                raise WorkflowError(f"Step '{step.id}' depends on unknown step(s): {missing}")
+
+        # Kahn's algorithm: if not every step can be ordered, there is a cycle
+        remaining = {step.id: set(step.depends_on) for step in self.steps}
+        while remaining:
+            ready = [step_id for step_id, deps in remaining.items() if not deps]
+            if not ready:
+                raise WorkflowError(f"Workflow has a dependency cycle among: {sorted(remaining)}")
+            for step_id in ready:
+                del remaining[step_id]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+
+class StepCache:
+    """
+    Caches step outputs by a hash of the agent, its model and the fully rendered task.
+    Because rendered tasks include upstream outputs, a change anywhere upstream
+    produces a new key, while unchanged steps are skipped on re-runs.
+    """
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.workflow_cache_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    @staticmethod
+    def key(agent_name: str, model: str, task: str) -> str:
+        payload = json.dumps([agent_name, model, task])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            output = self._entries.get(key)
+            if output is not None:
+                self._entries.move_to_end(key)
+            return output
+
+    def put(self, key: str, output: str):
+        with self._lock:
+            self._entries[key] = output
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+@dataclass
+class WorkflowResult:
+    name: str
+    outputs: Dict[str, str]
+    statuses: Dict[str, str]
+
+    @property
+    def succeeded(self) -> bool:
+        return all(status in (STEP_COMPLETED, STEP_CACHED) for status in self.statuses.values())
+
+    def summary(self) -> str:
+        lines = [f"Workflow '{self.name}' {'succeeded' if self.succeeded else 'failed'}."]
+        for step_id, status in self.statuses.items():
+            output = self.outputs.get(step_id, "")
+            lines.append(f"[{step_id}] {status}: {output}")
+        return "\n".join(lines)
+
+
+class WorkflowRunner:
+    """
+    Executes a Workflow against a swarm's agents.
+
+    Steps whose dependencies are satisfied run concurrently (bounded by
+    `max_concurrency`). Each step is a delegation from `caller`, subject to the
+    swarm's delegation budget, depth limit and cycle check. Outputs are cached in
+    `cache`, failures skip every downstream step, and progress is reported to the
+    request's activity log.
+    """
+    def __init__(
+        self,
+        swarm: "Swarm",
+        cache: Optional[StepCache] = None,
+        max_concurrency: Optional[int] = None,
+        caller: Optional[str] = None
+    ):
+        self.swarm = swarm
+        self.caller = caller
+        self.cache = cache if cache is not None else StepCache()
+        self.max_concurrency = max_concurrency or settings.workflow_max_concurrency
+
+    def _log(self, workflow: Workflow, step: WorkflowStep, subtype: str, summary: str = ""):
+        # Through the swarm, so steps also reach live event subscribers
+        self.swarm._log_activity({
+            "type": "workflow",
+            "subtype": subtype,
+            "agent": step.agent,
+            "summary": f"{workflow.name}/{step.id}" + (f": {summary}" if summary else ""),
+            "timestamp": datetime.datetime.now().isoformat()
+        })
+
+    def _run_step(self, workflow: Workflow, step: WorkflowStep, task: str, cache_key: str):
+        # Steps run beside the turn that started the workflow; queue for agents instead of re-entering them
+        release_held_turns()
+        self._log(workflow, step, "step_start")
+        try:
+            # Pinned so the agent isn't offloaded while the step waits for a budget slot
+            with self.swarm.pin_agent(step.agent):
+                agent = self.swarm.get_agent(step.agent)
+                if agent is None:
+                    raise AgentNotFoundError(f"Agent '{step.agent}' was removed.")
+                output = self.swarm.run_delegated(self.caller, step.agent, lambda: agent.chat(task, lane=LANE_DELEGATION))
+        except Exception as e:
+            output = f"Error: {str(e)}"
+
+        if output.startswith("Error"):
+            self._log(workflow, step, "step_failed", output[:50])
+            return STEP_FAILED, output
+
+        self.cache.put(cache_key, output)
+        self._log(workflow, step, "step_done")
+        return STEP_COMPLETED, output
+
+    def run(self, workflow: Workflow) -> WorkflowResult:
+        workflow.validate()
+        for step in workflow.steps:
+            if self.swarm.get_agent(step.agent) is None:
+                raise WorkflowError(f"Step '{step.id}' targets unknown agent '{step.agent}'.")
+
+        steps = {step.id: step for step in workflow.steps}
+        outputs: Dict[str, str] = {}
+        statuses: Dict[str, str] = {}
+        pending = dict(steps)
+        running = {}
+
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="workflow")
+        try:
+            while pending or running:
+                # Resolve every step whose dependencies are settled
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for step_id, step in list(pending.items()):
+                        dep_states = [statuses.get(dep) for dep in step.depends_on]
+                        if any(state is None for state in dep_states):
+                            continue
+
+                        del pending[step_id]
+                        progressed = True
+
+                        if any(state in (STEP_FAILED, STEP_SKIPPED) for state in dep_states):
+                            statuses[step_id] = STEP_SKIPPED
+                            self._log(workflow, step, "step_skipped")
+                            continue
+
+                        task = step.render(outputs)
+                        agent = self.swarm.get_agent(step.agent)
+                        cache_key = self.cache.key(step.agent, getattr(agent, "model", ""), task)
+                        cached = self.cache.get(cache_key)
+                        if cached is not None:
+                            outputs[step_id] = cached
+                            statuses[step_id] = STEP_CACHED
+                            self._log(workflow, step, "step_cached")
+                            continue
+
+                        ctx = contextvars.copy_context()
+                        future = executor.submit(ctx.run, self._run_step, workflow, step, task, cache_key)
+                        running[future] = step_id
+
+                if not running:
+                    continue
+
+                # Steps take budget slots of their own, so don't hold one while waiting for them
+                with self.swarm.delegations.released():
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    step_id = running.pop(future)
+                    statuses[step_id], outputs[step_id] = future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        ordered = {step.id: statuses[step.id] for step in workflow.steps}
+        return WorkflowResult(name=workflow.name, outputs=outputs, statuses=ordered)
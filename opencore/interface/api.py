@@ -1,13 +1,23 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Response, Depends, Query
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, field_validator
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, field_validator
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 from contextlib import asynccontextmanager
 from opencore.core.swarm import Swarm
-from opencore.core.context import activity_log_ctx
+from opencore.core.context import activity_log_ctx, request_id_ctx, cancel_token_ctx
+from opencore.core.delegation import delegation_tree
+from opencore.core.cancellation import CancellationToken, CancellationRegistry
+from opencore.core.mailbox import LANE_HEARTBEAT
+from opencore.core.sessions import SessionManager, SESSION_ID_PATTERN
+from opencore.core.state_store import create_state_store, REPLICA_ID
+from opencore.core.blackboard import Blackboard
+from opencore.core.jobs import JobManager, JobLimitError
+from opencore.core.offload import sweep_offload_dirs, remove_process_offload_dir
+from opencore.core.events import EventBus, Subscription, SubscriberLimitError, format_sse, EVENT_HEARTBEAT, EVENT_DROPPED
 from opencore.interface.middleware import global_exception_handler, request_id_middleware
 from opencore.interface.rate_limit import RateLimitMiddleware
 from opencore.core.scheduler import AsyncScheduler
@@ -15,7 +25,9 @@ from opencore.interface.heartbeat import heartbeat_manager
 from opencore.config import settings
 from opencore.core.config_service import ConfigService
 
+import asyncio
 import logging
+import uuid
 
 from starlette.concurrency import run_in_threadpool
 from opencore.auth import get_auth_status
@@ -25,14 +37,45 @@ from opencore.audio.service import AudioService, AudioValidationError, AudioSize
 # Initialize Scheduler
 scheduler = AsyncScheduler()
 
-# Initialize Swarm
-swarm = Swarm()
+# Initialize Swarm (default session, also driven by the proactive heartbeat).
+# With STATE_STORE_URL set, it is shared with every other replica using the same store.
+# With BLACKBOARD_PATH set, its blackboard facts survive restarts.
+swarm = Swarm(
+    state_store=create_state_store(settings.state_store_url),
+    blackboard=Blackboard(path=settings.blackboard_path or None)
+)
+
+# Session-scoped swarms selected by the X-Session-ID header or session cookie
+SESSION_HEADER = "X-Session-ID"
+SESSION_COOKIE = "opencore_session"
+session_manager = SessionManager(default_swarm=swarm)
 
 # Initialize AudioService
 audio_service = AudioService()
 
 # Initialize ConfigService
-config_service = ConfigService(swarm=swarm)
+config_service = ConfigService(swarm=session_manager)
+
+# Tracks cancellation tokens of in-flight /chat requests by request ID
+inflight_chats = CancellationRegistry()
+
+# Runs /jobs/chat submissions in the background (MAX_CONCURRENT_JOBS, JOB_RETENTION)
+job_manager = JobManager()
+
+# How often idle sessions are checked against their TTL (seconds)
+SESSION_SWEEP_INTERVAL = 60
+
+# How often idle agents are checked against AGENT_IDLE_TTL
+AGENT_SWEEP_INTERVAL = 60
+
+# Most agents one bulk request may name
+MAX_BULK_AGENTS = 1000
+
+# Seconds between keep-alive comments on an idle /events stream
+EVENT_KEEPALIVE_INTERVAL = 15
+
+# How often a running /chat checks whether its client has gone away
+DISCONNECT_POLL_INTERVAL = 0.5
 
 logger = logging.getLogger("opencore.api")
 
@@ -40,10 +83,21 @@ async def run_proactive_heartbeat():
     """
     Periodic task to check system health and trigger proactive agent behavior.
     """
+    # With a shared store, only one replica per interval runs the proactive turn
+    store = swarm.state_store
+    if store is not None:
+        acquired = await run_in_threadpool(
+            store.acquire_lease, "job:heartbeat", REPLICA_ID, settings.heartbeat_interval * 0.9
+        )
+        if not acquired:
+            logger.info("Heartbeat already handled by another replica.")
+            return
+
     # Log heartbeat
     await heartbeat_manager.log_heartbeat()
 
     # Trigger proactive agent logic
+    swarm.events.publish(EVENT_HEARTBEAT, {"status": "started"})
     try:
         logger.info("Executing proactive heartbeat task...")
         # Isolate request-scoped activity context for proactive heartbeat thread
@@ -54,16 +108,55 @@ async def run_proactive_heartbeat():
                 swarm.chat,
                 "SYSTEM HEARTBEAT: Current time check. Review recent user requests and status. "
                 "If there are pending tasks or if you can proactively assist with the user's goals based on previous context, "
-                "please execute them or suggest the next step. If everything is idle, just acknowledge."
+                "please execute them or suggest the next step. If everything is idle, just acknowledge.",
+                lane=LANE_HEARTBEAT
             )
             logger.info(f"Heartbeat Response: {response}")
+            swarm.events.publish(EVENT_HEARTBEAT, {"status": "completed", "response": response[:200]})
         finally:
             activity_log_ctx.reset(token)
     except Exception as e:
         logger.error(f"Error during proactive heartbeat: {e}")
+        swarm.events.publish(EVENT_HEARTBEAT, {"status": "failed", "error": str(e)})
+
+async def evict_idle_sessions():
+    """Periodic task that spills sessions idle past their TTL to disk."""
+    spilled = await run_in_threadpool(session_manager.evict_idle)
+    if spilled:
+        logger.info(f"Spilled {spilled} idle session(s).")
+
+async def offload_idle_agents():
+    """Periodic task that offloads agents idle past AGENT_IDLE_TTL to disk."""
+    offloaded = await run_in_threadpool(session_manager.offload_idle_agents)
+    if offloaded:
+        logger.info(f"Offloaded {offloaded} idle agent(s).")
+
+def get_session_id(request: Request) -> Optional[str]:
+    """Returns the caller's session ID (None for the default swarm). Invalid IDs are a 400."""
+    session_id = request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+    if session_id and not SESSION_ID_PATTERN.match(session_id):
+        raise HTTPException(status_code=400, detail=f"Invalid session ID '{session_id}'.")
+    return session_id or None
+
+def get_session_swarm(request: Request):
+    """Dependency resolving the swarm for the caller's session (default swarm if none)."""
+    session_id = get_session_id(request)
+    if not session_id:
+        if swarm.state_store is not None:
+            # Pick up agents and teams changed by other replicas (one version check when nothing changed)
+            swarm.sync()
+        yield swarm
+        return
+
+    # Pins the session in memory until the response is sent
+    with session_manager.session(session_id) as session_swarm:
+        yield session_swarm
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Drop agent snapshots left behind by processes that didn't shut down cleanly
+    sweep_offload_dirs(settings.agent_offload_dir)
+
     # Register heartbeat job
     scheduler.add_job(
         run_proactive_heartbeat,
@@ -71,6 +164,20 @@ async def lifespan(app: FastAPI):
         "system_heartbeat"
     )
 
+    # Register idle session sweeper
+    scheduler.add_job(
+        evict_idle_sessions,
+        SESSION_SWEEP_INTERVAL,
+        "session_sweeper"
+    )
+
+    # Register idle agent sweeper
+    scheduler.add_job(
+        offload_idle_agents,
+        AGENT_SWEEP_INTERVAL,
+        "agent_sweeper"
+    )
+
     # Start scheduler
     scheduler.start()
 
@@ -79,6 +186,12 @@ async def lifespan(app: FastAPI):
     # Stop scheduler
     scheduler.stop()
 
+    # Cancel chat jobs still queued or running
+    job_manager.shutdown()
+
+    # Offloaded histories die with the process; don't leave them on disk
+    remove_process_offload_dir(settings.agent_offload_dir)
+
 app = FastAPI(lifespan=lifespan)
 
 # Register CORS middleware
@@ -133,6 +246,8 @@ class ActivityItem(BaseModel):
     target: Optional[str] = None
     summary: Optional[str] = None
     agent: Optional[str] = None
+    chain: Optional[List[str]] = None # delegation path, caller first
+    depth: Optional[int] = None
     timestamp: str
 
 class ChatResponse(BaseModel):
@@ -141,6 +256,17 @@ class ChatResponse(BaseModel):
     tool_logs: list = [] # Future: detailed logs
     graph: Optional[Dict[str, Any]] = None
     activity_log: List[ActivityItem] = []
+    delegation_tree: List[Dict[str, Any]] = []
+
+class JobResponse(BaseModel):
+    id: str
+    status: str # queued, running, completed, failed, cancelled
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    activity_log: List[ActivityItem] = [] # grows while the job runs
+    result: Optional[ChatResponse] = None
+    error: Optional[str] = None
 
 class ConfigRequest(BaseModel):
     LLM_MODEL: Optional[str] = None
@@ -171,6 +297,65 @@ class AgentListResponse(BaseModel):
     agents: List[str]
     graph: Dict[str, Any]
 
+class QueueStatsResponse(BaseModel):
+    queues: Dict[str, Any]
+    delegations: Dict[str, int] = {}
+    singleflight: Dict[str, int] = {}
+
+class GraphResponse(BaseModel):
+    version: int
+    nodes: List[Dict[str, Any]]
+    edges: List[Dict[str, Any]]
+
+class GraphChangesResponse(BaseModel):
+    version: int
+    reset: bool
+    changes: List[Dict[str, Any]]
+
+class InteractionListResponse(BaseModel):
+    interactions: List[Dict[str, Any]]
+    last_seq: int
+
+class TemplateRequest(BaseModel):
+    name: str = Field(..., min_length=1)
+    role: str = Field(..., min_length=1)
+    system_prompt: str = Field(..., min_length=1)
+    model: Optional[str] = None
+    tools: Optional[List[str]] = None
+    warm: Optional[int] = Field(default=None, ge=0)
+
+    @field_validator('warm')
+    @classmethod
+    def validate_warm(cls, v: Optional[int]) -> Optional[int]:
+        # Pools are pre-built synchronously, so a single request must not ask for an unbounded number
+        if v is not None and v > settings.agent_pool_max:
+            raise ValueError(f"warm must be at most {settings.agent_pool_max} (AGENT_POOL_MAX)")
+        return v
+
+class TemplateListResponse(BaseModel):
+    templates: List[Dict[str, Any]]
+    pool: Dict[str, Dict[str, int]]
+
+class BulkAgentSpec(BaseModel):
+    name: str = Field(..., min_length=1)
+    role: Optional[str] = None
+    system_prompt: Optional[str] = None
+    model: Optional[str] = None
+    template: Optional[str] = None
+    created_by: Optional[str] = None
+
+class BulkCreateRequest(BaseModel):
+    agents: List[BulkAgentSpec] = Field(..., min_length=1, max_length=MAX_BULK_AGENTS)
+
+class BulkDeleteRequest(BaseModel):
+    names: List[str] = Field(..., min_length=1, max_length=MAX_BULK_AGENTS)
+    cascade: bool = False # also remove every agent the named ones created
+
+class BulkAgentResponse(BaseModel):
+    agents: List[str] # created or removed, in order
+    errors: Dict[str, str] = {}
+    graph: Dict[str, Any]
+
 class AgentActionResponse(BaseModel):
     status: str
     message: str
@@ -208,29 +393,113 @@ class ConfigUpdateResponse(BaseModel):
     status: str
     message: str
 
+class ChatCancelResponse(BaseModel):
+    status: str
+    message: str
+
+async def cancel_on_disconnect(http_request: Request, cancel_token: CancellationToken):
+    """Cancels the request's token once the client disconnects."""
+    while not cancel_token.cancelled:
+        if await http_request.is_disconnected():
+            logger.info("Client disconnected, cancelling in-flight chat.")
+            cancel_token.cancel("client disconnected")
+            return
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
 @app.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest):
+async def chat(
+    request: ChatRequest,
+    http_request: Request,
+    session_swarm: Swarm = Depends(get_session_swarm)
+):
     # In a real streaming scenario, we would use Server-Sent Events (SSE) or WebSockets.
     # For this MVP, we block and return the final response, but the frontend shows a loading state.
 
     # Convert Pydantic models to dicts for internal processing
     attachments_dict = [a.model_dump() for a in request.attachments] if request.attachments else None
 
+    # The request ID doubles as the handle for DELETE /chat/{request_id}
+    request_id = request_id_ctx.get() or str(uuid.uuid4())
+    cancel_token = CancellationToken()
+    if not inflight_chats.register(request_id, cancel_token):
+        # Cancelling by ID would be ambiguous
+        raise HTTPException(status_code=409, detail=f"A chat with request ID '{request_id}' is already in flight.")
+
     # Isolate request-scoped activity log to prevent thread race conditions
     token = activity_log_ctx.set([])
+    cancel_ctx_token = cancel_token_ctx.set(cancel_token)
+    watcher = asyncio.create_task(cancel_on_disconnect(http_request, cancel_token))
     try:
-        response = swarm.chat(request.message, attachments=attachments_dict)
+        # The threadpool runs with a copy of this context, so the token reaches every agent
+        response = await run_in_threadpool(session_swarm.chat, request.message, attachments=attachments_dict)
         activity_log = activity_log_ctx.get()
     finally:
+        watcher.cancel()
+        inflight_chats.unregister(request_id, cancel_token)
+        cancel_token_ctx.reset(cancel_ctx_token)
         activity_log_ctx.reset(token)
 
     return ChatResponse(
         response=response,
-        agents=list(swarm.agents.keys()),
-        graph=swarm.get_graph_data(),
-        activity_log=activity_log or []
+        agents=list(session_swarm.agents.keys()),
+        graph=session_swarm.get_graph_data(),
+        activity_log=activity_log or [],
+        delegation_tree=delegation_tree(activity_log or [])
     )
 
+@app.delete("/chat/{request_id}", response_model=ChatCancelResponse)
+def cancel_chat(request_id: str):
+    """Cancels an in-flight /chat request identified by its X-Request-ID."""
+    if not inflight_chats.cancel(request_id):
+        raise HTTPException(status_code=404, detail=f"No in-flight chat with request ID '{request_id}'.")
+    return ChatCancelResponse(status="success", message=f"Chat '{request_id}' cancellation requested.")
+
+def run_chat_job(session_id: Optional[str], message: str, attachments: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Runs one chat for a job on a job worker thread and returns its ChatResponse as a dict."""
+    # Pins the session in memory while the job runs
+    with session_manager.session(session_id) as session_swarm:
+        if session_id is None and session_swarm.state_store is not None:
+            session_swarm.sync()
+        response = session_swarm.chat(message, attachments=attachments)
+        activity_log = list(activity_log_ctx.get() or [])
+        return ChatResponse(
+            response=response,
+            agents=list(session_swarm.agents.keys()),
+            graph=session_swarm.get_graph_data(),
+            activity_log=activity_log,
+            delegation_tree=delegation_tree(activity_log)
+        ).model_dump()
+
+@app.post("/jobs/chat", response_model=JobResponse, status_code=202)
+def submit_chat_job(request: ChatRequest, http_request: Request, response: Response):
+    """
+    Starts a chat in the background and returns its job at once (202).
+    Poll GET /jobs/{id} (the Location header) for progress and the final ChatResponse.
+    """
+    session_id = get_session_id(http_request)
+    attachments_dict = [a.model_dump() for a in request.attachments] if request.attachments else None
+    try:
+        job = job_manager.submit(lambda: run_chat_job(session_id, request.message, attachments_dict))
+    except JobLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return JobResponse(**job.to_dict())
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(job_id: str):
+    """Returns a job's status, the activity log so far and, once completed, its ChatResponse."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found or expired.")
+    return JobResponse(**job.to_dict())
+
+@app.delete("/jobs/{job_id}", response_model=ChatCancelResponse)
+def cancel_job(job_id: str):
+    """Cancels a queued or running job."""
+    if not job_manager.cancel(job_id):
+        raise HTTPException(status_code=404, detail=f"No queued or running job '{job_id}'.")
+    return ChatCancelResponse(status="success", message=f"Job '{job_id}' cancellation requested.")
+
 @app.post("/transcribe", response_model=TranscribeResponse)
 async def transcribe(file: UploadFile = File(...)):
     """
@@ -249,29 +518,160 @@ async def transcribe(file: UploadFile = File(...)):
         # Return a generic error message to prevent information leakage
         return TranscribeResponse(error="Transcription failed due to an internal error.", text="")
 
+def etag_matches(http_request: Request, etag: str) -> bool:
+    """Checks an If-None-Match header against the current ETag."""
+    header = http_request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    candidates = [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+    return "*" in candidates or etag in candidates
+
 @app.get("/agents", response_model=AgentListResponse)
-def get_agents():
+def get_agents(http_request: Request, response: Response, session_swarm: Swarm = Depends(get_session_swarm)):
+    etag = session_swarm.graph.etag
+    if etag_matches(http_request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return AgentListResponse(
-        agents=list(swarm.agents.keys()),
-        graph=swarm.get_graph_data()
+        agents=list(session_swarm.agents.keys()),
+        graph=session_swarm.get_graph_data()
     )
 
+@app.get("/graph", response_model=GraphResponse)
+def get_graph(http_request: Request, response: Response, session_swarm: Swarm = Depends(get_session_swarm)):
+    """Returns the full swarm graph. Supports If-None-Match; unchanged graphs return 304."""
+    etag = session_swarm.graph.etag
+    if etag_matches(http_request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return GraphResponse(**session_swarm.get_graph_data())
+
+@app.get("/graph/changes", response_model=GraphChangesResponse)
+def get_graph_changes(since: int = Query(ge=0), session_swarm: Swarm = Depends(get_session_swarm)):
+    """
+    Returns node additions, removals and updates, and new edges after version `since`.
+    If `reset` is true the delta is unavailable and the client should refetch /graph.
+    """
+    return GraphChangesResponse(**session_swarm.get_graph_changes(since))
+
+async def event_stream(http_request: Request, bus: EventBus, subscription: Subscription):
+    """Yields a subscription's events as Server-Sent Events until the client goes away."""
+    try:
+        while not subscription.closed:
+            if await http_request.is_disconnected():
+                break
+            events, dropped = await subscription.get(EVENT_KEEPALIVE_INTERVAL)
+            if dropped:
+                # The client fell behind; it should refetch /graph to resynchronize
+                yield format_sse({
+                    "type": EVENT_DROPPED, "data": {"dropped": dropped, "total_dropped": subscription.dropped}
+                })
+            for event in events:
+                yield format_sse(event)
+            if not events:
+                yield ": keep-alive\n\n"
+    finally:
+        bus.unsubscribe(subscription)
+
+@app.get("/events")
+async def stream_events(
+    http_request: Request,
+    types: Optional[str] = None,
+    session_swarm: Swarm = Depends(get_session_swarm)
+):
+    """
+    Streams the swarm's live events as Server-Sent Events: `activity` (lifecycle,
+    interactions, ...), `graph` (the /graph/changes journal entries) and `heartbeat`.
+    `types` is an optional comma-separated filter. A `dropped` event reports events
+    a slow client missed.
+    """
+    wanted = [t.strip() for t in types.split(",") if t.strip()] if types else None
+    try:
+        subscription = session_swarm.events.subscribe(types=wanted)
+    except SubscriberLimitError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(
+        event_stream(http_request, session_swarm.events, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/agents/queues", response_model=QueueStatsResponse)
+def get_agent_queues(session_swarm: Swarm = Depends(get_session_swarm)):
+    """Returns per-agent turn queue depth and wait times by lane, the swarm's delegation budget and singleflight counts."""
+    return QueueStatsResponse(
+        queues=session_swarm.get_queue_stats(),
+        delegations=session_swarm.delegations.stats(),
+        singleflight=session_swarm.singleflight.stats()
+    )
+
+@app.get("/interactions", response_model=InteractionListResponse)
+def get_interactions(
+    agent: Optional[str] = None,
+    since: Optional[int] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    limit: Optional[int] = Query(default=None, ge=0),
+    session_swarm: Swarm = Depends(get_session_swarm)
+):
+    """
+    Returns recorded agent-to-agent exchanges, oldest first.
+    Poll with `since` set to the last seen `last_seq` to fetch only new records;
+    `start`/`end` are Unix timestamps.
+    """
+    return InteractionListResponse(
+        **session_swarm.get_interactions(agent=agent, since_seq=since, start=start, end=end, limit=limit)
+    )
+
+@app.get("/templates", response_model=TemplateListResponse)
+def get_templates(session_swarm: Swarm = Depends(get_session_swarm)):
+    """Returns the registered agent templates and how many pre-built instances each has ready."""
+    return TemplateListResponse(
+        templates=[template.to_dict() for template in session_swarm.templates.templates()],
+        pool=session_swarm.templates.stats()
+    )
+
+@app.post("/templates", response_model=TemplateListResponse)
+def register_template(request: TemplateRequest, session_swarm: Swarm = Depends(get_session_swarm)):
+    """Registers (or replaces) an agent template and pre-builds its pool."""
+    session_swarm.register_template(**request.model_dump())
+    return get_templates(session_swarm)
+
+@app.post("/agents/bulk", response_model=BulkAgentResponse)
+def create_agents(request: BulkCreateRequest, session_swarm: Swarm = Depends(get_session_swarm)):
+    """Creates several agents and returns the graph once. Failed specs are reported per name."""
+    specs = [spec.model_dump(exclude_none=True) for spec in request.agents]
+    created, errors = [], {}
+    for spec, result in zip(specs, session_swarm.create_agents(specs)):
+        if result.startswith("Error"):
+            errors[spec["name"]] = result
+        else:
+            created.append(spec["name"])
+    return BulkAgentResponse(agents=created, errors=errors, graph=session_swarm.get_graph_data())
+
+@app.delete("/agents/bulk", response_model=BulkAgentResponse)
+def delete_agents(request: BulkDeleteRequest, session_swarm: Swarm = Depends(get_session_swarm)):
+    """Removes several agents in one registry update; with `cascade`, their whole subtrees."""
+    result = session_swarm.remove_agents(request.names, cascade=request.cascade)
+    return BulkAgentResponse(agents=result["removed"], errors=result["errors"], graph=session_swarm.get_graph_data())
+
 @app.delete("/agents/{name}", response_model=AgentActionResponse)
-def delete_agent(name: str):
-    swarm.remove_agent(name)
+def delete_agent(name: str, session_swarm: Swarm = Depends(get_session_swarm)):
+    session_swarm.remove_agent(name)
     return AgentActionResponse(
         status="success",
         message=f"Agent '{name}' removed.",
-        graph=swarm.get_graph_data()
+        graph=session_swarm.get_graph_data()
     )
 
 @app.post("/agents/{name}/toggle", response_model=AgentActionResponse)
-def toggle_agent(name: str):
-    result = swarm.toggle_agent(name)
+def toggle_agent(name: str, session_swarm: Swarm = Depends(get_session_swarm)):
+    result = session_swarm.toggle_agent(name)
     return AgentActionResponse(
         status="success",
         message=result,
-        graph=swarm.get_graph_data()
+        graph=session_swarm.get_graph_data()
     )
 
 @app.get("/health", response_model=HealthCheckResponse)
@@ -6,18 +6,26 @@ from opencore.config import settings
 from opencore.core.context import request_id_ctx
 from opencore.core.exceptions import AgentNotFoundError, AgentOperationError
 import logging
+import re
 import uuid
 
 # Configure logging
 logger = logging.getLogger("opencore.api")
 
+# Client-supplied request IDs are accepted only in this conservative format
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
 
 async def request_id_middleware(request: Request, call_next):
     """
     Middleware to generate a unique request ID for every request,
     store it in a context variable for logging, and return it in headers.
+    A well-formed X-Request-ID sent by the client is reused so the client can
+    refer to its own in-flight request (e.g. to cancel it).
     """
-    request_id = str(uuid.uuid4())
+    request_id = request.headers.get("X-Request-ID", "")
+    if not REQUEST_ID_PATTERN.match(request_id):
+        request_id = str(uuid.uuid4())
     token = request_id_ctx.set(request_id)
     try:
         response = await call_next(request)
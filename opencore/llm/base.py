@@ -32,3 +32,13 @@ class LLMProvider(ABC):
             LLMResponse object containing content and/or tool_calls.
         """
         pass
+
+    def close(self):
+        """
+        Releases the underlying client, aborting any request still in flight.
+        Used to stop provider calls promptly when a request is cancelled.
+        """
+        client = getattr(self, "client", None)
+        close = getattr(client, "close", None)
+        if callable(close):
+            close()
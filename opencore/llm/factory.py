@@ -4,6 +4,7 @@ from .base import LLMProvider
 from .openai_compat import OpenAICompatibleProvider
 from .anthropic import AnthropicProvider
 from .gemini import GeminiProvider
+from .recording import CassetteProvider, get_cassette
 from opencore.config import settings
 
 
@@ -56,7 +57,20 @@ def get_available_model_list() -> List[str]:
 def get_llm_provider(model: str, is_custom_model: bool = False) -> LLMProvider:
     """
     Factory function to get the appropriate LLM provider.
+    With LLM_CASSETTE set, the provider records to or replays from that cassette.
     """
+    if settings.llm_cassette:
+        return CassetteProvider(
+            model,
+            get_cassette(settings.llm_cassette),
+            lambda: _create_provider(model),
+            mode=settings.llm_cassette_mode,
+            latency=settings.llm_cassette_latency,
+        )
+    return _create_provider(model)
+
+
+def _create_provider(model: str) -> LLMProvider:
 
     # Handle prefixes
     if model.startswith("gpt-") or model.startswith("openai/"):
@@ -0,0 +1,221 @@
+"""
+Record/replay of provider traffic.
+
+With LLM_CASSETTE set, every provider returned by `get_llm_provider` is wrapped so
+its request/response pairs are written to (or served from) a cassette file. A
+cassette is JSON Lines, one exchange per line:
+
+    {"key": "<sha256>", "model": "...", "latency": 1.23, "response": {...}}
+
+The key hashes the model, the wire messages and the names of the offered tools.
+Tool descriptions are left out on purpose: they embed the configured model list,
+which differs between the machine that recorded a session and the CI runner
+replaying it.
+
+Modes (LLM_CASSETTE_MODE):
+    record  - always call the provider and append each exchange
+    replay  - only serve recorded exchanges; a miss raises CassetteMissError
+    auto    - serve recorded exchanges, record the ones that are missing
+
+Replayed responses wait for the recorded latency (LLM_CASSETTE_LATENCY=original)
+or return at once (zero), so a replayed run measures orchestration alone.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict
+from typing import Callable, Dict, Any, List, Optional
+from .base import LLMProvider, LLMResponse, ToolCall, ToolCallFunction
+
+logger = logging.getLogger(__name__)
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+MODE_AUTO = "auto"
+CASSETTE_MODES = (MODE_RECORD, MODE_REPLAY, MODE_AUTO)
+
+LATENCY_ORIGINAL = "original"
+LATENCY_ZERO = "zero"
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+    pass
+
+
+def request_key(model: str, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Returns the cassette key of a provider request."""
+    tool_names = sorted(
+        tool.get("function", {}).get("name", "") for tool in tools or []
+    )
+    payload = json.dumps(
+        {"model": model, "messages": messages, "tools": tool_names},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def response_to_dict(response: LLMResponse) -> Dict[str, Any]:
+    return asdict(response)
+
+
+def response_from_dict(data: Dict[str, Any]) -> LLMResponse:
+    tool_calls = None
+    if data.get("tool_calls"):
+        tool_calls = [
+            ToolCall(
+                id=call["id"],
+                function=ToolCallFunction(call["function"]["name"], call["function"]["arguments"]),
+                type=call.get("type", "function"),
+            )
+            for call in data["tool_calls"]
+        ]
+    return LLMResponse(content=data.get("content"), tool_calls=tool_calls)
+
+
+class Cassette:
+    """
+    Recorded exchanges of one cassette file.
+
+    The same request may be recorded several times (e.g. a heartbeat prompt); its
+    recordings are served in order, and the last one repeats once they run out.
+    Appends go straight to the file, one line per write, so a crashed run keeps
+    everything recorded so far.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._served: Dict[str, int] = defaultdict(int)
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"Skipping malformed cassette line {line_no} in {self.path}: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._entries.values())
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the next recorded exchange for `key`, or None."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                return None
+            index = min(self._served[key], len(entries) - 1)
+            self._served[key] += 1
+            self.hits += 1
+            return entries[index]
+
+    def record(self, key: str, model: str, response: LLMResponse, latency: float):
+        entry = {
+            "key": key,
+            "model": model,
+            "latency": round(latency, 4),
+            "response": response_to_dict(response),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._entries[key].append(entry)
+            # A fresh recording has been served by the call that made it
+            self._served[key] = len(self._entries[key])
+            self.recorded += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "recorded": self.recorded}
+
+
+class CassetteProvider(LLMProvider):
+    """
+    Wraps a provider with a cassette. The real provider is only built when a
+    request has to go to the network, so replaying needs no credentials.
+    """
+    def __init__(
+        self,
+        model: str,
+        cassette: Cassette,
+        provider_factory: Callable[[], LLMProvider],
+        mode: str = MODE_AUTO,
+        latency: str = LATENCY_ORIGINAL
+    ):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}'. Use one of: {', '.join(CASSETTE_MODES)}.")
+        self.model = model
+        self.cassette = cassette
+        self.mode = mode
+        self.latency = latency
+        self._provider_factory = provider_factory
+        self._provider: Optional[LLMProvider] = None
+        self._closed = threading.Event()
+
+    @property
+    def provider(self) -> LLMProvider:
+        if self._provider is None:
+            self._provider = self._provider_factory()
+        return self._provider
+
+    def chat(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> LLMResponse:
+        key = request_key(self.model, messages, tools)
+
+        if self.mode != MODE_RECORD:
+            entry = self.cassette.lookup(key)
+            if entry is not None:
+                if self.latency == LATENCY_ORIGINAL and entry.get("latency"):
+                    # close() cuts the wait short, like it aborts a live HTTP call
+                    if self._closed.wait(entry["latency"]):
+                        raise ConnectionError("Provider closed while replaying.")
+                return response_from_dict(entry["response"])
+            if self.mode == MODE_REPLAY:
+                raise CassetteMissError(
+                    f"No recorded response for this {self.model} request in {self.cassette.path} (key {key[:12]})."
+                )
+
+        started = time.monotonic()
+        response = self.provider.chat(messages=messages, tools=tools)
+        self.cassette.record(key, self.model, response, time.monotonic() - started)
+        return response
+
+    def close(self):
+        self._closed.set()
+        if self._provider is not None:
+            self._provider.close()
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: str) -> Cassette:
+    """Returns the process-wide cassette for `path`, loading it on first use."""
+    path = os.path.abspath(os.path.expanduser(path))
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = Cassette(path)
+            _cassettes[path] = cassette
+        return cassette
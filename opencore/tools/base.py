@@ -4,6 +4,8 @@ import shlex
 import subprocess
 from opencore.core.agent import Agent
 from opencore.config import settings
+from opencore.tools.cache import tool_cache
+from opencore.core.cancellation import current_token, CancellationToken
 
 # Sensitive files that should not be accessed, even if technically "safe" (in CWD)
 SENSITIVE_FILES = {".env", ".DS_Store"}
@@ -46,6 +48,36 @@ def _is_safe_path(path: str) -> bool:
         return False
 
 
+COMMAND_TIMEOUT = 30
+
+
+def _run_cancellable(args, shell: bool, token: CancellationToken) -> subprocess.CompletedProcess:
+    """Runs a subprocess that is killed as soon as the request's cancellation token fires."""
+    proc = subprocess.Popen(
+        args, shell=shell, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    remove_callback = token.add_callback(proc.kill)
+    try:
+        stdout, stderr = proc.communicate(timeout=COMMAND_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        raise
+    finally:
+        remove_callback()
+
+    return subprocess.CompletedProcess(args, proc.returncode, stdout, stderr)
+
+
+def _run(args, shell: bool) -> subprocess.CompletedProcess:
+    token = current_token()
+    if token is not None:
+        return _run_cancellable(args, shell, token)
+    return subprocess.run(
+        args, shell=shell, capture_output=True, text=True, timeout=COMMAND_TIMEOUT
+    )
+
+
 def execute_command(command: str) -> str:
     """Executes a shell command and returns the output."""
     # Global Safety Guard: Block catastrophic deletion commands
@@ -68,9 +100,7 @@ def execute_command(command: str) -> str:
     try:
         if settings.allow_unsafe_system_access:
             # Unrestricted access: shell=True allows pipes, redirects, &&, etc.
-            result = subprocess.run(
-                command, shell=True, capture_output=True, text=True, timeout=30
-            )
+            result = _run(command, shell=True)
         else:
             # Security: Use shlex.split and shell=False to prevent injection
             # This prevents chaining commands with &&, |, ;, etc.
@@ -87,9 +117,11 @@ def execute_command(command: str) -> str:
                 if not _is_safe_path(arg):
                      return f"Error: Access denied - Path traversal detected in argument '{arg}'."
 
-            result = subprocess.run(
-                args, shell=False, capture_output=True, text=True, timeout=30
-            )
+            result = _run(args, shell=False)
+
+        token = current_token()
+        if token is not None and token.cancelled:
+            return "Error: Command cancelled."
 
         output = result.stdout
         if result.stderr:
@@ -103,16 +135,24 @@ MAX_READ_SIZE = 10 * 1024 * 1024  # 10MB
 
 def read_file(filepath: str) -> str:
     """Reads the content of a file."""
+    target = os.path.realpath(filepath)
+    cached = tool_cache.get("read_file", target)
+    if cached is not None:
+        return cached
+
     if not _is_safe_path(filepath):
         return "Error: Access denied - Path traversal detected."
 
     try:
+        # Take the signature before reading so a concurrent write invalidates the entry
+        signature = tool_cache.signature(target)
         with open(filepath, "r") as f:
             content = f.read(MAX_READ_SIZE)
             # Check if there is more content
             if f.read(1):
                  content += f"\n[...File truncated. Size limit {MAX_READ_SIZE // (1024 * 1024)}MB reached...]"
-            return content
+        tool_cache.put("read_file", target, signature, content)
+        return content
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
@@ -128,14 +168,22 @@ def write_file(filepath: str, content: str) -> str:
         return f"File '{filepath}' written successfully."
     except Exception as e:
         return f"Error writing file: {str(e)}"
+    finally:
+        tool_cache.invalidate_write(os.path.realpath(filepath))
 
 
 def list_files(directory: str = ".") -> str:
     """Lists files in a directory."""
+    target = os.path.realpath(directory)
+    cached = tool_cache.get("list_files", target)
+    if cached is not None:
+        return cached
+
     if not _is_safe_path(directory):
         return "Error: Access denied - Path traversal detected."
 
     try:
+        signature = tool_cache.signature(target)
         files = os.listdir(directory)
         # Filter out sensitive files and .git
         # This prevents accidental exposure in list outputs
@@ -143,7 +191,9 @@ def list_files(directory: str = ".") -> str:
             f for f in files
             if f not in SENSITIVE_FILES and f != ".git"
         ]
-        return "\n".join(filtered_files)
+        listing = "\n".join(filtered_files)
+        tool_cache.put("list_files", target, signature, listing)
+        return listing
     except Exception as e:
         return f"Error listing files: {str(e)}"
 
@@ -0,0 +1,120 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, Any
+from opencore.config import settings
+
+# Tools whose results may be memoized
+CACHEABLE_TOOLS = ("read_file", "list_files")
+
+# (st_mtime_ns, st_size, st_ino) of the resolved path at the time the result was produced
+Signature = Tuple[int, int, int]
+
+
+class ToolResultCache:
+    """
+    Memoizes results of read-only filesystem tools (read_file, list_files).
+
+    Entries are keyed by tool name and resolved path and are only served while the
+    path's (mtime, size, inode) signature is unchanged. The cache is bounded by the
+    total size of cached results and evicts least recently used entries first.
+    A single module-level instance is shared by every agent in the process.
+    """
+    def __init__(self, max_bytes: Optional[int] = None):
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Signature, Any, str]]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return settings.tool_cache_max_mb * 1024 * 1024
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def signature(path: str) -> Optional[Signature]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    @staticmethod
+    def _context() -> Any:
+        # Safety verdicts depend on the working directory and the unsafe-access flag,
+        # so a cached result is only valid under the same conditions.
+        return (os.getcwd(), settings.allow_unsafe_system_access)
+
+    def get(self, tool: str, path: str) -> Optional[str]:
+        """Returns the cached result if the path is unchanged since it was cached."""
+        if self.max_bytes <= 0:
+            return None
+
+        key = (tool, path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+        signature, context, result = entry
+        if signature != self.signature(path) or context != self._context():
+            with self._lock:
+                self.misses += 1
+            self.invalidate(path, tool=tool)
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        return result
+
+    def put(self, tool: str, path: str, signature: Optional[Signature], result: str):
+        """Caches a result produced while the path had the given signature."""
+        if signature is None or len(result) > self.max_bytes:
+            return
+
+        key = (tool, path)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[2])
+            self._entries[key] = (signature, self._context(), result)
+            self._size += len(result)
+
+            while self._size > self.max_bytes and self._entries:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def invalidate(self, path: str, tool: Optional[str] = None):
+        """Drops cached results for a path (all tools unless one is given)."""
+        tools = (tool,) if tool else CACHEABLE_TOOLS
+        with self._lock:
+            for name in tools:
+                entry = self._entries.pop((name, path), None)
+                if entry is not None:
+                    self._size -= len(entry[2])
+
+    def invalidate_write(self, path: str):
+        """Invalidates everything a write to `path` can affect: its content and its parent listing."""
+        self.invalidate(path)
+        self.invalidate(os.path.dirname(path), tool="list_files")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+tool_cache = ToolResultCache()
@@ -0,0 +1,112 @@
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from opencore.core.swarm import Swarm
+from opencore.core.teams import TeamMap
+from opencore.interface.api import app
+
+
+class TestTeamMap(unittest.TestCase):
+    def test_index_follows_assignment_and_copies(self):
+        teams = TeamMap({"Red": ["A", "B"]})
+        teams["Blue"] = ["B"]
+        self.assertEqual(teams.teams_of("B"), ("Red", "Blue"))
+
+        updated = teams.updated({"Red": ["A"]})
+        self.assertEqual(updated.teams_of("B"), ("Blue",))
+        self.assertEqual(teams.teams_of("B"), ("Red", "Blue"))
+
+        del updated["Blue"]
+        self.assertEqual(updated.teams_of("B"), ())
+
+
+class TestAgentHierarchy(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm("Boss")
+        self.swarm.create_team("Research", "Find things", "Lead", "Coordinate.")
+        self.swarm.create_agent("W1", "Worker", "Work.", created_by="Research_Lead")
+        self.swarm.create_agent("W2", "Worker", "Work.", created_by="Research_Lead")
+        self.swarm.create_agent("Sub", "Helper", "Help.", created_by="W1")
+
+    def test_children_index(self):
+        self.assertEqual(self.swarm.children["Boss"], ("Research_Lead",))
+        self.assertEqual(self.swarm.children["Research_Lead"], ("W1", "W2"))
+        self.assertEqual(self.swarm.teams.teams_of("Research_Lead"), ("Research",))
+
+    def test_descendants_deepest_first(self):
+        order = self.swarm.descendants("Research_Lead")
+        self.assertEqual(set(order), {"W1", "W2", "Sub"})
+        self.assertLess(order.index("Sub"), order.index("W1"))
+
+    def test_remove_updates_indexes(self):
+        self.swarm.remove_agent("W2")
+        self.assertEqual(self.swarm.children["Research_Lead"], ("W1",))
+
+        self.swarm.remove_agent("Research_Lead")
+        self.assertEqual(self.swarm.teams["Research"], [])
+        self.assertEqual(self.swarm.teams.teams_of("Research_Lead"), ())
+        self.assertNotIn("Research_Lead", self.swarm.children)
+        self.assertIn("W1", self.swarm.agents)
+
+    def test_cascade_removes_subtree(self):
+        result = self.swarm.remove_agents(["Research_Lead", "Missing"], cascade=True)
+
+        self.assertEqual(result["removed"][-1], "Research_Lead")
+        self.assertEqual(set(result["removed"]), {"Research_Lead", "W1", "W2", "Sub"})
+        self.assertEqual(list(result["errors"]), ["Missing"])
+        self.assertEqual(list(self.swarm.agents), ["Boss"])
+        self.assertEqual(self.swarm.children, {})
+
+    def test_main_agent_is_kept(self):
+        result = self.swarm.remove_agents(["Boss"], cascade=True)
+        self.assertEqual(result["removed"], [])
+        self.assertIn("Boss", result["errors"])
+        self.assertIn("Boss", self.swarm.agents)
+
+    def test_create_agents(self):
+        results = self.swarm.create_agents(
+            [{"name": "A", "role": "R", "system_prompt": "P"}, {"name": "W1", "role": "R", "system_prompt": "P"}],
+            created_by="Boss"
+        )
+        self.assertIn("created successfully", results[0])
+        self.assertTrue(results[1].startswith("Error"))
+        self.assertEqual(self.swarm.agents["A"].created_by, "Boss")
+
+
+class TestBulkAgentApi(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm("Manager")
+        self.patcher = patch("opencore.interface.api.swarm", self.swarm)
+        self.patcher.start()
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_bulk_create_and_cascade_delete(self):
+        agents = [{"name": "Lead", "role": "Lead", "system_prompt": "Lead."}] + [
+            {"name": f"W{i}", "role": "Worker", "system_prompt": "Work.", "created_by": "Lead"} for i in range(50)
+        ]
+        response = self.client.post("/agents/bulk", json={"agents": agents})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["agents"]), 51)
+        self.assertEqual(len(self.swarm.children["Lead"]), 50)
+
+        response = self.client.request("DELETE", "/agents/bulk", json={"names": ["Lead"], "cascade": True})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["agents"]), 51)
+        self.assertEqual([node["id"] for node in data["graph"]["nodes"]], ["Manager"])
+
+    def test_bulk_create_reports_errors(self):
+        response = self.client.post("/agents/bulk", json={"agents": [{"name": "X"}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("needs a role", response.json()["errors"]["X"])
+
+    def test_bulk_delete_requires_names(self):
+        response = self.client.request("DELETE", "/agents/bulk", json={"names": []})
+        self.assertEqual(response.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from opencore.core.agent import Agent
+from opencore.core.cancellation import CancellationToken
+from opencore.core.context import cancel_token_ctx
+from opencore.config import settings
+from opencore.core.exceptions import OperationCancelledError, AgentBusyError
+from opencore.core.mailbox import AgentMailbox, LANE_USER, LANE_HEARTBEAT, LANE_DELEGATION
+from opencore.core.swarm import Swarm
+from opencore.interface.api import app
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestAgentMailbox(unittest.TestCase):
+    def test_turns_are_serialized(self):
+        agent = Agent("Worker", "Tester", "Test things.")
+        active = []
+        overlaps = []
+
+        def fake_think():
+            active.append(1)
+            if len(active) > 1:
+                overlaps.append(True)
+            time.sleep(0.05)
+            active.pop()
+            return "done"
+
+        agent.think = fake_think
+        threads = [threading.Thread(target=agent.chat, args=(f"msg {i}",)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(overlaps, [])
+        self.assertEqual(len(agent.messages), 5)
+
+    def test_user_lane_preempts_queued_heartbeat(self):
+        mailbox = AgentMailbox("Manager")
+        order = []
+        release = threading.Event()
+
+        def holder():
+            with mailbox.turn(LANE_DELEGATION):
+                release.wait(5)
+
+        def queued(lane):
+            with mailbox.turn(lane):
+                order.append(lane)
+
+        first = threading.Thread(target=holder)
+        first.start()
+        wait_for(lambda: mailbox.busy)
+
+        heartbeat = threading.Thread(target=queued, args=(LANE_HEARTBEAT,))
+        heartbeat.start()
+        wait_for(lambda: mailbox.depth == 1)
+        user = threading.Thread(target=queued, args=(LANE_USER,))
+        user.start()
+        wait_for(lambda: mailbox.depth == 2)
+
+        release.set()
+        for t in (first, heartbeat, user):
+            t.join(5)
+
+        self.assertEqual(order, [LANE_USER, LANE_HEARTBEAT])
+        stats = mailbox.stats()
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertEqual(stats["lanes"][LANE_HEARTBEAT]["completed"], 1)
+        self.assertGreater(stats["lanes"][LANE_HEARTBEAT]["max_wait_ms"], 0)
+
+    def test_nested_turn_in_same_chain_is_reentrant(self):
+        mailbox = AgentMailbox("Manager")
+        with mailbox.turn():
+            with mailbox.turn(LANE_DELEGATION):
+                self.assertTrue(mailbox.busy)
+        self.assertFalse(mailbox.busy)
+
+    def test_cancel_while_waiting(self):
+        mailbox = AgentMailbox("Manager")
+        release = threading.Event()
+        errors = []
+        token = CancellationToken()
+
+        def holder():
+            with mailbox.turn():
+                release.wait(5)
+
+        def waiter():
+            cancel_token_ctx.set(token)
+            try:
+                with mailbox.turn():
+                    pass
+            except OperationCancelledError as e:
+                errors.append(e)
+
+        first = threading.Thread(target=holder)
+        first.start()
+        wait_for(lambda: mailbox.busy)
+        second = threading.Thread(target=waiter)
+        second.start()
+        wait_for(lambda: mailbox.depth == 1)
+
+        token.cancel()
+        second.join(5)
+        release.set()
+        first.join(5)
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(mailbox.depth, 0)
+
+    def test_crossed_waits_give_up(self):
+        first, second = AgentMailbox("A"), AgentMailbox("B")
+        both_held = threading.Barrier(2)
+        errors = []
+
+        def chain(held, wanted):
+            with held.turn():
+                both_held.wait(5)
+                try:
+                    with wanted.turn(wait=0.2):
+                        pass
+                except AgentBusyError as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=chain, args=pair) for pair in ((first, second), (second, first))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+
+        self.assertGreaterEqual(len(errors), 1)
+        self.assertEqual((first.depth, second.depth), (0, 0))
+
+    def test_busy_agent_is_a_tool_error(self):
+        agent = Agent("Worker", "Tester", "Test things.")
+        agent.think = lambda: "done"
+        release = threading.Event()
+
+        def holder():
+            with agent.mailbox.turn():
+                release.wait(5)
+
+        first = threading.Thread(target=holder)
+        first.start()
+        wait_for(lambda: agent.mailbox.busy)
+        with patch.object(settings, "agent_turn_wait", 0.1):
+            result = agent.chat("hello", lane=LANE_DELEGATION)
+        release.set()
+        first.join(5)
+
+        self.assertTrue(result.startswith("Error: Agent 'Worker' stayed busy"))
+
+    def test_parallel_branches_do_not_reenter_held_turn(self):
+        swarm = Swarm("Manager")
+        manager = swarm.agents["Manager"]
+        with patch.object(settings, "agent_turn_wait", 0.1), \
+                patch.object(Agent, "think", return_value="done"):
+            with manager.mailbox.turn():
+                result = swarm.run_workflow({"name": "w", "steps": [{"id": "a", "agent": "Manager", "task": "x"}]})
+
+        self.assertFalse(result.succeeded)
+        self.assertNotIn({"role": "user", "content": "x", "lane": LANE_DELEGATION}, manager.messages)
+
+    def test_unknown_lane_rejected(self):
+        with self.assertRaises(ValueError):
+            with AgentMailbox("Manager").turn("vip"):
+                pass
+
+
+class TestQueueStatsEndpoint(unittest.TestCase):
+    def test_get_agent_queues(self):
+        client = TestClient(app)
+        response = client.get("/agents/queues")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Manager", response.json()["queues"])
+
+    @patch("opencore.interface.api.swarm")
+    def test_heartbeat_uses_heartbeat_lane(self, mock_swarm):
+        import asyncio
+        from opencore.interface.api import run_proactive_heartbeat
+
+        mock_swarm.chat.return_value = "Acknowledged."
+        asyncio.run(run_proactive_heartbeat())
+
+        _, kwargs = mock_swarm.chat.call_args
+        self.assertEqual(kwargs["lane"], LANE_HEARTBEAT)
+
+
+if __name__ == "__main__":
+    unittest.main()
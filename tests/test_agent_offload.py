@@ -0,0 +1,193 @@
+import os
+import socket
+import tempfile
+import time
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
+from opencore.config import settings
+from opencore.core.agent import Agent
+from opencore.core.offload import (
+    OffloadedAgent, process_offload_dir, remove_process_offload_dir, sweep_offload_dirs
+)
+from opencore.core.sessions import SessionManager
+from opencore.core.swarm import Swarm
+
+
+class TestAgentOffload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.settings_patch = patch.multiple(
+            settings, agent_offload_dir=self.tmp.name, agent_idle_ttl=1800, max_live_agents=64
+        )
+        self.settings_patch.start()
+        self.swarm = Swarm("Boss")
+        self.swarm.create_agent("Coder", "Developer", "Write code.")
+        self.swarm.agents["Coder"].add_message("user", "remember the plan")
+
+    def tearDown(self):
+        self.settings_patch.stop()
+        self.tmp.cleanup()
+
+    def test_offload_replaces_agent_with_stub(self):
+        self.assertTrue(self.swarm.offload_agent("Coder"))
+
+        stub = self.swarm.agents["Coder"]
+        self.assertIsInstance(stub, OffloadedAgent)
+        self.assertEqual(stub.role, "Developer")
+        self.assertTrue(os.path.exists(stub.path))
+        self.assertEqual(oct(os.stat(stub.path).st_mode & 0o777), "0o600")
+        self.assertIn("remember the plan", str(stub.export_state()["messages"]))
+
+    def test_main_agent_is_never_offloaded(self):
+        self.assertFalse(self.swarm.offload_agent("Boss"))
+        self.assertIsInstance(self.swarm.agents["Boss"], Agent)
+
+    def test_busy_agent_is_not_offloaded(self):
+        agent = self.swarm.agents["Coder"]
+        with agent.mailbox.turn("user"):
+            self.assertFalse(self.swarm.offload_agent("Coder"))
+        self.assertIs(self.swarm.agents["Coder"], agent)
+
+    @patch("opencore.core.agent.Agent.think", return_value="done")
+    def test_delegation_hydrates_transparently(self, mock_think):
+        self.swarm.offload_agent("Coder")
+        path = self.swarm.agents["Coder"].path
+
+        result = self.swarm.delegate_task("Boss", "Coder", "next step")
+
+        self.assertEqual(result, "Response from Coder: done")
+        agent = self.swarm.agents["Coder"]
+        self.assertIsInstance(agent, Agent)
+        self.assertIn("remember the plan", str(agent.messages))
+        self.assertIn("next step", str(agent.messages))
+        self.assertFalse(os.path.exists(path))
+
+    def test_hydration_keeps_status_and_template_tools(self):
+        self.swarm.register_template("reader", "Reader", "Read files.", tools=["read_file"], warm=0)
+        self.swarm.create_agent("R1", template="reader")
+        self.swarm.toggle_agent("R1")
+        self.swarm.offload_agent("R1")
+
+        agent = self.swarm.hydrate_agent("R1")
+
+        self.assertEqual(agent.status, "inactive")
+        self.assertEqual(agent.template, "reader")
+        self.assertEqual(set(agent._tool_definitions), {"read_file"})
+
+    def test_pinned_agent_is_not_offloaded(self):
+        with self.swarm.pin_agent("Coder"):
+            with self.swarm.pin_agent("Coder"):
+                self.assertFalse(self.swarm.offload_agent("Coder"))
+            self.assertFalse(self.swarm.offload_agent("Coder"))
+        self.assertTrue(self.swarm.offload_agent("Coder"))
+
+    @patch("opencore.core.agent.Agent.think", return_value="done")
+    def test_delegation_waiting_for_slot_keeps_history(self, mock_think):
+        sweeps = []
+        slot = self.swarm.delegations.slot
+
+        @contextmanager
+        def slot_after_sweep():
+            # An idle sweep runs while the delegation waits for its budget slot
+            sweeps.append(self.swarm.offload_agent("Coder"))
+            with slot():
+                yield
+
+        with patch.object(self.swarm.delegations, "slot", slot_after_sweep):
+            result = self.swarm.delegate_task("Boss", "Coder", "next step")
+
+        self.assertEqual(result, "Response from Coder: done")
+        self.assertEqual(sweeps, [False])
+        self.assertTrue(self.swarm.offload_agent("Coder"))
+        hydrated = self.swarm.hydrate_agent("Coder")
+        self.assertIn("next step", str(hydrated.messages))
+
+    def test_idle_sweep_uses_ttl(self):
+        self.assertEqual(self.swarm.offload_idle_agents(), 0)
+
+        self.swarm.agents["Coder"].mailbox.last_active = time.monotonic() - 3600
+        self.assertEqual(self.swarm.offload_idle_agents(), 1)
+        self.assertIsInstance(self.swarm.agents["Coder"], OffloadedAgent)
+        self.assertEqual(self.swarm.offload_idle_agents(ttl=0), 0)
+
+    def test_live_cap_offloads_least_recently_active(self):
+        settings.max_live_agents = 3
+        self.swarm.create_agent("Old", "Helper", "Help.")
+        self.swarm.agents["Coder"].mailbox.last_active = time.monotonic() - 10
+        self.swarm.agents["Old"].mailbox.last_active = time.monotonic() - 100
+
+        self.swarm.create_agent("New", "Helper", "Help.")
+
+        self.assertIsInstance(self.swarm.agents["Old"], OffloadedAgent)
+        self.assertIsInstance(self.swarm.agents["Coder"], Agent)
+        self.assertIsInstance(self.swarm.agents["New"], Agent)
+
+    def test_remove_offloaded_agent_deletes_snapshot(self):
+        self.swarm.offload_agent("Coder")
+        path = self.swarm.agents["Coder"].path
+
+        self.swarm.remove_agent("Coder")
+
+        self.assertNotIn("Coder", self.swarm.agents)
+        self.assertFalse(os.path.exists(path))
+
+    def test_export_state_includes_offloaded_history(self):
+        self.swarm.offload_agent("Coder")
+
+        restored = Swarm.from_state(self.swarm.export_state())
+
+        self.assertIn("remember the plan", str(restored.agents["Coder"].messages))
+
+    def test_session_manager_sweeps_default_swarm(self):
+        self.swarm.agents["Coder"].mailbox.last_active = time.monotonic() - 3600
+        manager = SessionManager(self.swarm, spill_dir=self.tmp.name)
+
+        self.assertEqual(manager.offload_idle_agents(), 1)
+
+
+
+class TestOffloadDirs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_dir(self, name):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.join(path, "swarm"))
+        return path
+
+    def test_swarm_offloads_under_process_dir(self):
+        with patch.object(settings, "agent_offload_dir", self.root):
+            swarm = Swarm("Boss")
+        self.assertEqual(os.path.dirname(swarm.offload_store.directory), process_offload_dir(self.root))
+
+    @patch("opencore.core.offload._pid_alive", side_effect=lambda pid: pid == 4242)
+    def test_sweep_removes_dirs_of_dead_processes_on_this_host(self, mock_alive):
+        host = socket.gethostname()
+        own = self.make_dir(os.path.basename(process_offload_dir(self.root)))
+        dead = self.make_dir(f"{host}-4141-0123abcd")
+        reused_pid = self.make_dir(f"{host}-{os.getpid()}-0123abcd")
+        running = self.make_dir(f"{host}-4242-0123abcd")
+        other_host = self.make_dir("elsewhere-4141-0123abcd")
+        unrelated = self.make_dir("notes")
+
+        self.assertEqual(sweep_offload_dirs(self.root), 2)
+
+        self.assertFalse(os.path.exists(dead))
+        self.assertFalse(os.path.exists(reused_pid))
+        for path in (own, running, other_host, unrelated):
+            self.assertTrue(os.path.exists(path))
+
+    def test_shutdown_removes_process_dir(self):
+        own = self.make_dir(os.path.basename(process_offload_dir(self.root)))
+        remove_process_offload_dir(self.root)
+        self.assertFalse(os.path.exists(own))
+        self.assertEqual(sweep_offload_dirs(os.path.join(self.root, "missing")), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import time
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from opencore.config import settings
+from opencore.core.swarm import Swarm
+from opencore.core.templates import AgentPool
+from opencore.interface.api import app
+
+
+def wait_for_pool(swarm, template, ready):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if swarm.templates.stats()[template]["ready"] >= ready:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestAgentTemplates(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm("Boss")
+        self.swarm.register_template("reader", "Reader", "Read and summarize files.", tools=["read_file", "list_files"], warm=2)
+
+    def test_register_prewarms_pool(self):
+        stats = self.swarm.templates.stats()["reader"]
+        self.assertEqual(stats["ready"], 2)
+        self.assertEqual(stats["built"], 2)
+
+    def test_create_from_template_uses_prebuilt_instance(self):
+        result = self.swarm.create_agent("R1", template="reader", created_by="Boss")
+
+        self.assertIn("created successfully", result)
+        self.assertEqual(self.swarm.templates.stats()["reader"]["cold"], 0)
+        agent = self.swarm.agents["R1"]
+        self.assertEqual(agent.name, "R1")
+        self.assertEqual(agent.created_by, "Boss")
+        self.assertEqual(agent.messages, [
+            {"role": "system", "content": "You are R1, a Reader. Read and summarize files."}
+        ])
+        self.assertEqual(agent.mailbox.name, "R1")
+        # Template tool set: base tools restricted, shared swarm tools still available
+        self.assertIn("read_file", agent.tools)
+        self.assertNotIn("execute_command", agent.tools)
+        self.assertIn("delegate_task", agent.tools)
+        self.assertTrue(wait_for_pool(self.swarm, "reader", 2))
+
+    def test_overrides_and_graph_updates(self):
+        self.swarm.create_agent("R1", "Auditor", "Audit the logs.", template="reader")
+        agent = self.swarm.agents["R1"]
+        self.assertEqual(agent.role, "Auditor")
+        self.assertIn("Audit the logs.", agent.messages[0]["content"])
+
+        agent.last_thought = "Reading"
+        node = next(n for n in self.swarm.get_graph_data()["nodes"] if n["id"] == "R1")
+        self.assertEqual(node["last_thought"], "Reading")
+
+    def test_removed_agent_is_reset_and_reused(self):
+        self.swarm.templates = AgentPool(self.swarm._build_pooled_agent, auto_refill=False)
+        self.swarm.register_template("reader", "Reader", "Read.", warm=1)
+        self.swarm.create_agent("R1", template="reader")
+        self.swarm.create_agent("R2", template="reader")
+        self.assertEqual(self.swarm.templates.stats()["reader"]["cold"], 1)
+
+        first = self.swarm.agents["R1"]
+        first.add_message("user", "secret task")
+        first.last_thought = "Working"
+        self.swarm.remove_agent("R1")
+        self.assertEqual(first.name, "reader")
+        self.assertEqual(len(first.messages), 1)
+        self.assertEqual(first.last_thought, "Idle")
+        first.last_thought = "ignored"  # detached from the graph once released
+        self.assertNotIn("R1", [n["id"] for n in self.swarm.get_graph_data()["nodes"]])
+
+        # The pool is full again, so the second instance is simply dropped
+        second = self.swarm.agents["R2"]
+        self.swarm.remove_agent("R2")
+        self.assertEqual(second.name, "R2")
+
+        self.swarm.create_agent("R3", template="reader")
+        self.assertIs(self.swarm.agents["R3"], first)
+        self.assertEqual(self.swarm.templates.stats()["reader"]["reused"], 1)
+
+    def test_busy_agent_is_not_recycled(self):
+        self.swarm.create_agent("R1", template="reader")
+        agent = self.swarm.agents["R1"]
+        with agent.mailbox.turn():
+            self.swarm.remove_agent("R1")
+        self.assertEqual(agent.name, "R1")
+
+    def test_unknown_template(self):
+        result = self.swarm.create_agent("X", template="ghost")
+        self.assertIn("Template 'ghost' not found", result)
+        self.assertIn("reader", result)
+
+    def test_missing_role_without_template(self):
+        self.assertIn("needs a role and instructions", self.swarm.create_agent("X"))
+
+    def test_create_team_with_lead_template(self):
+        result = self.swarm.create_team("Docs", "Write docs", "Docs Lead", "Coordinate writers.", lead_template="reader")
+        self.assertIn("Leader 'Docs_Lead' is ready", result)
+        lead = self.swarm.agents["Docs_Lead"]
+        self.assertEqual(lead.template, "reader")
+        self.assertIn("Your primary goal is: Write docs", lead.messages[0]["content"])
+
+    def test_tool_lists_templates(self):
+        boss = self.swarm.agents["Boss"]
+        schema = next(t for t in boss.tool_definitions if t["function"]["name"] == "create_agent")
+        self.assertIn("reader", schema["function"]["parameters"]["properties"]["template"]["description"])
+        self.assertEqual(schema["function"]["parameters"]["required"], ["name"])
+
+        result = boss.tools["create_agent"](name="R9", template="reader")
+        self.assertIn("created successfully", result)
+        self.assertEqual(self.swarm.agents["R9"].created_by, "Boss")
+
+    def test_pool_size_is_capped(self):
+        with patch.object(settings, "agent_pool_max", 3):
+            self.swarm.register_template("crowd", "Worker", "Work.", warm=10000)
+            self.assertEqual(self.swarm.templates.stats()["crowd"]["built"], 3)
+
+    def test_templates_survive_state_round_trip(self):
+        restored = Swarm.from_state(self.swarm.export_state())
+        self.assertEqual(restored.templates.get("reader").tools, ["read_file", "list_files"])
+
+
+class TestTemplateEndpoints(unittest.TestCase):
+    def test_register_and_list(self):
+        client = TestClient(app)
+        swarm = Swarm()
+        with patch("opencore.interface.api.swarm", swarm):
+            response = client.post("/templates", json={
+                "name": "scout", "role": "Scout", "system_prompt": "Explore.", "warm": 1
+            })
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["pool"]["scout"]["ready"], 1)
+
+            listed = client.get("/templates").json()
+            self.assertEqual([t["name"] for t in listed["templates"]], ["scout"])
+
+            self.assertEqual(client.post("/templates", json={"name": "x", "role": "", "system_prompt": "y"}).status_code, 422)
+            too_many = {"name": "x", "role": "X", "system_prompt": "y", "warm": settings.agent_pool_max + 1}
+            self.assertEqual(client.post("/templates", json=too_many).status_code, 422)
+            self.assertNotIn("x", swarm.templates.stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
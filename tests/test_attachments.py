@@ -2,6 +2,9 @@ import unittest
 from unittest.mock import MagicMock
 from opencore.core.swarm import Swarm
 from opencore.core.agent import Agent
+from opencore.core.attachments import AttachmentStore
+from opencore.core.mailbox import LANE_DELEGATION
+from opencore.config import settings
 
 class TestAttachments(unittest.TestCase):
     def test_image_attachment(self):
@@ -18,9 +21,12 @@ class TestAttachments(unittest.TestCase):
         # Call chat
         swarm.chat("Look at this", attachments=attachments)
 
-        # Verify
-        last_message = agent.messages[-1]
-        print(f"DEBUG: Last message content: {last_message['content']}")
+        # History keeps a reference, the wire payload carries the image
+        stored = agent.messages[-1]["content"]
+        self.assertEqual(stored[1]["type"], "attachment")
+        self.assertNotIn("base64", str(stored))
+
+        last_message = agent._build_wire_messages()[-1]
 
         self.assertEqual(last_message["role"], "user")
         self.assertIsInstance(last_message["content"], list)
@@ -45,7 +51,7 @@ class TestAttachments(unittest.TestCase):
 
         swarm.chat("Read this", attachments=attachments)
 
-        last_message = agent.messages[-1]
+        last_message = agent._build_wire_messages()[-1]
         self.assertEqual(last_message["role"], "user")
         self.assertIsInstance(last_message["content"], list)
         # Should be 1 item: text block with appended content
@@ -56,5 +62,74 @@ class TestAttachments(unittest.TestCase):
         self.assertIn("[Attachment: notes.txt]", last_message["content"][0]["text"])
         self.assertIn("Hello World", last_message["content"][0]["text"])
 
+    def test_older_turns_get_placeholder(self):
+        agent = Agent("Viewer", "Tester", "Look at things.", attachment_store=AttachmentStore())
+        agent.think = MagicMock(return_value="Mock response")
+        image = {"name": "cat.png", "type": "image/png", "content": "data:image/png;base64,CAT"}
+
+        agent.chat("First look", attachments=[image])
+        agent.add_message("assistant", "A cat.")
+        agent.chat("And now?")
+
+        wire = agent._build_wire_messages()
+        old_turn = wire[1]["content"]
+        self.assertEqual(len(old_turn), 1)
+        self.assertIn("[Attachment: cat.png", old_turn[0]["text"])
+        self.assertIn("omitted from context", old_turn[0]["text"])
+        self.assertNotIn("CAT", str(wire))
+
+        # History itself is untouched by hydration
+        self.assertEqual(agent.messages[1]["content"][1]["type"], "attachment")
+
+    def test_retention_setting_keeps_recent_turns(self):
+        original = settings.attachment_retention_turns
+        settings.attachment_retention_turns = 2
+        try:
+            agent = Agent("Viewer", "Tester", "Look at things.", attachment_store=AttachmentStore())
+            agent.think = MagicMock(return_value="Mock response")
+            image = {"name": "cat.png", "type": "image/png", "content": "data:image/png;base64,CAT"}
+
+            agent.chat("First look", attachments=[image])
+            agent.chat("And now?")
+
+            wire = agent._build_wire_messages()
+            self.assertEqual(wire[1]["content"][1]["image_url"]["url"], image["content"])
+        finally:
+            settings.attachment_retention_turns = original
+
+    def test_text_attachments_outlive_retention(self):
+        agent = Agent("Reader", "Tester", "Read things.", attachment_store=AttachmentStore())
+        agent.think = MagicMock(return_value="Mock response")
+        notes = {"name": "notes.txt", "type": "text/plain", "content": "Hello World"}
+
+        agent.chat("Read this", attachments=[notes])
+        agent.chat("What did it say?")
+
+        self.assertIn("Hello World", agent._build_wire_messages()[1]["content"][0]["text"])
+
+    def test_delegation_turns_do_not_expire_images(self):
+        agent = Agent("Viewer", "Tester", "Look at things.", attachment_store=AttachmentStore())
+        agent.think = MagicMock(return_value="Mock response")
+        image = {"name": "cat.png", "type": "image/png", "content": "data:image/png;base64,CAT"}
+
+        agent.chat("First look", attachments=[image])
+        agent.chat("Request from Boss: describe it", lane=LANE_DELEGATION)
+
+        wire = agent._build_wire_messages()
+        self.assertEqual(wire[1]["content"][1]["image_url"]["url"], image["content"])
+        self.assertNotIn("lane", wire[-1])
+        self.assertEqual(agent.messages[-1]["lane"], LANE_DELEGATION)
+
+    def test_store_deduplicates_and_evicts(self):
+        store = AttachmentStore(max_bytes=10)
+        ref_a = store.put("aaaaaa")
+        self.assertEqual(store.put("aaaaaa"), ref_a)
+        self.assertEqual(len(store), 1)
+
+        ref_b = store.put("bbbbbb")
+        self.assertIsNone(store.get(ref_a))
+        self.assertEqual(store.get(ref_b), "bbbbbb")
+        self.assertEqual(store.size, 6)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,95 @@
+import threading
+import time
+import unittest
+from opencore.core.swarm import Swarm
+from opencore.core.context import cancel_token_ctx
+from opencore.core.tasks import TASK_COMPLETED, TASK_CANCELLED, TASK_RUNNING
+
+
+class GatedWorker:
+    """Stand-in agent that blocks until released or cancelled."""
+    def __init__(self, answer):
+        self.answer = answer
+        self.release = threading.Event()
+        self.last_thought = "Reading sources..."
+
+    def chat(self, message, lane=None):
+        token = cancel_token_ctx.get()
+        while not self.release.wait(0.01):
+            if token is not None and token.cancelled:
+                return "Error: Request cancelled."
+        return self.answer
+
+
+class TestBackgroundTasks(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm("Lead")
+        self.lead = self.swarm.agents["Lead"]
+        self.worker = GatedWorker("report ready")
+        self.swarm.agents["Researcher"] = self.worker
+
+    def tearDown(self):
+        self.worker.release.set()
+        self.swarm.tasks.shutdown()
+
+    def _handle(self, output):
+        return output.split("handle '")[1].rstrip("'.")
+
+    def test_start_returns_immediately_and_await_collects(self):
+        output = self.lead.tools["start_task"]("Researcher", "Find sources")
+        self.assertIn("Task started on 'Researcher'", output)
+        handle = self._handle(output)
+
+        record = self.swarm.tasks.get(handle)
+        self.assertFalse(record.finished)
+
+        self.worker.release.set()
+        result = self.lead.tools["await_tasks"]([handle], timeout=5)
+
+        self.assertIn("completed", result)
+        self.assertIn("Response from Researcher: report ready", result)
+        self.assertEqual(record.status, TASK_COMPLETED)
+
+    def test_check_task_reports_partial_output(self):
+        handle = self._handle(self.lead.tools["start_task"]("Researcher", "Find sources"))
+        deadline = time.monotonic() + 5
+        while self.swarm.tasks.get(handle).status != TASK_RUNNING and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        status = self.lead.tools["check_task"](handle)
+        self.assertIn("running for", status)
+        self.assertIn("Reading sources...", status)
+
+    def test_cancel_task(self):
+        handle = self._handle(self.lead.tools["start_task"]("Researcher", "Find sources"))
+        self.assertIn("cancellation requested", self.lead.tools["cancel_task"](handle))
+
+        record = self.swarm.tasks.wait([handle], timeout=5)[0]
+        self.assertEqual(record.status, TASK_CANCELLED)
+        self.assertIn("already finished", self.lead.tools["cancel_task"](handle))
+
+    def test_await_times_out_without_blocking_forever(self):
+        handle = self._handle(self.lead.tools["start_task"]("Researcher", "Find sources"))
+        start = time.monotonic()
+        result = self.lead.tools["await_tasks"]([handle], timeout=0.1)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertIn("running", result)
+
+    def test_handles_are_private_to_their_caller(self):
+        handle = self._handle(self.lead.tools["start_task"]("Researcher", "Find sources"))
+        self.swarm.create_agent("Other", "Tester", "Test things.")
+        other_tools = self.swarm.agents["Other"].tools
+
+        self.assertIn("Unknown task handle", other_tools["check_task"](handle))
+        self.assertIn("Unknown task handle", other_tools["await_tasks"]([handle], timeout=0.1))
+        self.assertIn("not found", other_tools["cancel_task"](handle))
+        self.assertFalse(self.swarm.tasks.get(handle).finished)
+        self.assertNotIn("Unknown task handle", self.lead.tools["check_task"](handle))
+
+    def test_unknown_agent_and_handle(self):
+        self.assertIn("Error: Agent 'Ghost' not found", self.lead.tools["start_task"]("Ghost", "x"))
+        self.assertIn("Unknown task handle", self.lead.tools["check_task"]("task_missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from opencore.config import settings
+from opencore.core.blackboard import Blackboard
+from opencore.core.context import activity_log_ctx
+from opencore.core.exceptions import FactConflictError
+from opencore.core.swarm import Swarm
+
+
+class TestBlackboard(unittest.TestCase):
+    def test_versions_and_compare_and_set(self):
+        board = Blackboard()
+        self.assertEqual(board.post("db:schema", "users, orders", "A").version, 1)
+        self.assertEqual(board.post("db:schema", "users, orders, items", "B").version, 2)
+
+        with self.assertRaises(FactConflictError):
+            board.post("db:schema", "stale", "A", expected_version=1)
+        with self.assertRaises(FactConflictError):
+            board.post("db:schema", "new", "A", expected_version=0)
+        self.assertEqual(board.post("db:schema", "fresh", "A", expected_version=2).version, 3)
+        self.assertEqual(board.get("db:schema").value, "fresh")
+
+    def test_versions_are_not_reused_after_delete_or_eviction(self):
+        board = Blackboard(max_facts=2)
+        board.post("plan", "v1", "A")
+        board.delete("plan")
+        recreated = board.post("plan", "other", "B")
+        self.assertGreater(recreated.version, 1)
+        with self.assertRaises(FactConflictError):
+            board.post("plan", "stale", "A", expected_version=1)
+
+        board.post("a", "1", "A")
+        board.post("b", "2", "A")
+        self.assertIsNone(board.get("plan"))
+        with self.assertRaises(FactConflictError):
+            board.post("plan", "stale", "B", expected_version=recreated.version)
+        self.assertGreater(board.post("plan", "new", "C").version, recreated.version)
+
+    def test_value_limit(self):
+        with patch.object(settings, "blackboard_max_value_chars", 10):
+            with self.assertRaises(ValueError):
+                Blackboard().post("k", "x" * 11, "A")
+
+    def test_bounded_least_recently_used(self):
+        board = Blackboard(max_facts=2)
+        board.post("a", "1", "A")
+        board.post("b", "2", "A")
+        board.get("a")
+        board.post("c", "3", "A")
+
+        self.assertIsNotNone(board.get("a"))
+        self.assertIsNone(board.get("b"))
+        self.assertEqual(len(board), 2)
+
+    def test_search_ranks_by_matching_terms(self):
+        board = Blackboard()
+        board.post("file:auth.py", "Handles login tokens", "A", tags=["auth"])
+        board.post("file:db.py", "Connection pool and login audit table", "A")
+        board.post("file:ui.py", "Buttons", "A")
+
+        results = board.search("login tokens")
+        self.assertEqual([fact.key for fact in results], ["file:auth.py", "file:db.py"])
+        self.assertEqual([fact.key for fact in board.search("login", tag="auth")], ["file:auth.py"])
+
+    def test_persistence_replays_and_compacts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "facts.jsonl")
+            board = Blackboard(path=path)
+            for i in range(150):
+                board.post("counter", str(i), "A")
+            board.post("gone", "x", "A")
+            board.delete("gone")
+
+            with open(path) as f:
+                self.assertLess(len(f.readlines()), 100)
+            reloaded = Blackboard(path=path)
+            fact = reloaded.get("counter")
+            self.assertEqual((fact.value, fact.version), ("149", 150))
+            self.assertIsNone(reloaded.get("gone"))
+            self.assertEqual(reloaded.post("next", "y", "B").seq, board.seq + 1)
+
+    def test_compaction_keeps_seq_of_deleted_facts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "facts.jsonl")
+            board = Blackboard(path=path)
+            for i in range(150):
+                board.post("counter", str(i), "A")
+            board.post("gone", "x", "A")
+            board.delete("gone")
+            board._compact()
+
+            reloaded = Blackboard(path=path)
+            self.assertEqual(reloaded.seq, board.seq)
+            self.assertGreater(reloaded.post("gone", "y", "B").version, 151)
+
+
+class TestBlackboardTools(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm("Boss")
+
+    def tool(self, name, caller="Boss"):
+        return self.swarm.tool_catalog.bind(name, caller, "agent")
+
+    def test_agents_share_facts(self):
+        log = []
+        token = activity_log_ctx.set(log)
+        try:
+            result = self.tool("post_fact", "Reader")(key="file:main.py", value="Entry point; starts the API.")
+        finally:
+            activity_log_ctx.reset(token)
+
+        self.assertEqual(result, "Fact 'file:main.py' saved (version 1).")
+        self.assertEqual(log[0]["type"], "blackboard")
+        self.assertEqual(
+            self.tool("get_fact", "Writer")(key="file:main.py"),
+            "file:main.py (v1, by Reader): Entry point; starts the API."
+        )
+        self.assertIn("file:main.py", self.tool("search_facts", "Writer")(query="api entry"))
+        self.assertIn("No facts match", self.tool("search_facts")(query="database"))
+
+    def test_conflict_is_a_tool_error(self):
+        self.tool("post_fact")(key="plan", value="v1")
+        result = self.tool("post_fact")(key="plan", value="v2", expected_version=0)
+        self.assertTrue(result.startswith("Error: Fact 'plan' is at version 1"))
+
+    def test_export_keeps_seq_of_deleted_facts(self):
+        self.swarm.post_fact("Boss", "plan", "ship it")
+        self.swarm.blackboard.delete("plan")
+        restored = Swarm.from_state(self.swarm.export_state())
+        self.assertEqual(restored.blackboard.seq, self.swarm.blackboard.seq)
+        self.assertGreater(restored.post_fact("Boss", "plan", "again").version, 1)
+
+    def test_facts_survive_export(self):
+        self.swarm.post_fact("Boss", "plan", "ship it")
+        restored = Swarm.from_state(self.swarm.export_state())
+        self.assertEqual(restored.blackboard.get("plan").value, "ship it")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import time
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+from opencore.core.agent import Agent
+from opencore.core.cancellation import CancellationToken, CancellationRegistry
+from opencore.core.context import cancel_token_ctx
+from opencore.core.exceptions import OperationCancelledError
+from opencore.llm.base import LLMResponse, ToolCall, ToolCallFunction
+from opencore.tools.base import execute_command
+from opencore.interface.api import app, inflight_chats
+
+client = TestClient(app)
+
+
+class TestCancellationToken(unittest.TestCase):
+    def test_callbacks_run_once_on_cancel(self):
+        token = CancellationToken()
+        callback = MagicMock()
+        token.add_callback(callback)
+
+        token.cancel("stop")
+        token.cancel("again")
+
+        callback.assert_called_once()
+        self.assertEqual(token.reason, "stop")
+        with self.assertRaises(OperationCancelledError):
+            token.raise_if_cancelled()
+
+    def test_removed_callback_not_called(self):
+        token = CancellationToken()
+        callback = MagicMock()
+        remove = token.add_callback(callback)
+        remove()
+        token.cancel()
+        callback.assert_not_called()
+
+    def test_child_follows_parent(self):
+        parent = CancellationToken()
+        child = parent.child()
+        parent.cancel()
+        self.assertTrue(child.cancelled)
+
+    def test_registry(self):
+        registry = CancellationRegistry()
+        token = CancellationToken()
+        registry.register("req-1", token)
+        self.assertTrue(registry.cancel("req-1"))
+        self.assertTrue(token.cancelled)
+        self.assertFalse(registry.cancel("missing"))
+
+    def test_registry_rejects_duplicate_ids(self):
+        registry = CancellationRegistry()
+        first, second = CancellationToken(), CancellationToken()
+        self.assertTrue(registry.register("req-1", first))
+        self.assertFalse(registry.register("req-1", second))
+
+        # Only the request that owns the ID removes it
+        registry.unregister("req-1", second)
+        self.assertIn("req-1", registry)
+        registry.unregister("req-1", first)
+        self.assertNotIn("req-1", registry)
+
+
+class TestAgentCancellation(unittest.TestCase):
+    @patch("opencore.core.agent.get_llm_provider")
+    def test_think_stops_after_tool_cancels(self, mock_get_provider):
+        token = CancellationToken()
+        provider = MagicMock()
+        provider.chat.return_value = LLMResponse(
+            content=None,
+            tool_calls=[ToolCall(id="call_1", function=ToolCallFunction(name="stop", arguments="{}"))]
+        )
+        mock_get_provider.return_value = provider
+
+        agent = Agent("Worker", "Tester", "Test things.")
+        agent.register_tool(
+            lambda: token.cancel() or "stopped",
+            {"type": "function", "function": {"name": "stop", "parameters": {}}}
+        )
+
+        ctx = cancel_token_ctx.set(token)
+        try:
+            result = agent.chat("go")
+        finally:
+            cancel_token_ctx.reset(ctx)
+
+        self.assertEqual(result, "Error: Request cancelled.")
+        provider.chat.assert_called_once()
+
+    @patch("opencore.core.agent.get_llm_provider")
+    def test_cancel_closes_provider(self, mock_get_provider):
+        token = CancellationToken()
+        provider = MagicMock()
+
+        def slow_chat(**kwargs):
+            token.cancel()
+            raise ConnectionError("connection closed")
+
+        provider.chat.side_effect = slow_chat
+        mock_get_provider.return_value = provider
+
+        agent = Agent("Worker", "Tester", "Test things.")
+        ctx = cancel_token_ctx.set(token)
+        try:
+            result = agent.chat("go")
+        finally:
+            cancel_token_ctx.reset(ctx)
+
+        self.assertEqual(result, "Error: Request cancelled.")
+        provider.close.assert_called_once()
+
+    def test_execute_command_killed_on_cancel(self):
+        token = CancellationToken()
+        timer = threading.Timer(0.2, token.cancel)
+
+        ctx = cancel_token_ctx.set(token)
+        start = time.monotonic()
+        timer.start()
+        try:
+            result = execute_command("sleep 10")
+        finally:
+            cancel_token_ctx.reset(ctx)
+            timer.cancel()
+
+        self.assertEqual(result, "Error: Command cancelled.")
+        self.assertLess(time.monotonic() - start, 5)
+
+
+class TestCancelEndpoint(unittest.TestCase):
+    def test_cancel_unknown_request(self):
+        response = client.delete("/chat/does-not-exist")
+        self.assertEqual(response.status_code, 404)
+
+    @patch("opencore.core.swarm.Swarm.chat")
+    def test_cancel_inflight_chat(self, mock_chat):
+        def wait_for_cancel(message, attachments=None):
+            token = cancel_token_ctx.get()
+            token.wait(5)
+            return "Error: Request cancelled." if token.cancelled else "finished"
+
+        mock_chat.side_effect = wait_for_cancel
+        results = {}
+
+        def post():
+            results["response"] = client.post(
+                "/chat", json={"message": "long task"}, headers={"X-Request-ID": "chat-42"}
+            )
+
+        worker = threading.Thread(target=post)
+        worker.start()
+        deadline = time.monotonic() + 5
+        while "chat-42" not in inflight_chats and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        cancel = client.delete("/chat/chat-42")
+        worker.join(5)
+
+        self.assertEqual(cancel.status_code, 200)
+        self.assertEqual(results["response"].json()["response"], "Error: Request cancelled.")
+        self.assertEqual(results["response"].headers["X-Request-ID"], "chat-42")
+
+    def test_duplicate_request_id_is_rejected(self):
+        token = CancellationToken()
+        inflight_chats.register("chat-7", token)
+        try:
+            response = client.post("/chat", json={"message": "hi"}, headers={"X-Request-ID": "chat-7"})
+        finally:
+            inflight_chats.unregister("chat-7", token)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(client.delete("/chat/chat-7").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from opencore.core.jobs import JobManager, JobLimitError, JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED, JOB_QUEUED
+from opencore.core.cancellation import is_cancelled
+from opencore.core.context import activity_log_ctx
+from opencore.interface import api
+from opencore.interface.api import app
+
+
+def wait_until_finished(manager, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+class TestJobManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = JobManager(max_workers=1, max_pending=2, retention=60)
+
+    def tearDown(self):
+        self.manager.shutdown()
+
+    def test_result_and_activity_log(self):
+        def runner():
+            activity_log_ctx.get().append({"type": "lifecycle", "subtype": "create", "agent": "W"})
+            return {"response": "done"}
+
+        job = self.manager.submit(runner)
+        job = wait_until_finished(self.manager, job.id)
+
+        self.assertEqual(job.status, JOB_COMPLETED)
+        self.assertEqual(job.result, {"response": "done"})
+        self.assertEqual(job.to_dict()["activity_log"][0]["agent"], "W")
+
+    def test_failure_is_recorded(self):
+        job = self.manager.submit(lambda: 1 / 0)
+        job = wait_until_finished(self.manager, job.id)
+        self.assertEqual(job.status, JOB_FAILED)
+        self.assertIn("division by zero", job.error)
+
+    def test_pending_limit_and_cancel(self):
+        release = threading.Event()
+        running = self.manager.submit(lambda: release.wait(5) and {})
+        queued = self.manager.submit(lambda: {})
+        with self.assertRaises(JobLimitError):
+            self.manager.submit(lambda: {})
+
+        self.assertEqual(queued.status, JOB_QUEUED)
+        self.assertTrue(self.manager.cancel(queued.id))
+        release.set()
+        self.assertEqual(wait_until_finished(self.manager, queued.id).status, JOB_CANCELLED)
+        self.assertEqual(wait_until_finished(self.manager, running.id).status, JOB_COMPLETED)
+        self.assertFalse(self.manager.cancel(running.id))
+
+    def test_cancellation_reaches_runner(self):
+        started = threading.Event()
+
+        def runner():
+            started.set()
+            while not is_cancelled():
+                time.sleep(0.01)
+            return {}
+
+        job = self.manager.submit(runner)
+        started.wait(5)
+        self.manager.cancel(job.id)
+        self.assertEqual(wait_until_finished(self.manager, job.id).status, JOB_CANCELLED)
+
+    def test_finished_jobs_expire(self):
+        job = self.manager.submit(lambda: {})
+        wait_until_finished(self.manager, job.id)
+        self.manager.retention = 0
+        time.sleep(0.01)
+        self.assertIsNone(self.manager.get(job.id))
+        self.assertEqual(self.manager.stats()["retained"], 0)
+
+
+class TestJobsApi(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+
+    @patch("opencore.core.agent.Agent.think", return_value="Acknowledged.")
+    def test_submit_and_poll(self, mock_think):
+        response = self.client.post("/jobs/chat", json={"message": "long running work"})
+
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["id"]
+        self.assertEqual(response.headers["Location"], f"/jobs/{job_id}")
+
+        job = wait_until_finished(api.job_manager, job_id)
+        self.assertEqual(job.status, JOB_COMPLETED, job.error)
+        data = self.client.get(f"/jobs/{job_id}").json()
+        self.assertEqual(data["status"], "completed")
+        self.assertEqual(data["result"]["response"], "Acknowledged.")
+        self.assertIn("Manager", data["result"]["agents"])
+
+    def test_unknown_job(self):
+        self.assertEqual(self.client.get("/jobs/job_missing").status_code, 404)
+        self.assertEqual(self.client.delete("/jobs/job_missing").status_code, 404)
+
+    def test_invalid_session(self):
+        response = self.client.post("/jobs/chat", json={"message": "hi"}, headers={"X-Session-ID": "bad id!"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_job_limit_returns_429(self):
+        with patch.object(api.job_manager, "submit", side_effect=JobLimitError("Too many jobs")):
+            response = self.client.post("/jobs/chat", json={"message": "hi"})
+        self.assertEqual(response.status_code, 429)
+
+
+if __name__ == "__main__":
+    unittest.main()
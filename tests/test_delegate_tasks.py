@@ -0,0 +1,106 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from opencore.config import settings
+from opencore.core.swarm import Swarm
+from opencore.core.context import activity_log_ctx, cancel_token_ctx
+
+
+class SlowWorker:
+    """Minimal stand-in for an Agent whose chat takes a while."""
+    def __init__(self, name, delay, answer):
+        self.name = name
+        self.delay = delay
+        self.answer = answer
+
+    def chat(self, message, lane=None):
+        time.sleep(self.delay)
+        return self.answer
+
+
+class StuckWorker:
+    def chat(self, message, lane=None):
+        # Blocks until its delegation token is cancelled
+        cancel_token_ctx.get().wait(5)
+        return "Error: Request cancelled."
+
+
+class TestDelegateTasks(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm("Boss")
+        self.boss = self.swarm.agents["Boss"]
+
+    def test_runs_concurrently_and_preserves_order(self):
+        self.swarm.agents["A"] = SlowWorker("A", 0.3, "alpha")
+        self.swarm.agents["B"] = SlowWorker("B", 0.1, "beta")
+
+        start = time.monotonic()
+        results = self.swarm.delegate_tasks("Boss", [
+            {"to_agent": "A", "task": "first"},
+            {"to_agent": "B", "task": "second"},
+        ])
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(results, ["Response from A: alpha", "Response from B: beta"])
+        self.assertLess(elapsed, 0.39)
+
+    def test_per_task_timeout(self):
+        self.swarm.agents["Fast"] = SlowWorker("Fast", 0, "done")
+        self.swarm.agents["Stuck"] = StuckWorker()
+
+        results = self.swarm.delegate_tasks("Boss", [
+            {"to_agent": "Stuck", "task": "never ends"},
+            {"to_agent": "Fast", "task": "quick"},
+        ], timeout=0.2)
+
+        self.assertIn("timed out after 0.2s", results[0])
+        self.assertEqual(results[1], "Response from Fast: done")
+
+    def test_timeout_is_capped_and_must_be_positive(self):
+        self.swarm.agents["Stuck"] = StuckWorker()
+
+        with patch.object(settings, "delegation_timeout", 0.2):
+            results = self.swarm.delegate_tasks("Boss", [{"to_agent": "Stuck", "task": "t"}], timeout=86400)
+        self.assertIn("timed out after 0.2s", results[0])
+
+        for timeout in (0, -5):
+            with self.assertRaises(ValueError):
+                self.swarm.delegate_tasks("Boss", [{"to_agent": "Stuck", "task": "t"}], timeout=timeout)
+            output = self.boss.tools["delegate_tasks"](tasks=[{"to_agent": "Stuck", "task": "t"}], timeout=timeout)
+            self.assertTrue(output.startswith("Error: Timeout must be"))
+
+    def test_records_interactions_and_activity(self):
+        worker = MagicMock()
+        worker.chat.return_value = "ok"
+        self.swarm.agents["W1"] = worker
+        self.swarm.agents["W2"] = worker
+
+        token = activity_log_ctx.set([])
+        try:
+            self.swarm.delegate_tasks("Boss", [
+                {"to_agent": "W1", "task": "a"},
+                {"to_agent": "W2", "task": "b"},
+            ])
+            activity = activity_log_ctx.get()
+        finally:
+            activity_log_ctx.reset(token)
+
+        self.assertEqual(len(self.swarm.interactions), 4)
+        self.assertEqual(len([a for a in activity if a["type"] == "interaction"]), 4)
+
+    def test_tool_wrapper_formats_results(self):
+        self.swarm.agents["A"] = SlowWorker("A", 0, "alpha")
+        tool = self.boss.tools["delegate_tasks"]
+
+        output = tool(tasks=[{"to_agent": "A", "task": "x"}, {"to_agent": "Ghost", "task": "y"}])
+
+        self.assertIn("[1] Response from A: alpha", output)
+        self.assertIn("[2] Error: Agent 'Ghost' not found", output)
+
+    def test_invalid_task_shape(self):
+        output = self.boss.tools["delegate_tasks"](tasks=[{"agent": "A"}])
+        self.assertIn("Error: Each task must be an object", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+import threading
+import unittest
+from unittest.mock import patch
+from opencore.config import settings
+from opencore.core.swarm import Swarm
+from opencore.core.cancellation import CancellationToken
+from opencore.core.context import activity_log_ctx, cancel_token_ctx
+from opencore.core.delegation import DelegationBudget, check_delegation, delegation_scope, delegation_tree, current_chain
+from opencore.core.exceptions import DelegationLimitError, OperationCancelledError
+
+
+class RelayWorker:
+    """Stand-in agent that forwards every request to `next_agent` through the swarm, or answers."""
+    def __init__(self, swarm, name, next_agent=None):
+        self.swarm = swarm
+        self.name = name
+        self.next_agent = next_agent
+        self.chains = []
+
+    def chat(self, message, lane=None):
+        self.chains.append(current_chain())
+        if self.next_agent is None:
+            return f"{self.name} done"
+        return self.swarm.delegate_task(self.name, self.next_agent, "pass it on")
+
+
+class BlockingWorker:
+    def __init__(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def chat(self, message, lane=None):
+        self.entered.set()
+        self.release.wait(5)
+        return "finished"
+
+
+class TestCheckDelegation(unittest.TestCase):
+    def test_first_hop_starts_chain_at_caller(self):
+        self.assertEqual(check_delegation("Boss", "A"), ("Boss", "A"))
+
+    def test_self_delegation_is_a_cycle(self):
+        with self.assertRaises(DelegationLimitError):
+            check_delegation("Boss", "Boss")
+
+    def test_depth_limit(self):
+        with delegation_scope(("Boss", "A", "B")):
+            self.assertEqual(check_delegation("B", "C", max_depth=3), ("Boss", "A", "B", "C"))
+            with self.assertRaises(DelegationLimitError):
+                check_delegation("B", "C", max_depth=2)
+
+
+class TestSwarmDelegationLimits(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm("Boss")
+
+    def test_cycle_rejected_with_tool_error(self):
+        a = RelayWorker(self.swarm, "A", next_agent="B")
+        b = RelayWorker(self.swarm, "B", next_agent="A")
+        self.swarm.agents["A"] = a
+        self.swarm.agents["B"] = b
+
+        result = self.swarm.delegate_task("Boss", "A", "start")
+
+        self.assertIn("Delegation cycle detected (Boss -> A -> B -> A)", result)
+        self.assertEqual(len(a.chains), 1)
+        self.assertEqual(b.chains, [("Boss", "A", "B")])
+
+    def test_depth_limit_rejected(self):
+        names = ["A", "B", "C", "D"]
+        for name, nxt in zip(names, names[1:] + [None]):
+            self.swarm.agents[name] = RelayWorker(self.swarm, name, next_agent=nxt)
+
+        with patch.object(settings, "max_delegation_depth", 2):
+            result = self.swarm.delegate_task("Boss", "A", "start")
+
+        self.assertIn("Delegation depth limit reached (2)", result)
+        self.assertEqual(self.swarm.agents["C"].chains, [])
+
+    def test_chain_is_reset_after_delegation(self):
+        self.swarm.agents["A"] = RelayWorker(self.swarm, "A")
+        self.swarm.delegate_task("Boss", "A", "one")
+        self.assertEqual(current_chain(), ())
+        self.assertEqual(self.swarm.delegate_task("Boss", "A", "two"), "Response from A: A done")
+
+    def test_inflight_budget_rejects_when_full(self):
+        blocker = BlockingWorker()
+        self.swarm.agents["Slow"] = blocker
+        self.swarm.agents["A"] = RelayWorker(self.swarm, "A")
+        self.swarm.delegations = DelegationBudget(limit=1)
+
+        holder = threading.Thread(target=self.swarm.delegate_task, args=("Boss", "Slow", "hold"))
+        holder.start()
+        self.assertTrue(blocker.entered.wait(5))
+        try:
+            with patch.object(settings, "delegation_slot_wait", 0):
+                result = self.swarm.delegate_task("Boss", "A", "squeeze in")
+        finally:
+            blocker.release.set()
+            holder.join(5)
+
+        self.assertIn("Too many delegations in flight (1)", result)
+        self.assertEqual(self.swarm.delegations.stats(), {"in_flight": 0, "peak": 1, "limit": 1})
+
+    def test_activity_log_carries_delegation_tree(self):
+        self.swarm.agents["A"] = RelayWorker(self.swarm, "A", next_agent="B")
+        self.swarm.agents["B"] = RelayWorker(self.swarm, "B")
+        self.swarm.agents["C"] = RelayWorker(self.swarm, "C")
+
+        token = activity_log_ctx.set([])
+        try:
+            self.swarm.delegate_task("Boss", "A", "first")
+            self.swarm.delegate_task("Boss", "C", "second")
+            activity = activity_log_ctx.get()
+        finally:
+            activity_log_ctx.reset(token)
+
+        requests = [a for a in activity if a.get("subtype") == "request"]
+        self.assertEqual([(a["chain"], a["depth"]) for a in requests], [
+            (["Boss", "A"], 1), (["Boss", "A", "B"], 2), (["Boss", "C"], 1)
+        ])
+        tree = delegation_tree(activity)
+        self.assertEqual(len(tree), 1)
+        self.assertEqual(tree[0]["agent"], "Boss")
+        self.assertEqual([c["agent"] for c in tree[0]["children"]], ["A", "C"])
+        self.assertEqual(tree[0]["children"][0]["children"][0]["agent"], "B")
+        self.assertEqual(tree[0]["children"][0]["tasks"], ["first"])
+
+
+class FanOutWorker:
+    """Stand-in agent that delegates to several agents in parallel."""
+    def __init__(self, swarm, name, targets):
+        self.swarm = swarm
+        self.name = name
+        self.targets = targets
+
+    def chat(self, message, lane=None):
+        results = self.swarm.delegate_tasks(self.name, [{"to_agent": t, "task": "part"} for t in self.targets])
+        return " | ".join(results)
+
+
+class TestBudgetAcrossNesting(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm("Boss")
+        self.swarm.delegations = DelegationBudget(limit=1)
+
+    def test_nested_delegation_borrows_callers_slot(self):
+        self.swarm.agents["A"] = RelayWorker(self.swarm, "A", next_agent="B")
+        self.swarm.agents["B"] = RelayWorker(self.swarm, "B")
+
+        with patch.object(settings, "delegation_slot_wait", 0):
+            result = self.swarm.delegate_task("Boss", "A", "start")
+
+        self.assertEqual(result, "Response from A: Response from B: B done")
+        self.assertEqual(self.swarm.delegations.stats(), {"in_flight": 0, "peak": 1, "limit": 1})
+
+    def test_fan_out_releases_slot_while_waiting(self):
+        self.swarm.agents["A"] = FanOutWorker(self.swarm, "A", ["B", "C"])
+        self.swarm.agents["B"] = RelayWorker(self.swarm, "B")
+        self.swarm.agents["C"] = RelayWorker(self.swarm, "C")
+
+        with patch.object(settings, "delegation_slot_wait", 5):
+            result = self.swarm.delegate_task("Boss", "A", "start")
+
+        self.assertEqual(result, "Response from A: Response from B: B done | Response from C: C done")
+        self.assertEqual(self.swarm.delegations.stats()["in_flight"], 0)
+
+    def test_workflow_and_map_steps_take_budget_slots(self):
+        blocker = BlockingWorker()
+        self.swarm.agents["Slow"] = blocker
+        self.swarm.agents["A"] = RelayWorker(self.swarm, "A")
+        self.swarm.create_agent("Summarizer", "Writer", "Summarize files.")
+
+        holder = threading.Thread(target=self.swarm.delegate_task, args=("Boss", "Slow", "hold"))
+        holder.start()
+        self.assertTrue(blocker.entered.wait(5))
+        try:
+            with patch.object(settings, "delegation_slot_wait", 0):
+                workflow = self.swarm.run_workflow({"name": "w", "steps": [{"id": "a", "agent": "A", "task": "x"}]})
+                mapped = self.swarm.map_task("Boss", "Summarizer", "Summarize", ["one"])
+        finally:
+            blocker.release.set()
+            holder.join(5)
+
+        self.assertIn("Too many delegations in flight", workflow.outputs["a"])
+        self.assertIn("Too many delegations in flight", mapped["results"][0])
+
+    def test_workflow_steps_follow_delegation_chain(self):
+        self.swarm.agents["A"] = RelayWorker(self.swarm, "A")
+        with delegation_scope(("Boss", "A")):
+            cycle = self.swarm.run_workflow({"name": "w", "steps": [{"id": "a", "agent": "Boss", "task": "x"}]}, caller="A")
+        self.assertIn("Delegation cycle detected (Boss -> A -> Boss)", cycle.outputs["a"])
+
+        with patch.object(settings, "max_delegation_depth", 1), delegation_scope(("Boss", "B")):
+            deep = self.swarm.run_workflow({"name": "w", "steps": [{"id": "a", "agent": "A", "task": "x"}]}, caller="B")
+        self.assertIn("Delegation depth limit reached", deep.outputs["a"])
+        self.assertEqual(self.swarm.agents["A"].chains, [])
+
+
+class TestDelegationBudget(unittest.TestCase):
+    def test_cancel_interrupts_wait(self):
+        budget = DelegationBudget(limit=1)
+        token = CancellationToken()
+        errors = []
+
+        def waiter():
+            cancel_token_ctx.set(token)
+            try:
+                with budget.slot(wait=5):
+                    pass
+            except OperationCancelledError as e:
+                errors.append(e)
+
+        with budget.slot():
+            t = threading.Thread(target=waiter)
+            t.start()
+            token.cancel()
+            t.join(2)
+
+        self.assertFalse(t.is_alive())
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(budget.stats()["in_flight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch
+from opencore.config import settings
+from opencore.core.results import ResultStore, fit_result
+from opencore.core.swarm import Swarm
+from opencore.llm.base import LLMResponse
+
+
+class VerboseWorker:
+    def __init__(self, text):
+        self.text = text
+
+    def chat(self, message, lane=None):
+        return self.text
+
+
+class TestResultStore(unittest.TestCase):
+    def test_short_handle_and_paging(self):
+        store = ResultStore(max_bytes=1024)
+        handle = store.put("abcdefghij")
+
+        self.assertTrue(handle.startswith("result-"))
+        self.assertEqual(len(handle), len("result-") + 16)
+        page = store.read(handle, offset=2, limit=3)
+        self.assertIn("characters 2-5 of 10. Continue with offset=5.", page)
+        self.assertTrue(page.endswith("\ncde"))
+        self.assertTrue(store.read("result-missing").startswith("Error"))
+
+
+class TestFitResult(unittest.TestCase):
+    def setUp(self):
+        self.store = ResultStore(max_bytes=1024 * 1024)
+
+    def test_short_result_unchanged(self):
+        self.assertEqual(fit_result("short", "task", self.store, "gpt-4o", max_chars=10), "short")
+        self.assertEqual(len(self.store), 0)
+
+    def test_no_limit(self):
+        self.assertEqual(fit_result("x" * 100, "task", self.store, "gpt-4o", max_chars=0), "x" * 100)
+
+    def test_store_mode_returns_preview_and_handle(self):
+        text = "a" * 50 + "b" * 50
+        fitted = fit_result(text, "task", self.store, "gpt-4o", max_chars=50, mode="store")
+
+        self.assertTrue(fitted.startswith("a" * 50 + "\n\n[Result of 100 characters"))
+        self.assertNotIn("b", fitted.split("\n\n")[0])
+        handle = fitted.split("handle='")[1].split("'")[0]
+        self.assertEqual(self.store.get(handle), text)
+
+    @patch("opencore.core.results.get_llm_provider")
+    def test_summarize_mode(self, mock_provider):
+        mock_provider.return_value.chat.return_value = LLMResponse(content="Three bugs found in parser.py.")
+        fitted = fit_result("x" * 500, "Find bugs", self.store, "cheap-model", max_chars=100, mode="summarize")
+
+        mock_provider.assert_called_once_with("cheap-model")
+        self.assertTrue(fitted.startswith("Summary: Three bugs found in parser.py."))
+        self.assertIn("read_result(handle='result-", fitted)
+        prompt = mock_provider.return_value.chat.call_args.kwargs["messages"][1]["content"]
+        self.assertIn("Task: Find bugs", prompt)
+
+    @patch("opencore.core.results.get_llm_provider")
+    def test_summarize_falls_back_to_preview(self, mock_provider):
+        mock_provider.return_value.chat.side_effect = RuntimeError("provider down")
+        fitted = fit_result("x" * 500, "task", self.store, "cheap-model", max_chars=100, mode="summarize")
+        self.assertTrue(fitted.startswith("x" * 100 + "\n\n[Result of 500 characters first 100 characters shown."))
+
+
+class TestSwarmDelegationBudget(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm("Boss")
+        self.swarm.agents["Writer"] = VerboseWorker("word " * 2000)
+
+    @patch.multiple(settings, delegation_result_max_chars=200, delegation_result_mode="store")
+    def test_long_answer_is_stored_and_readable(self):
+        result = self.swarm.delegate_task("Boss", "Writer", "Write a lot")
+
+        self.assertLess(len(result), 400)
+        handle = result.split("handle='")[1].split("'")[0]
+        read_result = self.swarm.tool_catalog.bind("read_result", "Boss", "agent")
+        page = read_result(handle=handle, offset=9990)
+        self.assertIn("characters 9990-10000 of 10000.", page)
+
+    @patch.multiple(settings, delegation_result_max_chars=0)
+    def test_budget_disabled(self):
+        result = self.swarm.delegate_task("Boss", "Writer", "Write a lot")
+        self.assertEqual(result, "Response from Writer: " + "word " * 2000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import threading
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from opencore.config import settings
+from opencore.core.events import EventBus, format_sse, EVENT_ACTIVITY, EVENT_GRAPH
+from opencore.core.swarm import Swarm
+from opencore.interface import api
+from opencore.interface.api import app, event_stream
+
+
+class FakeRequest:
+    """Stand-in for a Starlette request that disconnects after `polls` checks."""
+    def __init__(self, polls):
+        self.polls = polls
+
+    async def is_disconnected(self):
+        self.polls -= 1
+        return self.polls < 0
+
+
+def parse_sse(chunks):
+    messages = []
+    for chunk in chunks:
+        if chunk.startswith(":"):
+            continue
+        fields = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+        messages.append((fields["event"], json.loads(fields["data"])))
+    return messages
+
+
+class TestEventBus(unittest.TestCase):
+    def test_fan_out_and_type_filter(self):
+        async def scenario():
+            bus = EventBus(buffer_size=10)
+            everything = bus.subscribe()
+            graph_only = bus.subscribe(types=[EVENT_GRAPH])
+            bus.publish(EVENT_ACTIVITY, {"n": 1})
+            bus.publish(EVENT_GRAPH, {"n": 2})
+            return await everything.get(1), await graph_only.get(0.01)
+
+        (events, dropped), (graph_events, _) = asyncio.run(scenario())
+        self.assertEqual([e["data"]["n"] for e in events], [1, 2])
+        self.assertEqual(dropped, 0)
+        self.assertEqual([e["type"] for e in graph_events], [EVENT_GRAPH])
+
+    def test_slow_subscriber_drops_oldest(self):
+        async def scenario():
+            bus = EventBus(buffer_size=3)
+            subscription = bus.subscribe()
+            for i in range(10):
+                bus.publish(EVENT_ACTIVITY, {"n": i})
+            events, dropped = await subscription.get(1)
+            return bus, subscription, events, dropped
+
+        bus, subscription, events, dropped = asyncio.run(scenario())
+        self.assertEqual([e["data"]["n"] for e in events], [7, 8, 9])
+        self.assertEqual(dropped, 7)
+        self.assertEqual(subscription.dropped, 7)
+        self.assertEqual(bus.stats(), {"subscribers": 1, "published": 10, "dropped": 7})
+
+    def test_publish_from_other_thread_wakes_subscriber(self):
+        async def scenario():
+            bus = EventBus()
+            subscription = bus.subscribe()
+            threading.Timer(0.05, bus.publish, args=(EVENT_ACTIVITY, {"n": 1})).start()
+            return await subscription.get(5)
+
+        events, _ = asyncio.run(scenario())
+        self.assertEqual(len(events), 1)
+
+    def test_subscriber_limit(self):
+        async def scenario():
+            bus = EventBus(max_subscribers=1)
+            first = bus.subscribe()
+            with self.assertRaises(Exception):
+                bus.subscribe()
+            bus.unsubscribe(first)
+            bus.subscribe()
+
+        asyncio.run(scenario())
+
+    def test_format_sse(self):
+        self.assertEqual(
+            format_sse({"id": 3, "type": "graph", "data": {"a": 1}}),
+            'id: 3\nevent: graph\ndata: {"a": 1}\n\n'
+        )
+
+
+class TestSwarmEvents(unittest.TestCase):
+    def test_swarm_publishes_activity_and_graph_changes(self):
+        async def scenario():
+            swarm = Swarm("Boss")
+            subscription = swarm.events.subscribe()
+            swarm.create_agent("Coder", "Developer", "Write code.")
+            swarm.toggle_agent("Coder")
+            events, _ = await subscription.get(1)
+            return events
+
+        events = asyncio.run(scenario())
+        graph_types = [e["data"]["type"] for e in events if e["type"] == EVENT_GRAPH]
+        self.assertEqual(graph_types, ["node_added", "node_updated"])
+        activity = [e["data"] for e in events if e["type"] == EVENT_ACTIVITY]
+        self.assertEqual(activity[0]["subtype"], "create")
+
+    @patch("opencore.core.agent.Agent.think", return_value="done")
+    def test_event_stream_delivers_workflow_steps(self, mock_think):
+        async def scenario():
+            swarm = Swarm("Boss")
+            swarm.create_agent("Coder", "Developer", "Write code.")
+            subscription = swarm.events.subscribe(types=[EVENT_ACTIVITY])
+            swarm.run_workflow({"name": "ship", "steps": [{"id": "build", "agent": "Coder", "task": "Build it"}]})
+            return [chunk async for chunk in event_stream(FakeRequest(polls=1), swarm.events, subscription)]
+
+        messages = parse_sse(asyncio.run(scenario()))
+        workflow = [data for event, data in messages if event == EVENT_ACTIVITY and data["type"] == "workflow"]
+        self.assertEqual([data["subtype"] for data in workflow], ["step_start", "step_done"])
+        self.assertEqual(workflow[0]["summary"], "ship/build")
+
+    def test_event_stream_reports_drops_and_unsubscribes(self):
+        async def scenario():
+            bus = EventBus(buffer_size=2)
+            subscription = bus.subscribe()
+            for i in range(5):
+                bus.publish(EVENT_ACTIVITY, {"n": i})
+            chunks = [chunk async for chunk in event_stream(FakeRequest(polls=1), bus, subscription)]
+            return bus, chunks
+
+        bus, chunks = asyncio.run(scenario())
+        messages = parse_sse(chunks)
+        self.assertEqual(messages[0], ("dropped", {"dropped": 3, "total_dropped": 3}))
+        self.assertEqual([data["n"] for _, data in messages[1:]], [3, 4])
+        self.assertEqual(bus.stats()["subscribers"], 0)
+
+
+class TestEventsApi(unittest.TestCase):
+    def test_subscriber_limit_returns_503(self):
+        with patch.object(settings, "event_max_subscribers", 0):
+            response = TestClient(app).get("/events")
+        self.assertEqual(response.status_code, 503)
+
+    def test_heartbeat_published(self):
+        async def scenario():
+            subscription = api.swarm.events.subscribe(types=["heartbeat"])
+            try:
+                with patch.object(api.swarm, "chat", return_value="Acknowledged."), \
+                        patch.object(api.heartbeat_manager, "log_heartbeat"):
+                    await api.run_proactive_heartbeat()
+                events, _ = await subscription.get(1)
+            finally:
+                api.swarm.events.unsubscribe(subscription)
+            return events
+
+        events = asyncio.run(scenario())
+        self.assertEqual([e["data"]["status"] for e in events], ["started", "completed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
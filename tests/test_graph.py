@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from opencore.core.graph import NODE_ADDED, NODE_REMOVED, NODE_UPDATED, EDGE_ADDED
+from opencore.core.swarm import Swarm
+from opencore.interface.api import app
+
+
+class TestSwarmGraph(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm()
+
+    def test_snapshot_cached_until_change(self):
+        first = self.swarm.get_graph_data()
+        self.assertIs(self.swarm.get_graph_data(), first)
+
+        self.swarm.create_agent("Coder", "Coder", "Write code.")
+        second = self.swarm.get_graph_data()
+        self.assertIsNot(second, first)
+        self.assertGreater(second["version"], first["version"])
+        self.assertEqual([n["id"] for n in second["nodes"]], ["Manager", "Coder"])
+
+    def test_changes_since_version(self):
+        since = self.swarm.graph.version
+        self.swarm.create_agent("Coder", "Coder", "Write code.", created_by="Manager")
+        self.swarm.toggle_agent("Coder")
+        self.swarm._record_interaction("Manager", "Coder", "hello")
+        self.swarm.remove_agent("Coder")
+
+        delta = self.swarm.get_graph_changes(since)
+        self.assertFalse(delta["reset"])
+        self.assertEqual(
+            [c["type"] for c in delta["changes"]],
+            [NODE_ADDED, NODE_UPDATED, EDGE_ADDED, NODE_REMOVED]
+        )
+        self.assertEqual(delta["changes"][0]["node"]["parent"], "Manager")
+        self.assertEqual(delta["changes"][1]["fields"], {"status": "inactive"})
+        self.assertEqual(delta["changes"][2]["edge"]["label"], "hello")
+        self.assertEqual(delta["version"], self.swarm.graph.version)
+        self.assertEqual(self.swarm.get_graph_changes(delta["version"])["changes"], [])
+
+    def test_last_thought_updates_are_tracked(self):
+        version = self.swarm.graph.version
+        self.swarm.agents["Manager"].last_thought = "Planning..."
+        self.swarm.agents["Manager"].last_thought = "Planning..."  # unchanged, not journaled
+
+        changes = self.swarm.get_graph_changes(version)["changes"]
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0]["fields"], {"last_thought": "Planning..."})
+        self.assertEqual(self.swarm.get_graph_data()["nodes"][0]["last_thought"], "Planning...")
+
+    def test_reset_when_journal_truncated_or_unknown_version(self):
+        with patch("opencore.core.graph.settings.graph_journal_size", 2):
+            swarm = Swarm()
+        for i in range(5):
+            swarm._record_interaction("Manager", "Manager", f"note {i}")
+
+        self.assertTrue(swarm.get_graph_changes(0)["reset"])
+        self.assertTrue(swarm.get_graph_changes(swarm.graph.version + 10)["reset"])
+        self.assertEqual(len(swarm.get_graph_changes(swarm.graph.version - 2)["changes"]), 2)
+
+
+class TestGraphEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm()
+        self.patcher = patch("opencore.interface.api.swarm", self.swarm)
+        self.patcher.start()
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_graph_etag_and_not_modified(self):
+        response = self.client.get("/graph")
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        self.assertEqual(response.json()["version"], self.swarm.graph.version)
+
+        response = self.client.get("/graph", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.swarm.create_agent("Coder", "Coder", "Write code.")
+        response = self.client.get("/graph", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_agents_honours_if_none_match(self):
+        etag = self.client.get("/agents").headers["ETag"]
+        response = self.client.get("/agents", headers={"If-None-Match": f"W/{etag}"})
+        self.assertEqual(response.status_code, 304)
+
+    def test_graph_changes_endpoint(self):
+        version = self.client.get("/graph").json()["version"]
+        self.swarm.create_agent("Coder", "Coder", "Write code.")
+
+        data = self.client.get("/graph/changes", params={"since": version}).json()
+        self.assertFalse(data["reset"])
+        self.assertEqual(data["changes"][0]["type"], NODE_ADDED)
+        self.assertEqual(self.client.get("/graph/changes").status_code, 422)
+
+
+if __name__ == '__main__':
+    unittest.main()
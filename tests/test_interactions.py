@@ -0,0 +1,102 @@
+import time
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from opencore.core.interactions import InteractionLog
+from opencore.core.swarm import Swarm
+from opencore.interface.api import app
+
+
+class TestInteractionLog(unittest.TestCase):
+    def test_bounded_with_monotonic_sequence(self):
+        log = InteractionLog(maxlen=3)
+        for i in range(5):
+            log.append("A", "B", f"msg {i}")
+
+        self.assertEqual(len(log), 3)
+        self.assertEqual([r.seq for r in log], [3, 4, 5])
+        self.assertEqual(log.last_seq, 5)
+
+    def test_query_since_seq(self):
+        log = InteractionLog(maxlen=10)
+        for i in range(5):
+            log.append("A", "B", f"msg {i}")
+
+        self.assertEqual([r.seq for r in log.query(since_seq=3)], [4, 5])
+        self.assertEqual(log.query(since_seq=5), [])
+        # A cursor older than the buffer returns everything still retained
+        self.assertEqual(len(log.query(since_seq=-10)), 5)
+
+    def test_query_by_agent_and_limit(self):
+        log = InteractionLog(maxlen=10)
+        log.append("Manager", "Coder", "a")
+        log.append("Coder", "Manager", "b")
+        log.append("Manager", "Writer", "c")
+
+        self.assertEqual([r.summary for r in log.query(agent="Coder")], ["a", "b"])
+        self.assertEqual([r.summary for r in log.query(agent="Manager", limit=1)], ["c"])
+        self.assertEqual(log.query(limit=0), [])
+
+    def test_query_by_time_range(self):
+        log = InteractionLog(maxlen=10)
+        log.append("A", "B", "old", created=100.0)
+        log.append("A", "B", "mid", created=200.0)
+        log.append("A", "B", "new", created=300.0)
+
+        self.assertEqual([r.summary for r in log.query(start=150, end=300)], ["mid"])
+        self.assertEqual([r.summary for r in log.query(start=200)], ["mid", "new"])
+
+    def test_restore_round_trip(self):
+        log = InteractionLog(maxlen=10)
+        log.append("A", "B", "hello", created=1000.0)
+
+        restored = InteractionLog(maxlen=10)
+        restored.restore(log.to_list())
+        record = restored.snapshot()[0]
+        self.assertEqual((record.source, record.target, record.summary), ("A", "B", "hello"))
+        self.assertAlmostEqual(record.created, 1000.0, places=3)
+
+
+class TestSwarmInteractions(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm()
+
+    def test_graph_shows_only_latest_edges(self):
+        with patch("opencore.core.swarm.settings.graph_max_edges", 2):
+            for i in range(5):
+                self.swarm._record_interaction("Manager", "Coder", f"task {i}")
+            edges = self.swarm.get_graph_data()["edges"]
+
+        self.assertEqual([e["label"] for e in edges], ["task 3", "task 4"])
+        self.assertEqual(len(self.swarm.interactions), 5)
+
+    def test_state_round_trip_keeps_interactions(self):
+        self.swarm._record_interaction("Manager", "Coder", "do it")
+        restored = Swarm.from_state(self.swarm.export_state())
+        self.assertEqual(restored.get_interactions()["interactions"][0]["summary"], "do it")
+
+
+class TestInteractionsEndpoint(unittest.TestCase):
+    def test_filters_and_cursor(self):
+        swarm = Swarm()
+        swarm._record_interaction("Manager", "Coder", "first")
+        swarm._record_interaction("Coder", "Manager", "second")
+        swarm._record_interaction("Manager", "Writer", "third")
+
+        with patch("opencore.interface.api.swarm", swarm):
+            client = TestClient(app)
+            response = client.get("/interactions", params={"agent": "Coder"})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertEqual([r["summary"] for r in data["interactions"]], ["first", "second"])
+            self.assertEqual(data["last_seq"], 3)
+
+            response = client.get("/interactions", params={"since": 2})
+            self.assertEqual([r["summary"] for r in response.json()["interactions"]], ["third"])
+
+            response = client.get("/interactions", params={"start": time.time() + 60})
+            self.assertEqual(response.json()["interactions"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from opencore.config import settings
+from opencore.core.agent import Agent
+from opencore.llm.base import LLMResponse, ToolCall, ToolCallFunction
+from opencore.llm.factory import get_llm_provider
+from opencore.llm.recording import (
+    Cassette, CassetteProvider, CassetteMissError, request_key,
+    MODE_RECORD, MODE_REPLAY, MODE_AUTO, LATENCY_ZERO
+)
+
+MESSAGES = [{"role": "system", "content": "You are A."}, {"role": "user", "content": "hi"}]
+TOOLS = [{"type": "function", "function": {"name": "read_file", "description": "Models: gpt-4o", "parameters": {}}}]
+
+
+class FakeProvider:
+    def __init__(self, response, delay=0.0):
+        self.response = response
+        self.delay = delay
+        self.calls = 0
+
+    def chat(self, messages, tools=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.response
+
+    def close(self):
+        pass
+
+
+def no_provider():
+    raise AssertionError("replay must not build a live provider")
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "run.jsonl")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_record_then_replay(self):
+        response = LLMResponse(
+            content=None,
+            tool_calls=[ToolCall(id="call_1", function=ToolCallFunction("read_file", '{"path": "a.txt"}'))]
+        )
+        live = FakeProvider(response)
+        recorder = CassetteProvider("gpt-4o", Cassette(self.path), lambda: live, mode=MODE_RECORD)
+        self.assertEqual(recorder.chat(MESSAGES, TOOLS), response)
+
+        with open(self.path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]["key"], request_key("gpt-4o", MESSAGES, TOOLS))
+
+        replayer = CassetteProvider("gpt-4o", Cassette(self.path), no_provider, mode=MODE_REPLAY, latency=LATENCY_ZERO)
+        self.assertEqual(replayer.chat(MESSAGES, TOOLS), response)
+        self.assertEqual(live.calls, 1)
+
+    def test_key_ignores_tool_descriptions(self):
+        other_tools = [{"type": "function", "function": {"name": "read_file", "description": "No models"}}]
+        self.assertEqual(request_key("m", MESSAGES, TOOLS), request_key("m", MESSAGES, other_tools))
+        self.assertNotEqual(request_key("m", MESSAGES, TOOLS), request_key("m", MESSAGES, None))
+        self.assertNotEqual(request_key("m", MESSAGES), request_key("other", MESSAGES))
+
+    def test_replay_miss_raises(self):
+        replayer = CassetteProvider("gpt-4o", Cassette(self.path), no_provider, mode=MODE_REPLAY)
+        with self.assertRaises(CassetteMissError):
+            replayer.chat(MESSAGES)
+
+    def test_auto_records_misses_and_serves_repeats_in_order(self):
+        cassette = Cassette(self.path)
+        first = FakeProvider(LLMResponse(content="one"))
+        CassetteProvider("m", cassette, lambda: first, mode=MODE_RECORD).chat(MESSAGES)
+        CassetteProvider("m", cassette, lambda: FakeProvider(LLMResponse(content="two")), mode=MODE_RECORD).chat(MESSAGES)
+
+        reloaded = Cassette(self.path)
+        replay = CassetteProvider("m", reloaded, no_provider, mode=MODE_AUTO, latency=LATENCY_ZERO)
+        self.assertEqual([replay.chat(MESSAGES).content for _ in range(3)], ["one", "two", "two"])
+
+        live = FakeProvider(LLMResponse(content="new"))
+        auto = CassetteProvider("m", reloaded, lambda: live, mode=MODE_AUTO)
+        self.assertEqual(auto.chat(MESSAGES + [{"role": "user", "content": "more"}]).content, "new")
+        self.assertEqual(reloaded.stats(), {"hits": 3, "misses": 1, "recorded": 1})
+        self.assertEqual(len(Cassette(self.path)), 3)
+
+    def test_original_latency_and_close(self):
+        cassette = Cassette(self.path)
+        CassetteProvider("m", cassette, lambda: FakeProvider(LLMResponse(content="slow"), delay=0.2), mode=MODE_RECORD).chat(MESSAGES)
+
+        replay = CassetteProvider("m", Cassette(self.path), no_provider, mode=MODE_REPLAY)
+        started = time.monotonic()
+        replay.chat(MESSAGES)
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+
+        fast = CassetteProvider("m", Cassette(self.path), no_provider, mode=MODE_REPLAY, latency=LATENCY_ZERO)
+        started = time.monotonic()
+        fast.chat(MESSAGES)
+        self.assertLess(time.monotonic() - started, 0.1)
+
+        closing = CassetteProvider("m", Cassette(self.path), no_provider, mode=MODE_REPLAY)
+        threading.Timer(0.05, closing.close).start()
+        with self.assertRaises(ConnectionError):
+            closing.chat(MESSAGES)
+
+    def test_malformed_lines_skipped(self):
+        with open(self.path, "w") as f:
+            f.write("not json\n\n")
+        self.assertEqual(len(Cassette(self.path)), 0)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            CassetteProvider("m", Cassette(self.path), no_provider, mode="rewind")
+
+
+class TestFactoryCassette(unittest.TestCase):
+    def test_agent_turn_replays_without_credentials(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "agent.jsonl")
+            live = MagicMock()
+            live.chat.return_value = LLMResponse(content="Recorded answer")
+
+            with patch.object(settings, "llm_cassette", path), \
+                    patch.object(settings, "llm_cassette_mode", MODE_RECORD), \
+                    patch("opencore.llm.factory._create_provider", return_value=live):
+                self.assertEqual(Agent("A", "Tester", "Test.").chat("hello"), "Recorded answer")
+
+            # A fresh cassette instance, as a separate CI process would load it
+            with patch.object(settings, "llm_cassette", path), \
+                    patch.object(settings, "llm_cassette_mode", MODE_REPLAY), \
+                    patch.object(settings, "llm_cassette_latency", LATENCY_ZERO), \
+                    patch("opencore.llm.recording._cassettes", {}), \
+                    patch("opencore.llm.factory._create_provider", side_effect=AssertionError("live call")):
+                self.assertEqual(Agent("A", "Tester", "Test.").chat("hello"), "Recorded answer")
+            self.assertEqual(live.chat.call_count, 1)
+
+    def test_plain_provider_without_cassette(self):
+        live = MagicMock()
+        with patch.object(settings, "llm_cassette", ""), \
+                patch("opencore.llm.factory._create_provider", return_value=live):
+            self.assertIs(get_llm_provider("gpt-4o"), live)
+
+
+if __name__ == "__main__":
+    unittest.main()
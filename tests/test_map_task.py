@@ -0,0 +1,126 @@
+import threading
+import time
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
+from opencore.core.swarm import Swarm
+from opencore.core.context import activity_log_ctx
+from opencore.core.exceptions import DelegationLimitError
+from opencore.llm.base import LLMResponse
+
+
+class FakeProvider:
+    """Answers with the upper-cased input and tracks peak concurrency."""
+    def __init__(self, fail_once_on=None):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.fail_once_on = fail_once_on
+        self.failed = False
+
+    def chat(self, messages, tools=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.05)
+            prompt = messages[-1]["content"]
+            if prompt.startswith("Combine"):
+                return LLMResponse(content="REDUCED:" + prompt.split("Results:\n", 1)[1].replace("\n", " "))
+            item = prompt.split("Input:\n", 1)[1]
+            with self.lock:
+                if item == self.fail_once_on and not self.failed:
+                    self.failed = True
+                    raise RuntimeError("transient failure")
+            return LLMResponse(content=item.upper())
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class TestMapTask(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm("Manager")
+        self.swarm.create_agent("Summarizer", "Writer", "Summarize files.")
+
+    @patch("opencore.core.agent.get_llm_provider")
+    def test_results_in_order_with_bounded_concurrency(self, mock_get_provider):
+        provider = FakeProvider()
+        mock_get_provider.return_value = provider
+        inputs = [f"file{i}.txt" for i in range(8)]
+
+        outcome = self.swarm.map_task("Manager", "Summarizer", "Summarize", inputs, max_concurrency=3)
+
+        self.assertEqual(outcome["results"], [item.upper() for item in inputs])
+        self.assertLessEqual(provider.peak, 3)
+        self.assertGreater(provider.peak, 1)
+        # Clones are ephemeral and never registered
+        self.assertEqual(sorted(self.swarm.agents), ["Manager", "Summarizer"])
+
+    @patch("opencore.core.agent.get_llm_provider")
+    def test_retries_failed_items(self, mock_get_provider):
+        mock_get_provider.return_value = FakeProvider(fail_once_on="b")
+
+        outcome = self.swarm.map_task("Manager", "Summarizer", "Summarize", ["a", "b"], retries=1)
+
+        self.assertEqual(outcome["results"], ["A", "B"])
+
+    @patch("opencore.core.agent.get_llm_provider")
+    def test_reduce_step_and_streaming(self, mock_get_provider):
+        mock_get_provider.return_value = FakeProvider()
+
+        token = activity_log_ctx.set([])
+        try:
+            output = self.swarm.agents["Manager"].tools["map_task"](
+                worker="Summarizer", task="Summarize", inputs=["a", "b"], reduce_task="Combine these"
+            )
+            activity = activity_log_ctx.get()
+        finally:
+            activity_log_ctx.reset(token)
+
+        self.assertIn("Reduced result from 2 inputs", output)
+        self.assertIn("REDUCED:[1] A  [2] B", output)
+        self.assertEqual(len([a for a in activity if a.get("subtype") == "item_done"]), 2)
+
+    @patch("opencore.core.agent.get_llm_provider")
+    def test_retries_cover_budget_rejections(self, mock_get_provider):
+        mock_get_provider.return_value = FakeProvider()
+        slot = self.swarm.delegations.slot
+        rejected = []
+
+        @contextmanager
+        def slot_busy_once():
+            if not rejected:
+                rejected.append(True)
+                raise DelegationLimitError("No delegation slot freed up.")
+            with slot():
+                yield
+
+        with patch.object(self.swarm.delegations, "slot", slot_busy_once):
+            outcome = self.swarm.map_task("Manager", "Summarizer", "Summarize", ["a"], retries=1)
+
+        self.assertEqual(rejected, [True])
+        self.assertEqual(outcome["results"], ["A"])
+
+    def test_unknown_worker(self):
+        output = self.swarm.agents["Manager"].tools["map_task"](worker="Ghost", task="t", inputs=["a"])
+        self.assertIn("Error: Worker template 'Ghost' not found", output)
+
+    def test_clone_does_not_get_swarm_tools(self):
+        template = self.swarm.agents["Summarizer"]
+        clone = self.swarm._clone_worker(template, 1, "Manager")
+        self.assertIn("read_file", clone.tools)
+        self.assertNotIn("delegate_task", clone.tools)
+        self.assertEqual(clone.model, template.model)
+
+    def test_clone_keeps_template_tool_restriction(self):
+        self.swarm.register_template("reader", "Reader", "Read files.", tools=["read_file"], warm=0)
+        self.swarm.create_agent("R1", template="reader")
+
+        clone = self.swarm._clone_worker(self.swarm.agents["R1"], 1, "Manager")
+
+        self.assertEqual(set(clone._tool_definitions), {"read_file"})
+
+
+if __name__ == "__main__":
+    unittest.main()
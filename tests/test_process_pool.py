@@ -0,0 +1,115 @@
+import os
+import time
+import unittest
+from opencore.core.agent import Agent
+from opencore.core.process_pool import ProcessBroker, RemoteAgent, PLACEMENT_HASH, PLACEMENT_LEAST_LOADED
+from opencore.core.swarm import Swarm
+from opencore.tools.base import register_base_tools
+
+
+class ScriptedAgent(Agent):
+    """
+    Answers without an LLM. "delegate to <agent>: <task>" is forwarded with the
+    delegate_task tool; anything else is echoed with the worker's PID.
+    """
+    def think(self, max_turns=None):
+        text = self.messages[-1]["content"]
+        if text.startswith("Request from "):
+            text = text.split(": ", 1)[1]
+        if text.startswith("delegate to "):
+            target, task = text[len("delegate to "):].split(": ", 1)
+            reply = f"{self.name} relayed: {self.tools['delegate_task'](target, task)}"
+        else:
+            reply = f"{self.name}@{os.getpid()}: {text}"
+        self.last_thought = reply
+        return reply
+
+
+def make_scripted_agent(state):
+    agent = ScriptedAgent(state["name"], state["role"], state["system_prompt"], created_by=state.get("created_by"))
+    register_base_tools(agent)
+    if state.get("messages"):
+        agent.load_state(state)
+    return agent
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestProcessBroker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.broker = ProcessBroker(processes=2, agent_factory=make_scripted_agent)
+        cls.broker.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.broker.shutdown()
+
+    def setUp(self):
+        self.swarm = Swarm(broker=self.broker)
+        self.swarm.create_agent("W1", "Worker", "Work.")
+        self.swarm.create_agent("W2", "Worker", "Work.")
+
+    def test_agents_run_in_worker_processes(self):
+        self.assertIsInstance(self.swarm.agents["W1"], RemoteAgent)
+        self.assertIsInstance(self.swarm.agents["Manager"], Agent)
+
+        reply = self.swarm.agents["W1"].chat("hello")
+        self.assertTrue(reply.startswith("W1@"))
+        self.assertNotEqual(int(reply.split("@")[1].split(":")[0]), os.getpid())
+
+    def test_delegation_is_relayed_through_parent(self):
+        reply = self.swarm.agents["W1"].chat("delegate to W2: ping")
+        self.assertIn("W1 relayed: Response from W2: W2@", reply)
+        self.assertEqual(len(self.swarm.interactions), 2)
+
+    def test_delegation_cycle_rejected_across_processes(self):
+        # The chain travels with the relayed tool call, so W1 -> W2 -> W1 is caught in the parent
+        reply = self.swarm.agents["W1"].chat("delegate to W2: delegate to W1: ping")
+        self.assertIn("W2 relayed: Error: Delegation cycle detected (W1 -> W2 -> W1)", reply)
+
+    def test_status_mirrored_to_graph(self):
+        self.swarm.agents["W2"].chat("status check")
+        self.assertTrue(wait_for(
+            lambda: self.swarm.get_agent("W2").last_thought.endswith("status check")
+        ))
+        node = next(n for n in self.swarm.get_graph_data()["nodes"] if n["id"] == "W2")
+        self.assertTrue(node["last_thought"].endswith("status check"))
+
+    def test_state_round_trip(self):
+        self.swarm.agents["W1"].chat("remember this")
+        state = self.swarm.export_state()
+        restored = Swarm.from_state(state)
+        restored_messages = [m["content"] for m in restored.agents["W1"].messages]
+        self.assertIn("remember this", restored_messages)
+
+    def test_remove_releases_worker_agent(self):
+        before = sum(w["agents"] for w in self.broker.stats())
+        self.swarm.remove_agent("W2")
+        self.assertEqual(sum(w["agents"] for w in self.broker.stats()), before - 1)
+
+
+class TestPlacement(unittest.TestCase):
+    def test_hash_placement_is_stable(self):
+        broker = ProcessBroker(processes=4, placement=PLACEMENT_HASH)
+        self.assertEqual(broker.place("Researcher"), broker.place("Researcher"))
+
+    def test_least_loaded_balances(self):
+        broker = ProcessBroker(processes=3, placement=PLACEMENT_LEAST_LOADED)
+        placed = [broker.place(f"A{i}") for i in range(6)]
+        self.assertEqual(sorted(placed), [0, 0, 1, 1, 2, 2])
+
+    def test_unknown_placement_rejected(self):
+        with self.assertRaises(ValueError):
+            ProcessBroker(processes=2, placement="random")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import threading
+import unittest
+from opencore.core.delegation import DelegationBudget
+from opencore.core.interactions import InteractionLog, Interaction
+from opencore.core.swarm import Swarm
+
+THREADS = 64
+
+
+class InstantAgent:
+    def __init__(self, name):
+        self.name = name
+
+    def chat(self, message, lane=None):
+        return "ok"
+
+
+def run_threads(target, count=THREADS):
+    barrier = threading.Barrier(count)
+
+    def body(index):
+        barrier.wait()
+        target(index)
+
+    threads = [threading.Thread(target=body, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(30)
+
+
+class TestLockFreeInteractionLog(unittest.TestCase):
+    def test_concurrent_appends_get_unique_contiguous_sequences(self):
+        log = InteractionLog(maxlen=10000)
+        run_threads(lambda i: [log.append(f"A{i}", "B", str(n)) for n in range(100)])
+
+        records = log.snapshot()
+        self.assertEqual(len(records), THREADS * 100)
+        self.assertEqual([r.seq for r in records], list(range(1, THREADS * 100 + 1)))
+
+    def test_wraparound_keeps_newest_window(self):
+        log = InteractionLog(maxlen=50)
+        run_threads(lambda i: [log.append("A", "B", str(n)) for n in range(20)])
+
+        self.assertEqual([r.seq for r in log], list(range(THREADS * 20 - 49, THREADS * 20 + 1)))
+
+    def test_unstored_record_hides_newer_ones(self):
+        log = InteractionLog(maxlen=4)
+        for n in range(4):
+            log.append("A", "B", str(n))
+        # Seq 5 claimed but not stored yet, seq 6 already stored over slot 2
+        log._slots[1] = Interaction(6, "A", "B", "late", 0)
+
+        self.assertEqual([r.seq for r in log], [3, 4])
+        self.assertEqual(log.last_seq, 4)
+
+
+class TestRegistryContention(unittest.TestCase):
+    def test_concurrent_delegation_with_registry_churn(self):
+        swarm = Swarm("Boss")
+        for i in range(8):
+            swarm.agents[f"W{i}"] = InstantAgent(f"W{i}")
+        swarm.delegations = DelegationBudget(limit=THREADS)
+        failures = []
+        stop = threading.Event()
+
+        def churn():
+            n = 0
+            while not stop.is_set():
+                swarm.create_agent(f"Temp{n % 3}", "Temp", "Temporary.")
+                swarm.remove_agent(f"Temp{n % 3}")
+                n += 1
+
+        churner = threading.Thread(target=churn)
+        churner.start()
+        try:
+            def delegate(index):
+                for _ in range(20):
+                    result = swarm.delegate_task("Boss", f"W{index % 8}", "ping")
+                    if result != f"Response from W{index % 8}: ok":
+                        failures.append(result)
+            run_threads(delegate)
+        finally:
+            stop.set()
+            churner.join(10)
+
+        self.assertEqual(failures, [])
+        self.assertEqual(swarm.interactions.last_seq, THREADS * 20 * 2)
+        self.assertEqual(sorted(swarm.agents), ["Boss"] + [f"W{i}" for i in range(8)])
+
+    def test_concurrent_creates_register_each_name_once(self):
+        swarm = Swarm("Boss")
+        results = []
+        run_threads(lambda i: results.append(swarm.create_agent("Twin", "Worker", "Work.")), count=16)
+
+        self.assertEqual(len([r for r in results if "created successfully" in r]), 1)
+        self.assertEqual(len([n for n in swarm.graph.snapshot()["nodes"] if n["id"] == "Twin"]), 1)
+
+    def test_readers_see_published_snapshots(self):
+        swarm = Swarm("Boss")
+        before = swarm.agents
+        swarm.create_agent("Late", "Worker", "Work.")
+
+        # The old dict is never mutated, so an in-progress reader keeps a consistent view
+        self.assertNotIn("Late", before)
+        self.assertIn("Late", swarm.agents)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from opencore.core.attachments import attachment_store
+from opencore.core.sessions import SessionManager, InvalidSessionError
+from opencore.core.swarm import Swarm
+from opencore.interface import api
+from opencore.interface.api import app
+
+
+class TestSessionManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.default = Swarm()
+        self.manager = SessionManager(self.default, max_live=2, ttl=60, spill_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_no_session_uses_default_swarm(self):
+        with self.manager.session(None) as swarm:
+            self.assertIs(swarm, self.default)
+
+    def test_sessions_are_isolated(self):
+        with self.manager.session("alice") as alice:
+            alice.agents["Manager"].add_message("user", "alice secret")
+        with self.manager.session("bob") as bob:
+            self.assertIsNot(bob, alice)
+            self.assertNotIn("alice secret", str(bob.agents["Manager"].messages))
+
+    def test_lru_spill_and_reload(self):
+        with self.manager.session("alice") as alice:
+            alice.create_agent("Helper", "Coder", "Write code.")
+            alice.agents["Manager"].add_message("user", "remember me")
+            alice.teams["Core"] = ["Helper"]
+
+        with self.manager.session("bob"):
+            pass
+        with self.manager.session("carol"):
+            pass
+
+        # alice was least recently used and got spilled
+        self.assertFalse(self.manager.is_live("alice"))
+        self.assertEqual(self.manager.live_count, 2)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "alice.json")))
+
+        with self.manager.session("alice") as reloaded:
+            self.assertIsNot(reloaded, alice)
+            self.assertIn("Helper", reloaded.agents)
+            self.assertEqual(reloaded.agents["Manager"].messages[-1]["content"], "remember me")
+            self.assertEqual(reloaded.teams, {"Core": ["Helper"]})
+
+    def test_pinned_sessions_are_not_spilled(self):
+        with self.manager.session("alice"):
+            with self.manager.session("bob"):
+                with self.manager.session("carol"):
+                    self.assertEqual(self.manager.live_count, 3)
+
+    def test_ttl_eviction(self):
+        manager = SessionManager(self.default, max_live=10, ttl=0, spill_dir=self.tmp.name)
+        with manager.session("alice"):
+            pass
+        self.assertEqual(manager.evict_idle(), 1)
+        self.assertFalse(manager.is_live("alice"))
+
+    def test_attachments_survive_spill(self):
+        image = {"name": "cat.png", "type": "image/png", "content": "data:image/png;base64,SPILLED"}
+        with self.manager.session("alice") as alice:
+            manager_agent = alice.agents["Manager"]
+            manager_agent.think = lambda: "ok"
+            alice.chat("look", attachments=[image])
+            ref = manager_agent.attachment_refs()[0]
+
+        self.manager.ttl = 0
+        self.assertEqual(self.manager.evict_idle(), 1)
+        attachment_store.clear()
+
+        with self.manager.session("alice") as reloaded:
+            self.assertEqual(reloaded.agents["Manager"].attachment_refs(), [ref])
+            self.assertEqual(attachment_store.get(ref), image["content"])
+
+    def test_slow_load_does_not_block_other_sessions(self):
+        release = threading.Event()
+        real_load = self.manager._load
+
+        def slow_load(session_id):
+            if session_id == "alice":
+                release.wait(5)
+            return real_load(session_id)
+
+        results = []
+
+        def open_alice():
+            with self.manager.session("alice") as swarm:
+                results.append(swarm)
+
+        with patch.object(self.manager, "_load", side_effect=slow_load):
+            first = threading.Thread(target=open_alice)
+            second = threading.Thread(target=open_alice)
+            first.start()
+            second.start()
+            with self.manager.session("bob"):
+                pass
+            self.assertEqual(results, [])
+            release.set()
+            first.join(5)
+            second.join(5)
+
+        self.assertEqual(len(results), 2)
+        self.assertIs(results[0], results[1])
+
+    def test_request_waits_for_spill_in_progress(self):
+        with self.manager.session("alice") as alice:
+            alice.agents["Manager"].add_message("user", "remember me")
+
+        writing = threading.Event()
+        release = threading.Event()
+        real_spill = self.manager._spill
+
+        def slow_spill(session_id, session):
+            writing.set()
+            release.wait(5)
+            real_spill(session_id, session)
+
+        self.manager.ttl = 0
+        with patch.object(self.manager, "_spill", side_effect=slow_spill):
+            evictor = threading.Thread(target=self.manager.evict_idle)
+            evictor.start()
+            writing.wait(5)
+            threading.Timer(0.1, release.set).start()
+            with self.manager.session("alice") as reloaded:
+                self.assertEqual(reloaded.agents["Manager"].messages[-1]["content"], "remember me")
+            evictor.join(5)
+
+    def test_invalid_session_id(self):
+        with self.assertRaises(InvalidSessionError):
+            with self.manager.session("../etc/passwd"):
+                pass
+
+
+class TestSessionApi(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_dir = api.session_manager.spill_dir
+        api.session_manager.spill_dir = self.tmp.name
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        api.session_manager.spill_dir = self.original_dir
+        self.tmp.cleanup()
+
+    @patch("opencore.core.agent.Agent.think", return_value="ok")
+    def test_session_header_selects_swarm(self, mock_think):
+        self.client.post("/chat", json={"message": "only in session"}, headers={"X-Session-ID": "tab-1"})
+
+        with api.session_manager.session("tab-1") as tab_swarm:
+            self.assertIn("only in session", str(tab_swarm.agents["Manager"].messages))
+        self.assertNotIn("only in session", str(api.swarm.agents["Manager"].messages))
+
+    def test_session_cookie_selects_swarm(self):
+        self.client.cookies.set("opencore_session", "cookie-1")
+        try:
+            response = self.client.get("/agents")
+        finally:
+            self.client.cookies.clear()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(api.session_manager.is_live("cookie-1"))
+
+    def test_invalid_session_header(self):
+        response = self.client.get("/agents", headers={"X-Session-ID": "bad id!"})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
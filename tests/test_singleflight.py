@@ -0,0 +1,122 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from opencore.config import settings
+from opencore.core.cancellation import CancellationToken
+from opencore.core.context import cancel_token_ctx
+from opencore.core.exceptions import OperationCancelledError
+from opencore.core.singleflight import SingleFlight, normalize_task
+from opencore.core.swarm import Swarm
+
+
+class SlowWorker:
+    """Stand-in agent that counts its turns and blocks until released."""
+    def __init__(self):
+        self.turns = 0
+        self.release = threading.Event()
+
+    def chat(self, message, lane=None):
+        self.turns += 1
+        self.release.wait(5)
+        return "findings"
+
+
+def run_concurrently(count, fn):
+    results = [None] * count
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, fn(i))) for i in range(count)]
+    for t in threads:
+        t.start()
+    return threads, results
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_normalize_task(self):
+        self.assertEqual(normalize_task("  Find   the\nBug "), "find the bug")
+
+    def test_concurrent_calls_share_one_run(self):
+        flight = SingleFlight(window=0)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "answer"
+
+        threads, results = run_concurrently(5, lambda i: flight.do("k", work))
+        started.wait(5)
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(shared for _, shared in results), [False, True, True, True, True])
+        self.assertTrue(all(result == "answer" for result, _ in results))
+
+    def test_result_reused_within_window(self):
+        flight = SingleFlight(window=60)
+        self.assertEqual(flight.do("k", lambda: "first"), ("first", False))
+        self.assertEqual(flight.do("k", lambda: "second"), ("first", True))
+        self.assertEqual(flight.stats()["reused"], 1)
+
+    def test_unshareable_result_is_run_again(self):
+        flight = SingleFlight(window=60)
+        self.assertEqual(flight.do("k", lambda: "Error", shareable=lambda r: r != "Error"), ("Error", False))
+        self.assertEqual(flight.do("k", lambda: "ok"), ("ok", False))
+
+    def test_waiting_is_cancellable(self):
+        flight = SingleFlight(window=0)
+        release = threading.Event()
+        leader = threading.Thread(target=flight.do, args=("k", lambda: release.wait(5)))
+        leader.start()
+        time.sleep(0.05)
+
+        token = CancellationToken()
+        cancel_token_ctx.set(token)
+        try:
+            threading.Timer(0.05, token.cancel).start()
+            with self.assertRaises(OperationCancelledError):
+                flight.do("k", lambda: "never")
+        finally:
+            cancel_token_ctx.set(None)
+            release.set()
+            leader.join(5)
+
+
+class TestSwarmSingleflight(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm("Boss")
+        self.worker = SlowWorker()
+        self.swarm.agents["Researcher"] = self.worker
+
+    def delegate_burst(self, tasks):
+        threads, results = run_concurrently(
+            len(tasks), lambda i: self.swarm.delegate_task(f"Lead{i}", "Researcher", tasks[i])
+        )
+        time.sleep(0.1)
+        self.worker.release.set()
+        for t in threads:
+            t.join(5)
+        return results
+
+    @patch.multiple(settings, delegation_singleflight=True, delegation_reuse_window=0)
+    def test_identical_delegations_run_once(self):
+        results = self.delegate_burst(["Survey the API", "survey  the api", "Survey the API"])
+
+        self.assertEqual(self.worker.turns, 1)
+        self.assertEqual(results, ["Response from Researcher: findings"] * 3)
+        requests = [i for i in self.swarm.interactions.snapshot() if i.target == "Researcher"]
+        self.assertEqual(len(requests), 3)
+
+    @patch.multiple(settings, delegation_singleflight=False)
+    def test_disabled_by_default(self):
+        self.delegate_burst(["Survey the API", "Survey the API"])
+        self.assertEqual(self.worker.turns, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,368 @@
+import socketserver
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from opencore.core.agent import Agent
+from opencore.core.attachments import attachment_store
+from opencore.core.state_store import (
+    InMemoryStateStore, RedisStateStore, RespClient, SharedAgent, LeaseTimeoutError,
+    RELEASE_LEASE_SCRIPT, RENEW_LEASE_SCRIPT, create_state_store, hold_lease
+)
+from opencore.core.swarm import Swarm
+
+
+class _StandInHandler(socketserver.StreamRequestHandler):
+    """Serves the subset of Redis commands RedisStateStore uses."""
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2].decode("utf-8"))
+        return args
+
+    def _write(self, value):
+        if value is None:
+            self.wfile.write(b"$-1\r\n")
+        elif value is True:
+            self.wfile.write(b"+OK\r\n")
+        elif isinstance(value, int):
+            self.wfile.write(b":%d\r\n" % value)
+        elif isinstance(value, list):
+            self.wfile.write(b"*%d\r\n" % len(value))
+            for item in value:
+                self._write(item)
+        else:
+            data = value.encode("utf-8")
+            self.wfile.write(b"$%d\r\n%s\r\n" % (len(data), data))
+
+    def handle(self):
+        server = self.server
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            with server.lock:
+                reply = server.execute(args[0].upper(), args[1:])
+            self._write(reply)
+
+
+class StandInRedis(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.lock = threading.Lock()
+        self.data = {}
+        self.expiry = {}
+        self.auth_calls = []
+
+    def _get(self, key):
+        if key in self.expiry and self.expiry[key] <= time.monotonic():
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return self.data.get(key)
+
+    def execute(self, cmd, args):
+        if cmd == "AUTH":
+            self.auth_calls.append(args)
+            return True
+        if cmd in ("PING", "SELECT"):
+            return True
+        if cmd == "GET":
+            return self._get(args[0])
+        if cmd == "SET":
+            key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+            if "NX" in options and self._get(key) is not None:
+                return None
+            self.data[key] = value
+            self.expiry.pop(key, None)
+            if "PX" in options:
+                self.expiry[key] = time.monotonic() + int(args[2 + options.index("PX") + 1]) / 1000
+            return True
+        if cmd == "INCR":
+            self.data[args[0]] = str(int(self.data.get(args[0], 0)) + 1)
+            return int(self.data[args[0]])
+        if cmd == "DEL":
+            return sum(1 for key in args if self.data.pop(key, None) is not None)
+        if cmd == "HSET":
+            self.data.setdefault(args[0], {})[args[1]] = args[2]
+            return 1
+        if cmd == "HGETALL":
+            return [item for pair in self.data.get(args[0], {}).items() for item in pair]
+        if cmd == "HDEL":
+            return 1 if self.data.get(args[0], {}).pop(args[1], None) is not None else 0
+        if cmd == "RPUSH":
+            self.data.setdefault(args[0], []).extend(args[1:])
+            return len(self.data[args[0]])
+        if cmd == "LTRIM":
+            items = self.data.get(args[0], [])
+            start, stop = int(args[1]), int(args[2])
+            self.data[args[0]] = items[start:] if stop == -1 else items[start:stop + 1]
+            return True
+        if cmd == "LRANGE":
+            items = self.data.get(args[0], [])
+            start, stop = int(args[1]), int(args[2])
+            return items[start:] if stop == -1 else items[start:stop + 1]
+        if cmd == "EVAL":
+            script, key, owner = args[0], args[2], args[3]
+            if self._get(key) != owner:
+                return 0
+            if script == RELEASE_LEASE_SCRIPT:
+                self.data.pop(key, None)
+                return 1
+            if script == RENEW_LEASE_SCRIPT:
+                self.expiry[key] = time.monotonic() + int(args[4]) / 1000
+                return 1
+        return None
+
+
+class StateStoreContract:
+    """Behaviour every SwarmStateStore must provide."""
+
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.store = self.make_store()
+
+    def test_agents_and_histories(self):
+        self.store.put_agent("Coder", {"role": "Coder", "status": "active"})
+        self.store.put_history("Coder", [{"role": "user", "content": "hi"}])
+        self.assertEqual(self.store.get_agents()["Coder"]["role"], "Coder")
+        self.assertEqual(self.store.get_history("Coder")[0]["content"], "hi")
+
+        self.store.delete_agent("Coder")
+        self.assertNotIn("Coder", self.store.get_agents())
+        self.assertIsNone(self.store.get_history("Coder"))
+
+    def test_attachments(self):
+        self.assertIsNone(self.store.get_attachment("abc"))
+        self.store.put_attachment("abc", "content")
+        self.store.put_attachment("abc", "content")
+        self.assertEqual(self.store.get_attachment("abc"), "content")
+
+    def test_teams_and_bounded_interactions(self):
+        self.store.put_team("Core", ["Core_Lead"])
+        self.assertEqual(self.store.get_teams(), {"Core": ["Core_Lead"]})
+
+        ids = [self.store.append_interaction({"source": "A", "target": "B", "summary": str(i)}) for i in range(5)]
+        self.assertEqual(ids, [1, 2, 3, 4, 5])
+        self.assertEqual([r["summary"] for r in self.store.get_interactions(10)], ["2", "3", "4"])
+        self.assertEqual([r["id"] for r in self.store.get_interactions(10)], [3, 4, 5])
+        self.assertEqual([r["summary"] for r in self.store.get_interactions(1)], ["4"])
+
+    def test_version_tracks_shared_changes(self):
+        versions = [self.store.get_version()]
+        self.store.put_agent("Coder", {"role": "Coder"})
+        versions.append(self.store.get_version())
+        self.store.put_history("Coder", [])
+        versions.append(self.store.get_version())
+        self.store.put_team("Core", ["Coder"])
+        self.store.append_interaction({"source": "A", "target": "B", "summary": "x"})
+        self.store.delete_agent("Coder")
+        versions.append(self.store.get_version())
+
+        self.assertLess(versions[0], versions[1])
+        self.assertEqual(versions[1], versions[2])
+        self.assertEqual(versions[3], versions[1] + 3)
+
+    def test_leases(self):
+        self.assertTrue(self.store.acquire_lease("agent:A", "one", 5))
+        self.assertFalse(self.store.acquire_lease("agent:A", "two", 5))
+        self.assertFalse(self.store.release_lease("agent:A", "two"))
+        self.assertTrue(self.store.renew_lease("agent:A", "one", 5))
+        self.assertTrue(self.store.release_lease("agent:A", "one"))
+        self.assertTrue(self.store.acquire_lease("agent:A", "two", 5))
+
+    def test_lease_expires(self):
+        self.assertTrue(self.store.acquire_lease("agent:A", "one", 0.05))
+        time.sleep(0.1)
+        self.assertTrue(self.store.acquire_lease("agent:A", "two", 5))
+        self.assertFalse(self.store.renew_lease("agent:A", "one", 5))
+
+
+class TestInMemoryStateStore(StateStoreContract, unittest.TestCase):
+    def make_store(self):
+        return InMemoryStateStore(max_interactions=3)
+
+
+class TestRedisStateStore(StateStoreContract, unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StandInRedis()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def make_store(self):
+        with self.server.lock:
+            self.server.data.clear()
+            self.server.expiry.clear()
+        host, port = self.server.server_address
+        return RedisStateStore(RespClient(host, port), max_interactions=3)
+
+    def test_from_url(self):
+        store = create_state_store("redis://:secret@example.com:6380/2")
+        self.assertIsInstance(store, RedisStateStore)
+        self.assertEqual((store.client.host, store.client.port, store.client.db), ("example.com", 6380, 2))
+        self.assertEqual(store.client.password, "secret")
+        self.assertIsNone(create_state_store(""))
+        with self.assertRaises(ValueError):
+            create_state_store("mysql://localhost")
+
+    def test_auth_sends_username_when_given(self):
+        host, port = self.server.server_address
+        for url, expected in ((f"redis://:secret@{host}:{port}", ["secret"]),
+                              (f"redis://app:secret@{host}:{port}", ["app", "secret"])):
+            with self.server.lock:
+                self.server.auth_calls.clear()
+            store = create_state_store(url)
+            store.get_teams()
+            store.client.close()
+            self.assertEqual(self.server.auth_calls, [expected])
+
+
+class TestHoldLease(unittest.TestCase):
+    def setUp(self):
+        self.store = InMemoryStateStore()
+
+    def test_reentrant_within_call_chain(self):
+        with hold_lease(self.store, "agent:A") as outer:
+            with hold_lease(self.store, "agent:A", wait=0) as inner:
+                self.assertTrue(outer)
+                self.assertFalse(inner)
+        self.assertTrue(self.store.acquire_lease("agent:A", "other", 5))
+
+    def test_times_out_when_held_elsewhere(self):
+        self.store.acquire_lease("agent:A", "other-replica", 5)
+        with self.assertRaises(LeaseTimeoutError):
+            with hold_lease(self.store, "agent:A", wait=0.1):
+                pass
+
+    def test_renews_while_held(self):
+        with hold_lease(self.store, "agent:A", ttl=0.15):
+            time.sleep(0.4)
+            self.assertFalse(self.store.acquire_lease("agent:A", "other", 5))
+
+
+def _fake_think(agent, max_turns=None):
+    reply = f"ack {len(agent.messages)}"
+    agent.messages.append({"role": "assistant", "content": reply})
+    return reply
+
+
+@patch.object(Agent, "think", autospec=True, side_effect=_fake_think)
+class TestSharedSwarm(unittest.TestCase):
+    def setUp(self):
+        self.store = InMemoryStateStore()
+
+    def test_replicas_share_registry_and_teams(self, _think):
+        replica_a = Swarm(state_store=self.store)
+        replica_b = Swarm(state_store=self.store)
+
+        replica_a.create_agent("Coder", "Coder", "Write code.")
+        replica_a.create_team("Core", "Ship it", "Tech Lead", "Lead.")
+        replica_b.sync()
+        self.assertIn("Coder", replica_b.agents)
+        self.assertIsInstance(replica_b.agents["Coder"], SharedAgent)
+        self.assertEqual(replica_b.teams["Core"], ["Core_Lead"])
+
+        replica_a.toggle_agent("Coder")
+        replica_b.sync()
+        self.assertEqual(replica_b.agents["Coder"].status, "inactive")
+
+        replica_b.remove_agent("Coder")
+        replica_a.sync()
+        self.assertNotIn("Coder", replica_a.agents)
+
+    def test_sync_skips_reads_when_store_unchanged(self, _think):
+        replica_a = Swarm(state_store=self.store)
+        replica_b = Swarm(state_store=self.store)
+        replica_b.sync()
+
+        with patch.object(self.store, "get_agents", wraps=self.store.get_agents) as get_agents:
+            replica_b.sync()
+            self.assertEqual(get_agents.call_count, 0)
+            replica_a.create_agent("Coder", "Coder", "Write code.")
+            replica_b.sync()
+            self.assertEqual(get_agents.call_count, 1)
+        self.assertIn("Coder", replica_b.agents)
+
+    def test_sync_keeps_agent_created_during_it(self, _think):
+        replica = Swarm(state_store=self.store)
+        put_agent = self.store.put_agent
+
+        def put_agent_after_sync(name, definition):
+            # Another replica changes the store, then a request's sync runs before the agent is persisted
+            self.store.put_team("Other", [])
+            replica.sync()
+            self.assertIn(name, replica.agents)
+            put_agent(name, definition)
+
+        with patch.object(self.store, "put_agent", side_effect=put_agent_after_sync):
+            replica.create_agent("Coder", "Coder", "Write code.")
+        replica.sync()
+        self.assertIn("Coder", replica.agents)
+        self.assertIn("Coder", self.store.get_agents())
+
+    def test_history_follows_the_agent_across_replicas(self, _think):
+        replica_a = Swarm(state_store=self.store)
+        replica_b = Swarm(state_store=self.store)
+
+        replica_a.chat("first")
+        replica_b.chat("second")
+
+        contents = [m["content"] for m in replica_b.agents["Manager"].messages]
+        self.assertEqual(contents[1:], ["first", "ack 2", "second", "ack 4"])
+        self.assertEqual(self.store.get_history("Manager"), replica_b.agents["Manager"].messages)
+
+    def test_attachments_follow_the_history_across_replicas(self, _think):
+        replica_a = Swarm(state_store=self.store)
+        replica_b = Swarm(state_store=self.store)
+        notes = {"name": "notes.txt", "type": "text/plain", "content": "the plan is to ship friday"}
+
+        replica_a.chat("read this", attachments=[notes])
+        # Replica B runs in another process with its own attachment store
+        attachment_store.clear()
+        replica_b.chat("what does it say?")
+
+        wire = replica_b.agents["Manager"]._build_wire_messages()
+        self.assertIn("the plan is to ship friday", str(wire))
+        self.assertNotIn("no longer available", str(wire))
+
+    def test_turn_waits_for_lease_held_by_other_replica(self, _think):
+        replica = Swarm(state_store=self.store)
+        self.store.acquire_lease("agent:Manager", "other-replica", 5)
+
+        with patch("opencore.core.state_store.settings.agent_lease_wait", 0):
+            reply = replica.chat("hello")
+        self.assertIn("busy on another worker", reply)
+
+    def test_interactions_are_shared(self, _think):
+        replica_a = Swarm(state_store=self.store)
+        replica_b = Swarm(state_store=self.store)
+        replica_a._record_interaction("Manager", "Coder", "task")
+        self.assertEqual(self.store.get_interactions(10)[0]["summary"], "task")
+
+        replica_b.sync()
+        replica_b._record_interaction("Manager", "Tester", "check")
+        replica_b.sync()
+        replica_a.sync()
+
+        self.assertEqual([r.summary for r in replica_b.interactions], ["task", "check"])
+        self.assertEqual([r.summary for r in replica_a.interactions], ["task", "check"])
+        self.assertIn("task", [edge["label"] for edge in replica_b.get_graph_data()["edges"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import threading
+import unittest
+from unittest.mock import patch
+from opencore.tools.base import read_file, write_file, list_files
+from opencore.tools.cache import ToolResultCache, tool_cache
+
+
+class TestToolResultCache(unittest.TestCase):
+    def setUp(self):
+        tool_cache.clear()
+        self.test_file = "test_cache_file.txt"
+        with open(self.test_file, "w") as f:
+            f.write("original")
+
+    def tearDown(self):
+        if os.path.exists(self.test_file):
+            os.remove(self.test_file)
+        tool_cache.clear()
+
+    def test_repeated_read_served_from_cache(self):
+        self.assertEqual(read_file(self.test_file), "original")
+
+        with patch("opencore.tools.base._is_safe_path") as mock_safe:
+            self.assertEqual(read_file(self.test_file), "original")
+            mock_safe.assert_not_called()
+
+        self.assertGreaterEqual(tool_cache.hits, 1)
+
+    def test_external_modification_invalidates(self):
+        read_file(self.test_file)
+
+        with open(self.test_file, "w") as f:
+            f.write("changed outside the tools")
+
+        self.assertEqual(read_file(self.test_file), "changed outside the tools")
+
+    def test_write_file_invalidates_read_and_listing(self):
+        read_file(self.test_file)
+        list_files(".")
+
+        write_file(self.test_file, "rewritten")
+        path = os.path.realpath(self.test_file)
+        self.assertIsNone(tool_cache.get("read_file", path))
+        self.assertIsNone(tool_cache.get("list_files", os.path.dirname(path)))
+        self.assertEqual(read_file(self.test_file), "rewritten")
+
+    def test_listing_reflects_new_files(self):
+        self.assertIn(self.test_file, list_files("."))
+        os.remove(self.test_file)
+        self.assertNotIn(self.test_file, list_files("."))
+
+    def test_errors_are_not_cached(self):
+        self.assertIn("Error", read_file("does_not_exist.txt"))
+        self.assertEqual(len(tool_cache), 0)
+
+    def test_lru_eviction_by_bytes(self):
+        cache = ToolResultCache(max_bytes=10)
+        path_a = os.path.realpath(self.test_file)
+        signature = cache.signature(path_a)
+
+        cache.put("read_file", path_a, signature, "123456")
+        cache.put("list_files", path_a, signature, "abcdef")
+
+        self.assertIsNone(cache.get("read_file", path_a))
+        self.assertEqual(cache.get("list_files", path_a), "abcdef")
+        self.assertEqual(cache.size, 6)
+
+    def test_counters_consistent_across_threads(self):
+        cache = ToolResultCache()
+        path = os.path.realpath(self.test_file)
+        cache.put("read_file", path, cache.signature(path), "original")
+
+        def reader():
+            for _ in range(200):
+                cache.get("read_file", path)
+                cache.get("list_files", path)
+
+        threads = [threading.Thread(target=reader) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual((cache.hits, cache.misses), (1600, 1600))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from opencore.core.swarm import Swarm
+from opencore.core.tool_catalog import SCOPE_AGENT, SCOPE_MANAGER
+
+
+class TestToolCatalog(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm()
+        self.swarm.create_agent("Coder", "Coder", "Write code.")
+        self.swarm.create_agent("Writer", "Writer", "Write prose.")
+
+    def test_agents_share_schema_objects(self):
+        coder = self.swarm.agents["Coder"]
+        writer = self.swarm.agents["Writer"]
+        coder_schema = next(t for t in coder.tool_definitions if t["function"]["name"] == "delegate_task")
+        writer_schema = next(t for t in writer.tool_definitions if t["function"]["name"] == "delegate_task")
+        self.assertIs(coder_schema, writer_schema)
+
+    def test_scopes(self):
+        manager_names = self.swarm.tool_catalog.names(SCOPE_MANAGER)
+        agent_names = self.swarm.tool_catalog.names(SCOPE_AGENT)
+        self.assertLess(agent_names, manager_names)
+        self.assertIn("remove_agent", manager_names - agent_names)
+        self.assertNotIn("remove_agent", self.swarm.agents["Coder"].tools)
+        self.assertIn("read_file", self.swarm.agents["Coder"].tools)
+
+    def test_caller_bound_at_invocation(self):
+        with patch.object(self.swarm, "delegate_task", return_value="ok") as delegate:
+            self.swarm.agents["Coder"].tools["delegate_task"]("Writer", "Draft docs")
+            self.swarm.agents["Writer"].tools["delegate_task"](to_agent="Coder", task="Review")
+
+        self.assertEqual(delegate.call_args_list[0].args, ("Coder", "Writer", "Draft docs"))
+        self.assertEqual(delegate.call_args_list[1].args, ("Writer", "Coder", "Review"))
+
+    def test_update_settings_rebuilds_schemas_once(self):
+        agent = self.swarm.agents["Coder"]
+        agent.tool_definitions  # build
+        with patch("opencore.core.tool_catalog.get_available_model_list", return_value=["x/model"]) as models:
+            self.swarm.update_settings()
+            models.assert_not_called()
+
+            for name in ("Manager", "Coder", "Writer"):
+                self.swarm.agents[name].tool_definitions
+            self.assertEqual(models.call_count, 1)
+
+        schema = next(t for t in agent.tool_definitions if t["function"]["name"] == "create_agent")
+        self.assertIn("x/model", schema["function"]["parameters"]["properties"]["model"]["description"])
+
+    def test_own_tools_override_catalog(self):
+        agent = self.swarm.agents["Coder"]
+        mock_tool = MagicMock(return_value="mocked")
+        agent.tools["list_agents"] = mock_tool
+        self.assertIs(agent.tools["list_agents"], mock_tool)
+        self.assertEqual(list(agent.tools).count("list_agents"), 1)
+        self.assertEqual(
+            [t["function"]["name"] for t in agent.tool_definitions].count("list_agents"), 1
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
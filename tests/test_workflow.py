@@ -0,0 +1,120 @@
+import threading
+import time
+import unittest
+from opencore.core.swarm import Swarm
+from opencore.core.context import activity_log_ctx
+from opencore.core.workflow import Workflow, WorkflowError, STEP_CACHED, STEP_COMPLETED, STEP_FAILED, STEP_SKIPPED
+
+
+class EchoWorker:
+    """Stand-in agent that echoes tasks after a short delay."""
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.model = "gpt-4o"
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def chat(self, message, lane=None):
+        with self._lock:
+            self.calls.append(message)
+        time.sleep(self.delay)
+        if self.fail:
+            return "Error: boom"
+        return f"{self.name}({message})"
+
+
+SPEC = {
+    "name": "report",
+    "steps": [
+        {"id": "a", "agent": "A", "task": "research"},
+        {"id": "b", "agent": "B", "task": "benchmarks"},
+        {"id": "c", "agent": "C", "task": "combine {a} and {b}", "depends_on": ["a", "b"]},
+    ]
+}
+
+
+class TestWorkflow(unittest.TestCase):
+    def setUp(self):
+        self.swarm = Swarm("Manager")
+        self.workers = {name: EchoWorker(name, delay=0.2) for name in ("A", "B", "C")}
+        self.swarm.agents.update(self.workers)
+
+    def test_runs_dag_with_parallel_roots(self):
+        start = time.monotonic()
+        result = self.swarm.run_workflow(SPEC)
+        elapsed = time.monotonic() - start
+
+        self.assertTrue(result.succeeded)
+        self.assertEqual(result.outputs["c"], "C(combine A(research) and B(benchmarks))")
+        # a and b run together, then c: about two step durations rather than three
+        self.assertLess(elapsed, 0.55)
+
+    def test_rerun_served_from_cache(self):
+        self.swarm.run_workflow(SPEC)
+        result = self.swarm.run_workflow(SPEC)
+
+        self.assertEqual(set(result.statuses.values()), {STEP_CACHED})
+        self.assertEqual(len(self.workers["C"].calls), 1)
+
+    def test_changed_step_invalidates_downstream_only(self):
+        self.swarm.run_workflow(SPEC)
+        changed = {"name": "report", "steps": [dict(step) for step in SPEC["steps"]]}
+        changed["steps"][1]["task"] = "new benchmarks"
+
+        result = self.swarm.run_workflow(changed)
+
+        self.assertEqual(result.statuses, {"a": STEP_CACHED, "b": STEP_COMPLETED, "c": STEP_COMPLETED})
+
+    def test_failure_skips_dependents(self):
+        self.workers["A"].fail = True
+        result = self.swarm.run_workflow(SPEC)
+
+        self.assertFalse(result.succeeded)
+        self.assertEqual(result.statuses["a"], STEP_FAILED)
+        self.assertEqual(result.statuses["c"], STEP_SKIPPED)
+        self.assertEqual(self.workers["C"].calls, [])
+
+    def test_progress_streams_to_activity_log(self):
+        token = activity_log_ctx.set([])
+        try:
+            self.swarm.run_workflow(SPEC)
+            activity = activity_log_ctx.get()
+        finally:
+            activity_log_ctx.reset(token)
+
+        subtypes = [a["subtype"] for a in activity if a["type"] == "workflow"]
+        self.assertEqual(subtypes.count("step_start"), 3)
+        self.assertEqual(subtypes.count("step_done"), 3)
+
+    def test_validation(self):
+        with self.assertRaises(WorkflowError):
+            Workflow.from_dict({"steps": [
+                {"id": "x", "agent": "A", "task": "t", "depends_on": ["y"]},
+                {"id": "y", "agent": "A", "task": "t", "depends_on": ["x"]},
+            ]})
+        with self.assertRaises(WorkflowError):
+            Workflow.from_dict({"steps": [{"id": "x", "agent": "A", "task": "t", "depends_on": ["missing"]}]})
+        with self.assertRaises(WorkflowError):
+            self.swarm.run_workflow({"steps": [{"id": "x", "agent": "Ghost", "task": "t"}]})
+
+    def test_yaml_definition(self):
+        try:
+            import yaml  # noqa: F401
+        except ImportError:
+            self.skipTest("PyYAML is not installed")
+        workflow = Workflow.from_yaml(
+            "name: y\nsteps:\n  - id: a\n    agent: A\n    task: research\n"
+        )
+        self.assertEqual(workflow.steps[0].agent, "A")
+
+    def test_manager_tool(self):
+        import json
+        output = self.swarm.agents["Manager"].tools["run_workflow"](json.dumps(SPEC))
+        self.assertIn("Workflow 'report' succeeded.", output)
+        self.assertIn("Error", self.swarm.agents["Manager"].tools["run_workflow"]("not json"))
+
+
+if __name__ == "__main__":
+    unittest.main()